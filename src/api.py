@@ -0,0 +1,125 @@
+import asyncio
+import html
+import io
+import re
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, DEFAULT_LOAD_TIMEOUT, DEFAULT_SLIDE_TIMEOUT, DEFAULT_STAGE_TIMEOUT
+
+SOURCE_KINDS = ('wp', 'html')
+
+# Keyword options of convert(), named like the command line flags
+OPTIONS = ('slide_range', 'window', 'asset_cache', 'fetch_assets', 'budget',
+           'load_timeout', 'slide_timeout', 'stage_timeout', 'optimize', 'quantize')
+
+_HEAD_TAG = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+_DOCTYPE = re.compile(r'^\s*<!doctype[^>]*>', re.IGNORECASE)
+
+def _with_base_url(html_content, base_url):
+    """
+    Adds a <base> so relative asset URLs resolve as if loaded from base_url.
+    It goes into <head>, or right after the doctype: anything before the
+    doctype would switch the page to quirks mode.
+    """
+    base_tag = f'<base href="{html.escape(base_url, quote=True)}">'
+    match = _HEAD_TAG.search(html_content) or _DOCTYPE.match(html_content)
+    if match is None:
+        return base_tag + html_content
+    return html_content[:match.end()] + base_tag + html_content[match.end():]
+
+async def _convert_on_page(page, html_content, render_mode, options):
+    from assets import AssetRouter, load_html
+    from pipeline import extract_scene, render_scene
+
+    asset_cache = options.get('asset_cache')
+    if asset_cache:
+        router = AssetRouter(asset_cache, fetch_missing=options.get('fetch_assets', False))
+        await router.attach(page)
+    base_url = options.get('base_url')
+    origin_url = base_url if base_url and base_url.startswith('file:') else None
+    await load_html(page, html_content, options.get('load_timeout', DEFAULT_LOAD_TIMEOUT), origin_url)
+
+    scene = await extract_scene(
+        page, render_mode, options.get('slide_range'),
+        window=options.get('window'),
+        asset_cache=asset_cache,
+        budget=options.get('budget'),
+        slide_timeout=options.get('slide_timeout', DEFAULT_SLIDE_TIMEOUT),
+        stage_timeout=options.get('stage_timeout', DEFAULT_STAGE_TIMEOUT),
+        quantize=options.get('quantize'),
+    )
+
+    # python-pptx is CPU-bound; keep the event loop free for other conversions
+    output = io.BytesIO()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, render_scene, scene, output)
+
+    optimize = options.get('optimize')
+    if optimize:
+        from ppt_optimizer import optimize_presentation
+
+        kwargs = optimize if isinstance(optimize, dict) else {}
+        source, output = io.BytesIO(output.getvalue()), io.BytesIO()
+        await loop.run_in_executor(None, lambda: optimize_presentation(source, output, **kwargs))
+    return output.getvalue()
+
+async def convert(source, *, kind='html', render_mode=2, browser=None, base_url=None, **options):
+    """
+    Converts a .wp or HTML document (given as a string) to .pptx bytes.
+
+    browser: a Playwright Browser (a fresh context is opened and closed for
+    this call) or BrowserContext (a page is opened and closed). If None, a
+    browser is launched for this call only.
+    base_url: URL relative asset references are resolved against.
+    options: see OPTIONS; asset_cache is an assets.AssetCache or a cache
+    directory, budget a {'bytes', 'seconds'} dict, timeouts in seconds,
+    optimize True or a {'dpi', 'zip_level'} dict, quantize a color count.
+
+    Nothing is written to disk and no state is shared between calls, so
+    many conversions can run concurrently in one event loop.
+    """
+    if kind not in SOURCE_KINDS:
+        raise ValueError(f"Unknown source kind '{kind}' (expected one of {', '.join(SOURCE_KINDS)})")
+    unknown = set(options) - set(OPTIONS)
+    if unknown:
+        raise TypeError(f"Unknown conversion options: {', '.join(sorted(unknown))}")
+    if isinstance(options.get('asset_cache'), str):
+        from assets import AssetCache
+        options['asset_cache'] = AssetCache(options['asset_cache'])
+
+    if kind == 'wp':
+        from wp_compiler import WPCompiler
+        html_content = WPCompiler().compile(source)
+    else:
+        html_content = source
+    if base_url:
+        html_content = _with_base_url(html_content, base_url)
+        options['base_url'] = base_url
+
+    if browser is not None:
+        return await _convert_in(browser, html_content, render_mode, options)
+
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        launched = await p.chromium.launch()
+        try:
+            return await _convert_in(launched, html_content, render_mode, options)
+        finally:
+            await launched.close()
+
+async def _convert_in(browser, html_content, render_mode, options):
+    """Runs one conversion on its own page of a Browser or BrowserContext"""
+    viewport = {'width': PPT_WIDTH_PX, 'height': PPT_HEIGHT_PX}
+    if hasattr(browser, 'new_context'):
+        # Use device_scale_factor=3 for high DPI screenshots (Retina quality)
+        context = await browser.new_context(viewport=viewport, device_scale_factor=3)
+        try:
+            page = await context.new_page()
+            return await _convert_on_page(page, html_content, render_mode, options)
+        finally:
+            await context.close()
+
+    page = await browser.new_page()
+    try:
+        await page.set_viewport_size(viewport)
+        return await _convert_on_page(page, html_content, render_mode, options)
+    finally:
+        await page.close()
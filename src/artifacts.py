@@ -0,0 +1,53 @@
+import io
+import os
+import re
+
+# Print styles for --pdf: one slide per page, without the on-screen gaps
+# and shadows. Scoped to print media, so screen layout (and therefore
+# every capture) is unaffected.
+PDF_PRINT_CSS = """@media print {
+    @page { size: %(width)dpx %(height)dpx; margin: 0; }
+    html, body { margin: 0 !important; padding: 0 !important; background: none !important; }
+    section.slide { margin: 0 !important; box-shadow: none !important; break-after: page; }
+    section.slide:last-of-type { break-after: auto; }
+}"""
+
+_SIZE_PATTERN = re.compile(r'^\s*(\d+)\s*[xX]\s*(\d+)\s*$')
+
+def parse_size(size_string):
+    """Parses '320x180' into a (width, height) tuple"""
+    match = _SIZE_PATTERN.match(size_string)
+    if not match or not int(match.group(1)) or not int(match.group(2)):
+        raise ValueError(f"Invalid size '{size_string}' (expected e.g. 320x180)")
+    return int(match.group(1)), int(match.group(2))
+
+async def save_pdf(page, path, width, height):
+    """Prints the loaded deck to a PDF with one slide-sized page per slide"""
+    await page.add_style_tag(content=PDF_PRINT_CSS % {'width': width, 'height': height})
+    await page.pdf(path=path, width=f"{width}px", height=f"{height}px", print_background=True,
+                   margin={'top': '0', 'right': '0', 'bottom': '0', 'left': '0'})
+
+def make_thumbnail(png, size):
+    """Scales a slide capture down to a PNG thumbnail of the given size"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        thumbnail = image.convert('RGB').resize(size, Image.LANCZOS)
+    output = io.BytesIO()
+    thumbnail.save(output, 'PNG', optimize=True)
+    return output.getvalue()
+
+def write_thumbnails(scene, directory):
+    """Writes the scene's slide thumbnails as slide_001.png, ... and returns the count"""
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for slide_data in scene.slides:
+        ref = slide_data.get('thumbnailRef')
+        if not ref:
+            continue
+        # Deck numbering, also when only a slide range was converted
+        number = int(slide_data['id'].split('_')[1]) + 1
+        with open(os.path.join(directory, f"slide_{number:03d}.png"), 'wb') as f:
+            f.write(scene.image_bytes(ref))
+        count += 1
+    return count
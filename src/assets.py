@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import time
+from config import DEFAULT_LOAD_TIMEOUT
+
+# Schemes that never leave the machine and are always let through
+LOCAL_SCHEMES = ('file:', 'data:', 'blob:', 'about:')
+
+# Waits for webfonts and for every <img> to be decoded, or until the budget runs out
+WAIT_FOR_ASSETS_JS = """async timeoutMs => {
+    const images = Array.from(document.images).map(img => {
+        if (img.loading === 'lazy') img.loading = 'eager';
+        return img.decode().catch(() => {});
+    });
+    const ready = Promise.all([document.fonts.ready, ...images]).then(() => true);
+    const timeout = new Promise(resolve => setTimeout(() => resolve(false), timeoutMs));
+    return await Promise.race([ready, timeout]);
+}"""
+
+
+class AssetCache:
+    """
+    Content-addressed store for remote page assets. Blobs live under
+    objects/<sha256[:2]>/<sha256>; index.json maps each URL to its blob
+    and content type. Identical payloads served from several URLs
+    (e.g. CDN mirrors) are stored once.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.index = {}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest)
+
+    def get(self, url):
+        """Returns (body, content_type) for a cached URL, or None"""
+        entry = self.index.get(url)
+        if not entry:
+            return None
+        path = self._object_path(entry['sha256'])
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read(), entry.get('contentType')
+
+    def put(self, url, body, content_type=None):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(body)
+            os.replace(path + '.tmp', path)
+        self.index[url] = {'sha256': digest, 'contentType': content_type}
+        self._save_index()
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+
+class AssetRouter:
+    """
+    Playwright route layer: remote requests are answered from an AssetCache
+    and everything else that is not local is blocked, so page loads never
+    wait on the network. With fetch_missing, cache misses are downloaded
+    once and stored (use this to populate the cache).
+    """
+
+    def __init__(self, cache, fetch_missing=False):
+        self.cache = cache
+        self.fetch_missing = fetch_missing
+        self.blocked = []
+        self.served = 0
+        self.fetched = 0
+
+    async def attach(self, target):
+        """Routes all requests of a page or browser context"""
+        await target.route('**/*', self._handle)
+
+    async def _handle(self, route):
+        url = route.request.url
+        if url.startswith(LOCAL_SCHEMES):
+            await route.continue_()
+            return
+
+        cached = self.cache.get(url)
+        if cached:
+            body, content_type = cached
+            headers = {'content-type': content_type} if content_type else {}
+            # Fonts and images fetched cross-origin need CORS headers to be usable
+            headers['access-control-allow-origin'] = '*'
+            await route.fulfill(status=200, body=body, headers=headers)
+            self.served += 1
+            return
+
+        if self.fetch_missing:
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except Exception as e:
+                print(f"WARNING: Failed to fetch {url}: {e}")
+                self.blocked.append(url)
+                await route.abort('failed')
+                return
+            if response.ok:
+                self.cache.put(url, body, response.headers.get('content-type'))
+                self.fetched += 1
+            await route.fulfill(response=response, body=body)
+            return
+
+        self.blocked.append(url)
+        await route.abort('blockedbyclient')
+
+    def report(self):
+        print(f"Assets: {self.served} served from cache, {self.fetched} fetched, {len(self.blocked)} blocked.")
+        for url in self.blocked:
+            print(f"  BLOCKED {url}")
+
+
+async def load_page(page, input_path, timeout=DEFAULT_LOAD_TIMEOUT):
+    """
+    Navigates to a local input file and waits until webfonts are ready and
+    images are decoded, all within `timeout` seconds. Running out of budget
+    is reported but not fatal: extraction continues with what has loaded.
+    """
+    await _load(page, page.goto, f"file://{input_path}", timeout)
+
+async def load_html(page, html_content, timeout=DEFAULT_LOAD_TIMEOUT, origin_url=None):
+    """
+    Like load_page, for an HTML string (nothing is written to disk).
+    origin_url: a file: URL (e.g. the source's directory) to open first, so
+    the document may load local files; about:blank pages may not.
+    """
+    if origin_url:
+        await page.goto(origin_url, timeout=timeout * 1000)
+    await _load(page, page.set_content, html_content, timeout)
+
+async def _load(page, navigate, target, timeout):
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    deadline = time.monotonic() + timeout
+    try:
+        await navigate(target, wait_until='load', timeout=timeout * 1000)
+    except PlaywrightTimeoutError:
+        print(f"WARNING: Page did not finish loading within {timeout}s, continuing.")
+
+    remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+    if not await page.evaluate(WAIT_FOR_ASSETS_JS, remaining_ms):
+        print(f"WARNING: Fonts or images were not ready within {timeout}s, continuing.")
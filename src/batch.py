@@ -0,0 +1,179 @@
+import asyncio
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, DEFAULT_LOAD_TIMEOUT, DEFAULT_SLIDE_TIMEOUT, DEFAULT_STAGE_TIMEOUT
+from pipeline import prepare_input, extract_scene, render_scene
+from assets import AssetCache, AssetRouter, load_page
+from ppt_optimizer import optimize_presentation
+
+INPUT_EXTENSIONS = ('.wp', '.html', '.htm')
+
+def _is_input(path):
+    return path.endswith(INPUT_EXTENSIONS) and not path.endswith('.temp.html')
+
+def collect_inputs(spec):
+    """
+    Resolves a batch input spec into a sorted list of input files.
+    spec may be a directory (searched recursively), a glob pattern,
+    or a manifest file listing one input path per line.
+    An .html/.htm next to a .wp of the same name is that deck compiled (see
+    the compile command) and is skipped. Raises ValueError if two inputs
+    would still write the same .pptx.
+    """
+    if os.path.isdir(spec):
+        paths = []
+        for root, _, files in os.walk(spec):
+            paths.extend(os.path.join(root, f) for f in files if _is_input(f))
+        paths.sort()
+    elif os.path.isfile(spec) and not _is_input(spec):
+        # Manifest: relative paths are resolved against the manifest's directory
+        base_dir = os.path.dirname(os.path.abspath(spec))
+        paths = []
+        with open(spec, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    paths.append(os.path.join(base_dir, line))
+    else:
+        paths = sorted(p for p in glob.glob(spec, recursive=True) if _is_input(p))
+
+    wp_stems = {os.path.splitext(p)[0] for p in paths if p.endswith('.wp')}
+    inputs = []
+    for path in paths:
+        if not path.endswith('.wp') and os.path.splitext(path)[0] in wp_stems:
+            print(f"Skipping {path}: compiled from {os.path.splitext(path)[0]}.wp")
+            continue
+        inputs.append(path)
+
+    outputs = {}
+    for path in inputs:
+        outputs.setdefault(os.path.abspath(output_path_for(path)), []).append(path)
+    collisions = [group for group in outputs.values() if len(group) > 1]
+    if collisions:
+        raise ValueError("Inputs would overwrite each other's output: " +
+                         '; '.join(' and '.join(group) for group in collisions))
+    return inputs
+
+def output_path_for(input_file):
+    return os.path.splitext(input_file)[0] + '.pptx'
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class BatchConverter:
+    """
+    Converts many files with a single shared browser. Each file gets its own
+    browser context from a bounded pool; .wp compilation and PPTX rendering
+    run in a thread pool so they overlap with browser work.
+    """
+
+    def __init__(self, browser, render_mode=2, concurrency=4, timeout=120, window=None,
+                 asset_cache=None, fetch_assets=False, load_timeout=DEFAULT_LOAD_TIMEOUT, budget=None,
+                 slide_timeout=DEFAULT_SLIDE_TIMEOUT, stage_timeout=DEFAULT_STAGE_TIMEOUT, optimize=None, quantize=None):
+        self.browser = browser
+        self.render_mode = render_mode
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.window = window
+        # One cache shared by every file; each file gets its own router for reporting
+        self.asset_cache = AssetCache(asset_cache) if asset_cache else None
+        self.fetch_assets = fetch_assets
+        self.load_timeout = load_timeout
+        self.budget = budget
+        self.slide_timeout = slide_timeout
+        self.stage_timeout = stage_timeout
+        # Keyword arguments for optimize_presentation, or None to skip it
+        self.optimize = optimize
+        self.quantize = quantize
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _convert(self, input_file):
+        loop = asyncio.get_running_loop()
+        output_path = output_path_for(input_file)
+        input_path = await loop.run_in_executor(self.executor, prepare_input, input_file)
+
+        context = None
+        try:
+            context = await self.browser.new_context(
+                viewport={'width': PPT_WIDTH_PX, 'height': PPT_HEIGHT_PX},
+                device_scale_factor=3
+            )
+            if self.asset_cache:
+                router = AssetRouter(self.asset_cache, fetch_missing=self.fetch_assets)
+                await router.attach(context)
+            page = await context.new_page()
+            await load_page(page, input_path, self.load_timeout)
+            if self.asset_cache and router.blocked:
+                print(f"{input_file}: blocked {len(router.blocked)} network requests")
+            scene = await extract_scene(page, self.render_mode, window=self.window, asset_cache=self.asset_cache,
+                                        budget=self.budget, slide_timeout=self.slide_timeout,
+                                        stage_timeout=self.stage_timeout, quantize=self.quantize)
+        finally:
+            if context:
+                await context.close()
+            if input_path != os.path.abspath(input_file):
+                os.remove(input_path)
+
+        await loop.run_in_executor(self.executor, render_scene, scene, output_path)
+        if self.optimize is not None:
+            await loop.run_in_executor(self.executor, lambda: optimize_presentation(output_path, output_path, **self.optimize))
+        return output_path, scene.meta.get('degradedSlides', [])
+
+    async def convert_one(self, input_file):
+        """Converts one file, never raising. Returns a result dict."""
+        async with self.semaphore:
+            start = time.perf_counter()
+            result = {'input': input_file, 'output': None, 'error': None, 'degraded': []}
+            try:
+                result['output'], result['degraded'] = await asyncio.wait_for(self._convert(input_file), timeout=self.timeout)
+            except asyncio.TimeoutError as e:
+                result['error'] = str(e) or f"timed out after {self.timeout}s"
+            except Exception as e:
+                result['error'] = f"{type(e).__name__}: {e}"
+            result['seconds'] = time.perf_counter() - start
+
+            if result['error']:
+                print(f"FAILED {input_file}: {result['error']}")
+            else:
+                degraded = f", {len(result['degraded'])} slide(s) flattened" if result['degraded'] else ""
+                print(f"OK {input_file} -> {result['output']} ({result['seconds']:.1f}s{degraded})")
+            return result
+
+    async def run(self, input_files):
+        try:
+            return await asyncio.gather(*(self.convert_one(f) for f in input_files))
+        finally:
+            self.executor.shutdown(wait=False)
+
+def summarize(results, wall_seconds):
+    """Returns an aggregate throughput summary for a batch run"""
+    latencies = sorted(r['seconds'] for r in results if not r['error'])
+    failed = [r for r in results if r['error']]
+    minutes = wall_seconds / 60 if wall_seconds > 0 else 0
+    return {
+        'total': len(results),
+        'succeeded': len(latencies),
+        'failed': len(failed),
+        'wall_seconds': wall_seconds,
+        'files_per_minute': len(latencies) / minutes if minutes else 0.0,
+        'p50_seconds': _percentile(latencies, 50),
+        'p95_seconds': _percentile(latencies, 95),
+    }
+
+def print_summary(summary, results):
+    print("")
+    print(f"Batch finished: {summary['succeeded']}/{summary['total']} converted, {summary['failed']} failed "
+          f"in {summary['wall_seconds']:.1f}s")
+    print(f"Throughput: {summary['files_per_minute']:.1f} files/min, "
+          f"p50 {summary['p50_seconds']:.2f}s, p95 {summary['p95_seconds']:.2f}s")
+    for r in results:
+        if r['error']:
+            print(f"  FAILED {r['input']}: {r['error']}")
+        elif r['degraded']:
+            print(f"  DEGRADED {r['input']}: {', '.join(r['degraded'])}")
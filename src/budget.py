@@ -0,0 +1,97 @@
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, SHADOW_PADDING_PX
+
+# Render mode that picks raster vs native per element under a budget
+BUDGET_MODE = 4
+
+# Default per-deck budget for captured image bytes when none is given
+DEFAULT_BUDGET_MB = 20
+
+# Cost model for one element capture (device_scale_factor=3 screenshots)
+CAPTURE_SCALE = 3
+PNG_BYTES_PER_PIXEL = 1.2  # rough average for UI-style captures after deflate
+CAPTURE_OVERHEAD_SECONDS = 0.08
+CAPTURE_SECONDS_PER_MEGAPIXEL = 0.05
+
+# How much of an effect is lost when the element stays native (0..1)
+FIDELITY_WEIGHTS = {
+    'glass effect': 1.0,
+    'blend mode': 1.0,
+    'gradient': 0.8,
+    'opacity': 0.2, # native alpha is close, only compositing of overlaps differs
+    'rgba background': 0.2,
+}
+
+SLIDE_AREA = PPT_WIDTH_PX * PPT_HEIGHT_PX
+
+def _capture_area(el):
+    """Captured pixels (CSS px) including the shadow padding, clipped to the slide"""
+    x0 = max(0, el['x'] - SHADOW_PADDING_PX)
+    y0 = max(0, el['y'] - SHADOW_PADDING_PX)
+    x1 = min(PPT_WIDTH_PX, el['x'] + el['width'] + SHADOW_PADDING_PX)
+    y1 = min(PPT_HEIGHT_PX, el['y'] + el['height'] + SHADOW_PADDING_PX)
+    return max(0, x1 - x0) * max(0, y1 - y0)
+
+def capture_cost(el):
+    """Estimated (bytes, seconds) of capturing an element as an image"""
+    pixels = _capture_area(el) * CAPTURE_SCALE * CAPTURE_SCALE
+    return pixels * PNG_BYTES_PER_PIXEL, CAPTURE_OVERHEAD_SECONDS + pixels / 1e6 * CAPTURE_SECONDS_PER_MEGAPIXEL
+
+def fidelity_gain(el, reasons):
+    """
+    Visual fidelity recovered by rasterizing: the worst effect lost natively,
+    weighted by how prominent the element is. Prominence grows with the
+    square root of the on-slide area, so large panels count more than small
+    badges but not proportionally more.
+    """
+    weight = max(FIDELITY_WEIGHTS.get(r, 0.5) for r in reasons)
+    return weight * (_capture_area(el) / SLIDE_AREA) ** 0.5
+
+def plan_raster_budget(candidates, mandatory, max_bytes=None, max_seconds=None):
+    """
+    Chooses which candidate elements to rasterize so that the estimated
+    total capture cost stays within budget. Elements are taken greedily by
+    fidelity gain per unit of (normalized) cost.
+
+    candidates: list of (el, reasons) that would look better as an image.
+    mandatory: elements that are captured regardless; they are paid first.
+    Returns (decisions, spent): one decision dict per candidate, in the
+    order given, and the estimated {'bytes', 'seconds'} spent overall.
+    """
+    if max_bytes is None and max_seconds is None:
+        max_bytes = DEFAULT_BUDGET_MB * 1024 * 1024
+
+    spent = {'bytes': 0.0, 'seconds': 0.0}
+    for el in mandatory:
+        cost_bytes, cost_seconds = capture_cost(el)
+        spent['bytes'] += cost_bytes
+        spent['seconds'] += cost_seconds
+
+    def normalized(cost_bytes, cost_seconds):
+        parts = []
+        if max_bytes:
+            parts.append(cost_bytes / max_bytes)
+        if max_seconds:
+            parts.append(cost_seconds / max_seconds)
+        return max(parts)
+
+    decisions = []
+    for el, reasons in candidates:
+        cost_bytes, cost_seconds = capture_cost(el)
+        gain = fidelity_gain(el, reasons)
+        decisions.append({
+            'id': el['id'], 'reasons': reasons, 'gain': gain,
+            'bytes': cost_bytes, 'seconds': cost_seconds,
+            'value': gain / max(normalized(cost_bytes, cost_seconds), 1e-9),
+            'rasterize': False,
+        })
+
+    for decision in sorted(decisions, key=lambda d: d['value'], reverse=True):
+        over_bytes = max_bytes and spent['bytes'] + decision['bytes'] > max_bytes
+        over_seconds = max_seconds and spent['seconds'] + decision['seconds'] > max_seconds
+        if over_bytes or over_seconds:
+            continue
+        decision['rasterize'] = True
+        spent['bytes'] += decision['bytes']
+        spent['seconds'] += decision['seconds']
+
+    return decisions, spent
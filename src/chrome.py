@@ -0,0 +1,134 @@
+import json
+
+# An element has to repeat on at least this many slides to count as chrome
+CHROME_MIN_SLIDES = 3
+
+# Position/size differences below this (px) are treated as identical
+GEOMETRY_TOLERANCE = 0.5
+
+def _split_numbers(value, numbers):
+    """
+    Drops per-slide ids and moves every number (geometry, opacity...) out
+    into `numbers`, so the rest can be compared exactly and the numbers
+    with a tolerance. Ints and floats are treated alike.
+    """
+    if isinstance(value, dict):
+        return {k: _split_numbers(value[k], numbers) for k in sorted(value) if k != 'id'}
+    if isinstance(value, list):
+        return [_split_numbers(v, numbers) for v in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        numbers.append(float(value))
+        return '#'
+    return value
+
+def element_signature(el):
+    """
+    Returns (key, numbers) identifying an element by geometry, styles and
+    content, or None if the element must not be shared between slides.
+    Two elements are the same if their keys are equal and their numbers
+    differ by at most GEOMETRY_TOLERANCE.
+    """
+    # Chart parts (with their embedded workbook) can only belong to slides
+    if el['type'] == 'chart':
+        return None
+    styles = el['styles']
+    # Backdrop filters are captured together with what lies behind them
+    if styles.get('backdropFilter', 'none') not in ('none', '') or \
+       styles.get('webkitBackdropFilter', 'none') not in ('none', ''):
+        return None
+    numbers = []
+    key = json.dumps(_split_numbers(el, numbers))
+    return key, numbers
+
+def _signature_ids(slides_data):
+    """
+    Per slide, an id for each element's signature (None if it cannot be
+    shared). Elements get the id of the first element seen that matches
+    them within the tolerance.
+    """
+    seen = {}
+    slides_sigs = []
+    for slide_data in slides_data:
+        sigs = []
+        for el in slide_data['elements']:
+            signature = element_signature(el)
+            if signature is None:
+                sigs.append(None)
+                continue
+            key, numbers = signature
+            candidates = seen.setdefault(key, [])
+            match = next((i for i, other in enumerate(candidates)
+                          if all(abs(a - b) <= GEOMETRY_TOLERANCE for a, b in zip(numbers, other))), None)
+            if match is None:
+                match = len(candidates)
+                candidates.append(numbers)
+            sigs.append((key, match))
+        slides_sigs.append(sigs)
+    return slides_sigs
+
+def _overlaps(a, b):
+    return a['x'] < b['x'] + b['width'] and b['x'] < a['x'] + a['width'] and \
+           a['y'] < b['y'] + b['height'] and b['y'] < a['y'] + a['height']
+
+def _unsafe_signatures(slides_sigs, slides_data, hoisted):
+    """
+    Hoisted elements are drawn by the layout, i.e. below every slide shape.
+    That is only correct if nothing that stays on the slide was painted
+    below them and overlaps them.
+    """
+    unsafe = set()
+    for sigs, slide_data in zip(slides_sigs, slides_data):
+        kept = []
+        for sig, el in zip(sigs, slide_data['elements']):
+            if sig in hoisted:
+                if any(_overlaps(el, other) for other in kept):
+                    unsafe.add(sig)
+            else:
+                kept.append(el)
+    return unsafe
+
+def hoist_slide_chrome(slides_data, min_slides=CHROME_MIN_SLIDES):
+    """
+    Finds elements repeated identically across slides (logos, footers,
+    decorative corners...) and moves them into shared layouts.
+
+    Mutates slides_data: hoisted elements are removed from each slide's
+    'elements' (their ids are kept in 'hoistedIds') and the slide gets a
+    'layout' id. Returns the list of
+    layouts, each {'id', 'elements'}; an element is kept once, with the
+    id of its first occurrence (that is the one captured, if needed).
+    """
+    slides_sigs = _signature_ids(slides_data)
+
+    counts = {}
+    for sigs in slides_sigs:
+        for sig in set(sigs):
+            if sig is not None:
+                counts[sig] = counts.get(sig, 0) + 1
+    hoisted = {sig for sig, n in counts.items() if n >= min_slides}
+
+    # Un-hoisting one element can make another unsafe, so iterate to a fixpoint
+    while hoisted:
+        unsafe = _unsafe_signatures(slides_sigs, slides_data, hoisted)
+        if not unsafe:
+            break
+        hoisted -= unsafe
+
+    if not hoisted:
+        return []
+
+    layouts = {}
+    for sigs, slide_data in zip(slides_sigs, slides_data):
+        chrome_key = tuple(sig for sig in sigs if sig in hoisted)
+        if not chrome_key:
+            continue
+        if chrome_key not in layouts:
+            layouts[chrome_key] = {
+                'id': f"layout_{len(layouts)}",
+                'elements': [el for sig, el in zip(sigs, slide_data['elements']) if sig in hoisted]
+            }
+        slide_data['layout'] = layouts[chrome_key]['id']
+        slide_data['hoistedIds'] = [el['id'] for sig, el in zip(sigs, slide_data['elements']) if sig in hoisted]
+        slide_data['elements'] = [el for sig, el in zip(sigs, slide_data['elements']) if sig not in hoisted]
+
+    return list(layouts.values())
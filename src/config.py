@@ -2,3 +2,17 @@ PPT_WIDTH_PX = 1280
 PPT_HEIGHT_PX = 720
 PX_TO_EMU = 9525  # 1px = 9525 EMU (assuming 96 DPI)
 TEXT_WIDTH_FACTOR = 2  # Adjust width to prevent wrapping issues
+
+# Margin (px) element captures include around the element to catch shadows
+SHADOW_PADDING_PX = 30
+
+# Default deadlines in seconds: page load plus font/image readiness, all
+# browser work on one slide, and any single browser call
+DEFAULT_LOAD_TIMEOUT = 30
+DEFAULT_SLIDE_TIMEOUT = 60
+DEFAULT_STAGE_TIMEOUT = 30
+
+# Defaults of the .pptx optimizer: pictures are kept at up to this many
+# pixels per inch of their placed size, and the zip deflate level (0-9)
+DEFAULT_OPTIMIZE_DPI = 150
+DEFAULT_ZIP_LEVEL = 9
@@ -1,365 +1,1006 @@
+import asyncio
+import base64
 import os
-from config import PPT_WIDTH_PX
+from urllib.parse import unquote_to_bytes, urlparse
+from urllib.request import url2pathname
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, SHADOW_PADDING_PX
 
-class ContentExtractor:
-    def __init__(self, page):
-        self.page = page
+# Page-side runtime, installed once per page as `window.__webppt`. Python
+# calls into it with constant call-site strings and structured arguments,
+# so V8 compiles the large extractor source once instead of on every call.
+RUNTIME_JS = """(() => {
+    if (window.__webppt) return;
 
-    async def extract_elements(self):
-        """
-        Injects JS to find all elements with 'data-ppt-render' attribute
-        and returns their computed styles and coordinates.
-        """
-        return await self.page.evaluate("""() => {
-            // Helper: Check if element text is single line
-            function isSingleLine(el) {
-                const range = document.createRange();
-                range.selectNodeContents(el);
-                const rects = range.getClientRects();
-                if (rects.length === 0) return true;
-                const firstTop = rects[0].top;
-                for (let i = 1; i < rects.length; i++) {
-                    if (Math.abs(rects[i].top - firstTop) > 5) {
-                        return false;
-                    }
+    // Attribute lookup that is safe for any id value
+    function byAttr(name, value) {
+        return document.querySelector(`[${name}="${CSS.escape(value)}"]`);
+    }
+
+    // Isolation state for the element currently being captured
+    let snapshotState = null;
+
+    // Slide range selection: takes unselected slides out of layout before
+    // anything is measured, so they are never laid out or captured, and tags
+    // the selected ones. Returns [container, deck index] pairs.
+    // In windowed mode only part of the deck is attached; opts.indexOffset is
+    // the deck index of the first attached slide.
+    function selectSlides(opts) {
+        const slides = document.querySelectorAll('section.slide');
+        // If no sections found, treat body as one slide (backward compatibility)
+        const slideContainers = slides.length > 0 ? Array.from(slides) : [document.body];
+        const indexOffset = opts.indexOffset || 0;
+        const first = opts.first === undefined ? null : opts.first;
+        const last = opts.last === undefined ? null : opts.last;
+        const selected = [];
+        slideContainers.forEach((slideContainer, localIndex) => {
+            const slideIndex = localIndex + indexOffset;
+            const slideNumber = slideIndex + 1;
+            const outOfRange = (first !== null && slideNumber < first) || (last !== null && slideNumber > last);
+            if (slides.length > 0 && outOfRange) {
+                slideContainer.style.display = 'none';
+            } else {
+                slideContainer.setAttribute('data-ppt-slide-id', `slide_${slideIndex}`);
+                selected.push([slideContainer, slideIndex]);
+            }
+        });
+        return selected;
+    }
+
+    function extractElements(opts) {
+        // Helper: Check if element text is single line
+        function isSingleLine(el) {
+            const range = document.createRange();
+            range.selectNodeContents(el);
+            const rects = range.getClientRects();
+            if (rects.length === 0) return true;
+            const firstTop = rects[0].top;
+            for (let i = 1; i < rects.length; i++) {
+                if (Math.abs(rects[i].top - firstTop) > 5) {
+                    return false;
                 }
-                return true;
             }
+            return true;
+        }
 
-            // Helper: Auto-tag elements with text as 'text' if not already tagged
-            function autoTagTextElements(root) {
-                const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
-                let node;
-                while(node = walker.nextNode()) {
-                    // Skip if already tagged or is the slide itself
-                    if (node.hasAttribute('data-ppt-render') || node.classList.contains('slide')) continue;
-                    
-                    // Skip if inside table or image. Allow inside shape (container).
-                    if (node.closest('[data-ppt-render="table"]') || node.closest('[data-ppt-render="image"]')) continue;
+        function hasDirectText(node) {
+            return Array.from(node.childNodes).some(n =>
+                n.nodeType === Node.TEXT_NODE && n.textContent.trim().length > 0
+            );
+        }
 
-                    // Skip if it contains any already tagged elements (to avoid tagging containers as text)
-                    if (node.querySelector('[data-ppt-render]')) continue;
+        function isInline(node) {
+            return window.getComputedStyle(node).display.startsWith('inline') && node.tagName !== 'IMG' &&
+                   node.tagName !== 'svg';
+        }
 
-                    // Check for direct text content
-                    const hasDirectText = Array.from(node.childNodes).some(n => 
-                        n.nodeType === Node.TEXT_NODE && n.textContent.trim().length > 0
-                    );
-                    
-                    if (hasDirectText) {
-                        // Check if visible
-                        const style = window.getComputedStyle(node);
-                        if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
-                            node.setAttribute('data-ppt-render', 'text');
+        // Helper: An inline element that is part of the text flow of its block
+        // ancestor (the block, or an inline element in between, has own text)
+        function isInlineRun(node) {
+            if (!isInline(node)) return false;
+            let parent = node.parentElement;
+            while (parent && !parent.classList.contains('slide')) {
+                if (hasDirectText(parent)) return true;
+                if (!isInline(parent)) return false;
+                parent = parent.parentElement;
+            }
+            return false;
+        }
+
+        // Helper: Styled runs and breaks of a text block, in one walk over its
+        // text nodes. Returns null if the whole block has a single style.
+        function extractTextRuns(block) {
+            const runs = [];
+            const styleCache = new Map();
+            const RUN_PROPS = ['fontFamily', 'fontSize', 'fontWeight', 'fontStyle', 'color', 'underline', 'href'];
+
+            function runStyle(node) {
+                if (styleCache.has(node)) return styleCache.get(node);
+                const s = window.getComputedStyle(node);
+                const link = node.closest('a');
+                const style = {
+                    fontFamily: s.fontFamily,
+                    fontSize: s.fontSize,
+                    fontWeight: s.fontWeight,
+                    fontStyle: s.fontStyle,
+                    color: s.color,
+                    underline: s.textDecorationLine.includes('underline'),
+                    href: link ? link.href : null,
+                    pre: s.whiteSpace.startsWith('pre') || s.whiteSpace === 'break-spaces',
+                    transform: s.textTransform
+                };
+                styleCache.set(node, style);
+                return style;
+            }
+
+            // text-transform as the browser paints it (textContent is untransformed);
+            // prev is the run text before this node, so capitalize spans nodes
+            function transformText(text, transform, prev) {
+                if (transform === 'uppercase') return text.toUpperCase();
+                if (transform === 'lowercase') return text.toLowerCase();
+                if (transform !== 'capitalize') return text;
+                const before = prev.slice(-1);
+                return (before + text).replace(/(^|[^\\p{L}\\p{N}'\\u2019])(\\p{L})/gu,
+                                               (m, sep, letter) => sep + letter.toUpperCase()).slice(before.length);
+            }
+
+            function sameStyle(a, b) {
+                return RUN_PROPS.every(prop => a[prop] === b[prop]);
+            }
+
+            function pushBreak(kind) {
+                const last = runs[runs.length - 1];
+                if (!last) return;
+                if (last.break) {
+                    if (kind === 'paragraph') last.break = kind;
+                    return;
+                }
+                runs.push({break: kind});
+            }
+
+            function walk(node) {
+                node.childNodes.forEach(child => {
+                    if (child.nodeType === Node.TEXT_NODE) {
+                        const style = runStyle(child.parentElement);
+                        let text = child.textContent;
+                        // CSS collapses only these, unlike \\s (which also matches &nbsp;)
+                        if (!style.pre) text = text.replace(/[ \\t\\n\\r\\f]+/g, ' ');
+                        if (!text) return;
+                        const last = runs[runs.length - 1];
+                        text = transformText(text, style.transform, last && !last.break ? last.text : '');
+                        if (last && !last.break && sameStyle(last, style)) {
+                            last.text += text;
+                        } else {
+                            runs.push(Object.assign({text}, style));
                         }
+                    } else if (child.nodeType === Node.ELEMENT_NODE) {
+                        if (child.tagName === 'BR') {
+                            runs.push({break: 'line'});
+                            return;
+                        }
+                        const display = window.getComputedStyle(child).display;
+                        if (display === 'none') return;
+                        const isBlock = !display.startsWith('inline');
+                        if (isBlock) pushBreak('paragraph');
+                        walk(child);
+                        if (isBlock) pushBreak('paragraph');
                     }
+                });
+            }
+            walk(block);
+
+            // Collapsed whitespace does not survive at line starts and ends or twice in a row
+            let afterSpace = true;
+            runs.forEach((run, i) => {
+                if (run.break) {
+                    afterSpace = true;
+                    return;
+                }
+                if (!run.pre) {
+                    if (afterSpace) run.text = run.text.replace(/^ /, '');
+                    const next = runs[i + 1];
+                    if (!next || next.break) run.text = run.text.replace(/ $/, '');
                 }
+                if (run.text) afterSpace = !run.pre && run.text.endsWith(' ');
+            });
+
+            const result = runs.filter(run => run.break || run.text);
+            while (result.length && result[result.length - 1].break) result.pop();
+            result.forEach(run => {
+                delete run.pre;
+                delete run.transform;
+            });
+
+            const textRuns = result.filter(run => !run.break);
+            const styled = result.length !== textRuns.length ||
+                           textRuns.some(run => !sameStyle(run, textRuns[0]));
+            return styled ? result : null;
+        }
+
+        // Helper: Chart type and series data of a data-ppt-render="chart" element,
+        // or null if its data-chart JSON is missing or malformed
+        function extractChartData(el) {
+            let data;
+            try {
+                data = JSON.parse(el.getAttribute('data-chart') || '');
+            } catch (e) {
+                return null;
             }
+            if (!data || !Array.isArray(data.categories) || !Array.isArray(data.series) || !data.series.length) return null;
 
-            // Helper: Auto-tag container elements as 'shape'
-            function autoTagContainerElements(root) {
-                const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
-                let node;
-                while(node = walker.nextNode()) {
-                    if (node.hasAttribute('data-ppt-render') || node.classList.contains('slide')) continue;
-                    
-                    // Skip if inside table
-                    if (node.closest('[data-ppt-render="table"]')) continue;
+            // Any CSS color, resolved to rgb()/rgba() like computed styles
+            const resolveColor = value => {
+                if (!value) return null;
+                const probe = document.createElement('span');
+                probe.style.color = value;
+                if (!probe.style.color) return null;
+                el.appendChild(probe);
+                const color = window.getComputedStyle(probe).color;
+                probe.remove();
+                return color;
+            };
+
+            return {
+                type: el.getAttribute('data-chart-type') || 'bar',
+                title: data.title ? String(data.title) : null,
+                categories: data.categories.map(String),
+                series: data.series.map((series, index) => ({
+                    name: series.name !== undefined ? String(series.name) : `Series ${index + 1}`,
+                    values: (series.values || []).map(v => v === null || v === '' || isNaN(Number(v)) ? null : Number(v)),
+                    color: resolveColor(series.color)
+                })),
+                colors: Array.isArray(data.colors) ? data.colors.map(resolveColor) : null,
+                legend: data.legend === undefined ? null : Boolean(data.legend)
+            };
+        }
 
+        // Helper: Auto-tag elements with text as 'text' if not already tagged
+        function autoTagTextElements(root) {
+            const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
+            let node;
+            while(node = walker.nextNode()) {
+                // Skip if already tagged or is the slide itself
+                if (node.hasAttribute('data-ppt-render') || node.classList.contains('slide')) continue;
+            
+                // Skip if inside table, image or chart. Allow inside shape (container).
+                if (node.closest('[data-ppt-render="table"], [data-ppt-render="image"], [data-ppt-render="chart"]')) continue;
+
+                // Skip if it contains any already tagged elements (to avoid tagging containers as text)
+                if (node.querySelector('[data-ppt-render]')) continue;
+
+                // Inline runs (<b>, <a>, <span>...) inside a block's text flow are
+                // extracted as styled runs of that block, not as separate boxes
+                if (isInlineRun(node)) continue;
+
+                // Check for direct text content
+                if (hasDirectText(node)) {
+                    // Check if visible
                     const style = window.getComputedStyle(node);
-                    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') continue;
-
-                    // Check for background or border
-                    const hasBg = style.backgroundColor !== 'rgba(0, 0, 0, 0)' && style.backgroundColor !== 'transparent';
-                    const hasBorder = (parseFloat(style.borderTopWidth) > 0 && style.borderTopStyle !== 'none') ||
-                                      (parseFloat(style.borderBottomWidth) > 0 && style.borderBottomStyle !== 'none') ||
-                                      (parseFloat(style.borderLeftWidth) > 0 && style.borderLeftStyle !== 'none') ||
-                                      (parseFloat(style.borderRightWidth) > 0 && style.borderRightStyle !== 'none');
-                    
-                    // Also check for specific classes like 'card' as a heuristic
-                    const isCard = node.classList.contains('card');
-                                      
-                    if (hasBg || hasBorder || isCard) {
-                        node.setAttribute('data-ppt-render', 'shape');
+                    if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
+                        node.setAttribute('data-ppt-render', 'text');
                     }
                 }
             }
+        }
+
+        // Helper: Auto-tag container elements as 'shape'
+        function autoTagContainerElements(root) {
+            const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
+            let node;
+            while(node = walker.nextNode()) {
+                if (node.hasAttribute('data-ppt-render') || node.classList.contains('slide')) continue;
+            
+                // Skip if inside table or chart (a chart's own drawing is not exported)
+                if (node.closest('[data-ppt-render="table"], [data-ppt-render="chart"]')) continue;
+
+                const style = window.getComputedStyle(node);
+                if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') continue;
+
+                // Check for background or border
+                const hasBg = style.backgroundColor !== 'rgba(0, 0, 0, 0)' && style.backgroundColor !== 'transparent';
+                const hasBorder = (parseFloat(style.borderTopWidth) > 0 && style.borderTopStyle !== 'none') ||
+                                  (parseFloat(style.borderBottomWidth) > 0 && style.borderBottomStyle !== 'none') ||
+                                  (parseFloat(style.borderLeftWidth) > 0 && style.borderLeftStyle !== 'none') ||
+                                  (parseFloat(style.borderRightWidth) > 0 && style.borderRightStyle !== 'none');
+            
+                // Also check for specific classes like 'card' as a heuristic
+                const isCard = node.classList.contains('card');
+                              
+                if (hasBg || hasBorder || isCard) {
+                    node.setAttribute('data-ppt-render', 'shape');
+                }
+            }
+        }
 
-            // Find all slide sections
-            const slides = document.querySelectorAll('section.slide');
-            const allSlidesData = [];
+        const allSlidesData = [];
 
-            function getComputedStyles(el) {
-                const s = window.getComputedStyle(el);
-                return {
-                    color: s.color,
-                    fontSize: s.fontSize,
-                    fontFamily: s.fontFamily,
-                    fontWeight: s.fontWeight,
-                    textAlign: s.textAlign,
-                    opacity: s.opacity,
-                    boxShadow: s.boxShadow,
-                    backgroundColor: s.backgroundColor,
-                    backgroundImage: s.backgroundImage,
-                    borderRadius: s.borderRadius,
-                    borderTopWidth: s.borderTopWidth,
-                    borderTopColor: s.borderTopColor,
-                    borderTopStyle: s.borderTopStyle,
-                    borderBottomWidth: s.borderBottomWidth,
-                    borderBottomColor: s.borderBottomColor,
-                    borderBottomStyle: s.borderBottomStyle,
-                    borderLeftWidth: s.borderLeftWidth,
-                    borderLeftColor: s.borderLeftColor,
-                    borderLeftStyle: s.borderLeftStyle,
-                    borderRightWidth: s.borderRightWidth,
-                    borderRightColor: s.borderRightColor,
-                    borderRightStyle: s.borderRightStyle,
-                    lineHeight: s.lineHeight,
-                    letterSpacing: s.letterSpacing,
-                    display: s.display,
-                    alignItems: s.alignItems,
-                    justifyContent: s.justifyContent,
-                    flexDirection: s.flexDirection,
-                    mixBlendMode: s.mixBlendMode,
-                    backdropFilter: s.backdropFilter,
-                    webkitBackdropFilter: s.webkitBackdropFilter
-                };
+        // Helper: Opacity multiplies down the tree, so the rendered opacity of an
+        // element is the product of its own and its ancestors' (up to the slide)
+        const opacityCache = new Map();
+        function effectiveOpacity(node, slideContainer) {
+            if (!node || node === slideContainer.parentElement) return 1;
+            if (opacityCache.has(node)) return opacityCache.get(node);
+            const value = parseFloat(window.getComputedStyle(node).opacity) *
+                          effectiveOpacity(node.parentElement, slideContainer);
+            opacityCache.set(node, value);
+            return value;
+        }
+
+        function isTransparent(color) {
+            return color === 'rgba(0, 0, 0, 0)' || color === 'transparent';
+        }
+
+        // Helper: Anything that changes how an image is painted (and so needs a screenshot)
+        function hasPaintEffects(s) {
+            const mask = s.maskImage || s.webkitMaskImage || 'none';
+            return s.filter !== 'none' || s.mixBlendMode !== 'normal' || s.clipPath !== 'none' ||
+                   mask !== 'none' || (s.backdropFilter || 'none') !== 'none' || s.transform !== 'none' ||
+                   s.boxShadow !== 'none' || parseFloat(s.opacity) < 1 || parseFloat(s.borderTopLeftRadius) > 0 ||
+                   parseFloat(s.borderTopRightRadius) > 0 || parseFloat(s.borderBottomLeftRadius) > 0 ||
+                   parseFloat(s.borderBottomRightRadius) > 0;
+        }
+
+        function hasBoxPaint(s) {
+            return !isTransparent(s.backgroundColor) || s.backgroundImage !== 'none' ||
+                   ['Top', 'Right', 'Bottom', 'Left'].some(side =>
+                       parseFloat(s[`border${side}Width`]) > 0 && s[`border${side}Style`] !== 'none');
+        }
+
+        // Presentation properties that may come from page CSS and must be inlined
+        // so a serialized SVG renders the same outside the page
+        const SVG_PAINT_PROPS = ['fill', 'fill-opacity', 'fill-rule', 'stroke', 'stroke-width', 'stroke-opacity',
+                                 'stroke-linecap', 'stroke-linejoin', 'stroke-dasharray', 'opacity',
+                                 'stop-color', 'stop-opacity', 'font-family', 'font-size', 'font-weight'];
+
+        function serializeSvg(svg, rect) {
+            // <use> pointing outside this svg (sprite sheets) cannot be embedded standalone
+            const external = Array.from(svg.querySelectorAll('use')).some(u => {
+                const href = u.getAttribute('href') || u.getAttribute('xlink:href') || '';
+                return !href.startsWith('#') || !svg.querySelector('#' + CSS.escape(href.slice(1)));
+            });
+            if (external) return null;
+
+            const clone = svg.cloneNode(true);
+            const srcNodes = [svg, ...svg.querySelectorAll('*')];
+            const dstNodes = [clone, ...clone.querySelectorAll('*')];
+            srcNodes.forEach((node, i) => {
+                const cs = window.getComputedStyle(node);
+                dstNodes[i].setAttribute('style', SVG_PAINT_PROPS.map(p => `${p}:${cs.getPropertyValue(p)}`).join(';'));
+            });
+            clone.setAttribute('width', rect.width);
+            clone.setAttribute('height', rect.height);
+            return new XMLSerializer().serializeToString(clone);
+        }
+
+        // Helper: Whether an ancestor below the slide clips or masks what it
+        // contains (e.g. a rounded card with overflow: hidden around an image)
+        function isClippedByAncestor(node, slideContainer) {
+            for (let parent = node.parentElement; parent && parent !== slideContainer; parent = parent.parentElement) {
+                const s = window.getComputedStyle(parent);
+                const mask = s.maskImage || s.webkitMaskImage || 'none';
+                if (s.overflowX !== 'visible' || s.overflowY !== 'visible' || s.clipPath !== 'none' ||
+                    mask !== 'none' || (s.clip && s.clip !== 'auto')) return true;
             }
+            return false;
+        }
 
-            // If no sections found, treat body as one slide (backward compatibility)
-            let slideContainers = slides.length > 0 ? Array.from(slides) : [document.body];
+        // Helper: Describe the original asset of an image element, or null if it
+        // has to be captured. Accepts a bare <img>/<svg> or a plain wrapper around one.
+        function extractImageSource(el, slideContainer, slideRect) {
+            const isMedia = node => ['img', 'svg'].includes(node.tagName.toLowerCase());
+            let target = el;
+            if (!isMedia(el)) {
+                const hasText = Array.from(el.childNodes).some(n =>
+                    n.nodeType === Node.TEXT_NODE && n.textContent.trim().length > 0);
+                if (hasText || el.children.length !== 1 || !isMedia(el.children[0])) return null;
+                const wrapperStyle = window.getComputedStyle(el);
+                if (hasPaintEffects(wrapperStyle) || hasBoxPaint(wrapperStyle)) return null;
+                target = el.children[0];
+            }
 
-            slideContainers.forEach((slideContainer, slideIndex) => {
-                slideContainer.setAttribute('data-ppt-slide-id', `slide_${slideIndex}`);
-                
-                // Run auto-tagging for this slide
-                autoTagContainerElements(slideContainer);
-                autoTagTextElements(slideContainer);
-
-                // Filter elements to avoid duplication
-                const rawElements = Array.from(slideContainer.querySelectorAll('[data-ppt-render]'));
-                const elements = rawElements.filter(el => {
-                    const parent = el.parentElement.closest('[data-ppt-render]');
-                    if (!parent) return true;
-                    
-                    const parentType = parent.getAttribute('data-ppt-render');
-                    // Only allow children if parent is a shape (container)
-                    if (parentType === 'shape') return true;
-                    
-                    return false;
+            const s = window.getComputedStyle(target);
+            if (hasPaintEffects(s) || hasBoxPaint(s)) return null;
+            if (effectiveOpacity(target, slideContainer) < 1) return null;
+            if (isClippedByAncestor(target, slideContainer)) return null;
+            // The asset is placed over the whole box, so the content box must be the box
+            if (['Top', 'Right', 'Bottom', 'Left'].some(side => parseFloat(s[`padding${side}`]) > 0)) return null;
+
+            const rect = target.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return null;
+            const geometry = {
+                x: rect.x - slideRect.x,
+                y: rect.y - slideRect.y,
+                width: rect.width,
+                height: rect.height
+            };
+
+            if (target.tagName.toLowerCase() === 'img') {
+                if (!target.complete || !target.naturalWidth) return null;
+                // Only the default stretch-to-box placement is reproduced
+                if (s.objectFit !== 'fill' || s.objectPosition !== '50% 50%') return null;
+                return Object.assign({
+                    kind: 'img',
+                    url: target.currentSrc || target.src,
+                    naturalWidth: target.naturalWidth,
+                    naturalHeight: target.naturalHeight
+                }, geometry);
+            }
+
+            const svgText = serializeSvg(target, rect);
+            if (!svgText) return null;
+            return Object.assign({kind: 'svg', svg: svgText}, geometry);
+        }
+
+        // Helper: Extract a table as a grid with row/col spans in a single pass.
+        // Cells only read the styles the table writer uses.
+        function extractTableGrid(tableEl) {
+            const tableRect = tableEl.getBoundingClientRect();
+            const rows = Array.from(tableEl.rows);
+            const occupied = rows.map(() => []);
+            const colLeft = [];
+            const rowHeights = [];
+            const cells = [];
+
+            rows.forEach((row, r) => {
+                const rowBg = window.getComputedStyle(row).backgroundColor;
+                rowHeights.push(row.getBoundingClientRect().height);
+                let c = 0;
+                Array.from(row.cells).forEach(cell => {
+                    while (occupied[r][c]) c++;
+                    // rowSpan 0 means "to the end of the table"
+                    const rowSpan = Math.min(cell.rowSpan === 0 ? rows.length : cell.rowSpan, rows.length - r);
+                    const colSpan = Math.max(1, cell.colSpan);
+                    for (let dr = 0; dr < rowSpan; dr++) {
+                        for (let dc = 0; dc < colSpan; dc++) occupied[r + dr][c + dc] = true;
+                    }
+
+                    if (colLeft[c] === undefined) {
+                        colLeft[c] = cell.getBoundingClientRect().left - tableRect.left;
+                    }
+
+                    const s = window.getComputedStyle(cell);
+                    // Inherit background from row if transparent
+                    const bg = isTransparent(s.backgroundColor) && !isTransparent(rowBg) ? rowBg : s.backgroundColor;
+                    cells.push({
+                        row: r,
+                        col: c,
+                        rowSpan: rowSpan,
+                        colSpan: colSpan,
+                        text: cell.innerText,
+                        styles: {
+                            color: s.color,
+                            fontSize: s.fontSize,
+                            fontWeight: s.fontWeight,
+                            fontFamily: s.fontFamily,
+                            textAlign: s.textAlign,
+                            backgroundColor: bg
+                        }
+                    });
+                    c += colSpan;
                 });
-                const slideResults = [];
-                
-                // Get slide offset to normalize coordinates relative to the slide
-                const slideRect = slideContainer.getBoundingClientRect();
-                
-                // Determine Slide Background Color
-                // Logic: Start with the section's background. 
-                // If the first child covers the entire section and has a background, use that instead.
-                let slideStyles = getComputedStyles(slideContainer);
-                let finalBgColor = slideStyles.backgroundColor;
-                let finalBgImage = slideStyles.backgroundImage;
-
-                const firstChild = slideContainer.firstElementChild;
-                if (firstChild) {
-                     const childStyles = getComputedStyles(firstChild);
-                     const childRect = firstChild.getBoundingClientRect();
-                     
-                     // Check if child covers the slide (approximate check for float precision)
-                     const covers = Math.abs(childRect.width - slideRect.width) < 2 && 
-                                    Math.abs(childRect.height - slideRect.height) < 2;
-                     
-                     const hasBgColor = childStyles.backgroundColor !== 'rgba(0, 0, 0, 0)' && childStyles.backgroundColor !== 'transparent';
-                     const hasBgImage = childStyles.backgroundImage !== 'none' && childStyles.backgroundImage !== '';
-
-                     if (covers && (hasBgColor || hasBgImage)) {
-                         finalBgColor = childStyles.backgroundColor;
-                         finalBgImage = childStyles.backgroundImage;
+            });
+
+            // Column boundaries: columns no cell starts in (fully spanned) are interpolated
+            const numCols = Math.max(0, ...occupied.map(o => o.length));
+            if (colLeft[0] === undefined) colLeft[0] = 0;
+            colLeft[numCols] = tableRect.width;
+            for (let c = 1; c < numCols; c++) {
+                if (colLeft[c] === undefined) {
+                    let next = c + 1;
+                    while (colLeft[next] === undefined) next++;
+                    colLeft[c] = colLeft[c - 1] + (colLeft[next] - colLeft[c - 1]) / (next - c + 1);
+                }
+            }
+            const colWidths = [];
+            for (let c = 0; c < numCols; c++) colWidths.push(Math.max(1, colLeft[c + 1] - colLeft[c]));
+
+            return {colWidths: colWidths, rowHeights: rowHeights, cells: cells};
+        }
+
+        function getComputedStyles(el) {
+            const s = window.getComputedStyle(el);
+            return {
+                color: s.color,
+                fontSize: s.fontSize,
+                fontFamily: s.fontFamily,
+                fontWeight: s.fontWeight,
+                textAlign: s.textAlign,
+                opacity: s.opacity,
+                boxShadow: s.boxShadow,
+                backgroundColor: s.backgroundColor,
+                backgroundImage: s.backgroundImage,
+                borderRadius: s.borderRadius,
+                borderTopWidth: s.borderTopWidth,
+                borderTopColor: s.borderTopColor,
+                borderTopStyle: s.borderTopStyle,
+                borderBottomWidth: s.borderBottomWidth,
+                borderBottomColor: s.borderBottomColor,
+                borderBottomStyle: s.borderBottomStyle,
+                borderLeftWidth: s.borderLeftWidth,
+                borderLeftColor: s.borderLeftColor,
+                borderLeftStyle: s.borderLeftStyle,
+                borderRightWidth: s.borderRightWidth,
+                borderRightColor: s.borderRightColor,
+                borderRightStyle: s.borderRightStyle,
+                lineHeight: s.lineHeight,
+                letterSpacing: s.letterSpacing,
+                display: s.display,
+                alignItems: s.alignItems,
+                justifyContent: s.justifyContent,
+                flexDirection: s.flexDirection,
+                mixBlendMode: s.mixBlendMode,
+                backdropFilter: s.backdropFilter,
+                webkitBackdropFilter: s.webkitBackdropFilter
+            };
+        }
+
+        // Slide range selection, then (per-slide extraction) just the one slide
+        let selectedSlides = selectSlides(opts);
+        if (opts.only !== undefined && opts.only !== null) {
+            selectedSlides = selectedSlides.filter(([, slideIndex]) => slideIndex === opts.only);
+        }
+
+        selectedSlides.forEach(([slideContainer, slideIndex]) => {
+            // Run auto-tagging for this slide
+            autoTagContainerElements(slideContainer);
+            autoTagTextElements(slideContainer);
+
+            // Filter elements to avoid duplication
+            const rawElements = Array.from(slideContainer.querySelectorAll('[data-ppt-render]'));
+            const elements = rawElements.filter(el => {
+                const parent = el.parentElement.closest('[data-ppt-render]');
+                if (!parent) return true;
+            
+                const parentType = parent.getAttribute('data-ppt-render');
+                // Only allow children if parent is a shape (container)
+                if (parentType === 'shape') return true;
+            
+                return false;
+            });
+            const slideResults = [];
+        
+            // Get slide offset to normalize coordinates relative to the slide
+            const slideRect = slideContainer.getBoundingClientRect();
+        
+            // Determine Slide Background Color
+            // Logic: Start with the section's background. 
+            // If the first child covers the entire section and has a background, use that instead.
+            let slideStyles = getComputedStyles(slideContainer);
+            let finalBgColor = slideStyles.backgroundColor;
+            let finalBgImage = slideStyles.backgroundImage;
+
+            const firstChild = slideContainer.firstElementChild;
+            if (firstChild) {
+                 const childStyles = getComputedStyles(firstChild);
+                 const childRect = firstChild.getBoundingClientRect();
+             
+                 // Check if child covers the slide (approximate check for float precision)
+                 const covers = Math.abs(childRect.width - slideRect.width) < 2 && 
+                                Math.abs(childRect.height - slideRect.height) < 2;
+             
+                 const hasBgColor = childStyles.backgroundColor !== 'rgba(0, 0, 0, 0)' && childStyles.backgroundColor !== 'transparent';
+                 const hasBgImage = childStyles.backgroundImage !== 'none' && childStyles.backgroundImage !== '';
+
+                 if (covers && (hasBgColor || hasBgImage)) {
+                     finalBgColor = childStyles.backgroundColor;
+                     finalBgImage = childStyles.backgroundImage;
+                 }
+            }
+            slideStyles.backgroundColor = finalBgColor;
+            slideStyles.backgroundImage = finalBgImage;
+
+            elements.forEach((el, index) => {
+                const rect = el.getBoundingClientRect();
+                const styles = getComputedStyles(el);
+            
+                // Unique ID including slide index
+                const uniqueId = `slide_${slideIndex}_el_${index}`;
+                el.setAttribute('data-ppt-id', uniqueId);
+
+                // Determine text content
+                // If it's a shape and has rendered children, suppress text to avoid duplication
+                let textContent = el.innerText;
+                if (el.getAttribute('data-ppt-render') === 'shape') {
+                     if (el.querySelector('[data-ppt-render]')) {
+                         textContent = "";
                      }
                 }
-                slideStyles.backgroundColor = finalBgColor;
-                slideStyles.backgroundImage = finalBgImage;
 
-                elements.forEach((el, index) => {
-                    const rect = el.getBoundingClientRect();
-                    const styles = getComputedStyles(el);
-                    
-                    // Unique ID including slide index
-                    const uniqueId = `slide_${slideIndex}_el_${index}`;
-                    el.setAttribute('data-ppt-id', uniqueId);
-
-                    // Determine text content
-                    // If it's a shape and has rendered children, suppress text to avoid duplication
-                    let textContent = el.innerText;
-                    if (el.getAttribute('data-ppt-render') === 'shape') {
-                         if (el.querySelector('[data-ppt-render]')) {
-                             textContent = "";
-                         }
-                    }
+                const item = {
+                    id: uniqueId,
+                    type: el.getAttribute('data-ppt-render'),
+                    text: textContent,
+                    isSingleLine: isSingleLine(el),
+                    effectiveOpacity: effectiveOpacity(el, slideContainer),
+                    href: el.tagName === 'A' ? el.href : (el.closest('a') ? el.closest('a').href : null),
+                    // Coordinates relative to the slide container
+                    x: rect.x - slideRect.x,
+                    y: rect.y - slideRect.y,
+                    width: rect.width,
+                    height: rect.height,
+                    styles: styles,
+                    children: [],
+                    table: null // For tables: {colWidths, rowHeights, cells}
+                };
 
-                    const item = {
-                        id: uniqueId,
-                        type: el.getAttribute('data-ppt-render'),
-                        text: textContent,
-                        isSingleLine: isSingleLine(el),
-                        href: el.tagName === 'A' ? el.href : (el.closest('a') ? el.closest('a').href : null),
-                        // Coordinates relative to the slide container
-                        x: rect.x - slideRect.x,
-                        y: rect.y - slideRect.y,
-                        width: rect.width,
-                        height: rect.height,
-                        styles: styles,
-                        children: [],
-                        rows: [] // For tables
-                    };
-
-                    // Table Handling
-                    if (item.type === 'table') {
-                        const rows = el.querySelectorAll('tr');
-                        rows.forEach(row => {
-                            const rowData = [];
-                            const rowStyles = getComputedStyles(row);
-                            const cells = row.querySelectorAll('td, th');
-                            cells.forEach(cell => {
-                                const cellRect = cell.getBoundingClientRect();
-                                const cellStyles = getComputedStyles(cell);
-                                
-                                // Inherit background from row if transparent
-                                if ((cellStyles.backgroundColor === 'rgba(0, 0, 0, 0)' || cellStyles.backgroundColor === 'transparent') &&
-                                    (rowStyles.backgroundColor !== 'rgba(0, 0, 0, 0)' && rowStyles.backgroundColor !== 'transparent')) {
-                                    cellStyles.backgroundColor = rowStyles.backgroundColor;
-                                }
+                // Mixed inline styles, links and line breaks become runs of one text box
+                if ((item.type === 'text' || item.type === 'shape') && textContent.trim()) {
+                    item.runs = extractTextRuns(el);
+                }
 
-                                rowData.push({
-                                    text: cell.innerText,
-                                    width: cellRect.width,
-                                    height: cellRect.height,
-                                    styles: cellStyles
-                                });
-                            });
-                            item.rows.push(rowData);
-                        });
+                // Table Handling
+                if (item.type === 'table') {
+                    item.table = extractTableGrid(el);
+                }
+
+                // Charts become native charts from their data; without usable
+                // data they are captured like an image
+                if (item.type === 'chart') {
+                    item.text = '';
+                    item.chart = extractChartData(el);
+                    if (!item.chart) {
+                        item.type = 'image';
+                        item.invalidChart = true;
                     }
+                }
 
-                    // If it's an image container, look for text children to make editable
-                    if (item.type === 'image') {
-                        const textNodes = [];
-                        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null, false);
-                        let node;
-                        while(node = walker.nextNode()) {
-                            if (node.textContent.trim().length > 0) {
-                                let parent = node.parentElement;
-                                // Check if parent is suitable for extraction
-                                // We only want to extract text that doesn't have its own "box" styling (bg, border)
-                                // because if we hide it, we lose that styling in the screenshot.
-                                const pStyle = window.getComputedStyle(parent);
-                                const hasBg = pStyle.backgroundColor !== 'rgba(0, 0, 0, 0)' && pStyle.backgroundColor !== 'transparent';
-                                const hasBorder = (parseFloat(pStyle.borderTopWidth) > 0 && pStyle.borderTopStyle !== 'none');
-                                
-                                if (!hasBg && !hasBorder) {
-                                    if (!textNodes.includes(parent)) {
-                                        textNodes.push(parent);
-                                    }
+                // If it's an image container, look for text children to make editable
+                if (item.type === 'image') {
+                    const textNodes = [];
+                    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null, false);
+                    let node;
+                    while(node = walker.nextNode()) {
+                        if (node.textContent.trim().length > 0) {
+                            let parent = node.parentElement;
+                            // Check if parent is suitable for extraction
+                            // We only want to extract text that doesn't have its own "box" styling (bg, border)
+                            // because if we hide it, we lose that styling in the screenshot.
+                            const pStyle = window.getComputedStyle(parent);
+                            const hasBg = pStyle.backgroundColor !== 'rgba(0, 0, 0, 0)' && pStyle.backgroundColor !== 'transparent';
+                            const hasBorder = (parseFloat(pStyle.borderTopWidth) > 0 && pStyle.borderTopStyle !== 'none');
+                        
+                            if (!hasBg && !hasBorder) {
+                                if (!textNodes.includes(parent)) {
+                                    textNodes.push(parent);
                                 }
                             }
                         }
+                    }
 
-                        textNodes.forEach((childEl, childIndex) => {
-                            const childRect = childEl.getBoundingClientRect();
-                            const childStyles = getComputedStyles(childEl);
-                            const childId = `${uniqueId}_child_${childIndex}`;
-                            childEl.setAttribute('data-ppt-child-id', childId);
-                            
-                            item.children.push({
-                                id: childId,
-                                text: childEl.innerText,
-                                isSingleLine: isSingleLine(childEl),
-                                // Relative coordinates
-                                x: childRect.x - slideRect.x,
-                                y: childRect.y - slideRect.y,
-                                width: childRect.width,
-                                height: childRect.height,
-                                styles: childStyles
-                            });
+                    textNodes.forEach((childEl, childIndex) => {
+                        const childRect = childEl.getBoundingClientRect();
+                        const childStyles = getComputedStyles(childEl);
+                        const childId = `${uniqueId}_child_${childIndex}`;
+                        childEl.setAttribute('data-ppt-child-id', childId);
+                    
+                        item.children.push({
+                            id: childId,
+                            text: childEl.innerText,
+                            isSingleLine: isSingleLine(childEl),
+                            effectiveOpacity: effectiveOpacity(childEl, slideContainer),
+                            // Relative coordinates
+                            x: childRect.x - slideRect.x,
+                            y: childRect.y - slideRect.y,
+                            width: childRect.width,
+                            height: childRect.height,
+                            styles: childStyles
                         });
+                    });
+
+                    // A bare <img>/<svg> without effects can be embedded from its original asset
+                    if (item.children.length === 0) {
+                        item.source = extractImageSource(el, slideContainer, slideRect);
                     }
+                }
 
-                    slideResults.push(item);
-                });
-                allSlidesData.push({
-                    id: `slide_${slideIndex}`,
-                    elements: slideResults,
-                    backgroundColor: slideStyles.backgroundColor,
-                    backgroundImage: slideStyles.backgroundImage
-                });
+                slideResults.push(item);
             });
-            
-            return allSlidesData;
-        }""")
+            allSlidesData.push({
+                id: `slide_${slideIndex}`,
+                elements: slideResults,
+                backgroundColor: slideStyles.backgroundColor,
+                backgroundImage: slideStyles.backgroundImage
+            });
+        });
+    
+        return allSlidesData;
+    }
+
+    // Renders SVG source to a PNG data URL (the fallback PowerPoint shows
+    // when it cannot draw the vector version)
+    async function rasterizeSvg(svgText, width, height, scale) {
+        const img = new Image();
+        img.src = 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svgText);
+        await img.decode();
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.max(1, Math.round(width * scale));
+        canvas.height = Math.max(1, Math.round(height * scale));
+        canvas.getContext('2d').drawImage(img, 0, 0, canvas.width, canvas.height);
+        return canvas.toDataURL('image/png');
+    }
+
+    function setVisibility(ids, value) {
+        ids.forEach(id => {
+            const el = byAttr('data-ppt-id', id);
+            if (el) el.style.visibility = value;
+        });
+    }
+
+    function setChildOpacity(ids, value) {
+        ids.forEach(id => {
+            const el = byAttr('data-ppt-child-id', id);
+            if (el) el.style.opacity = value;
+        });
+    }
+
+    // Hides everything on the slide except the target elements (and their text
+    // children) and returns the union of their bounding boxes
+    function isolateElements(slideId, elIds, childIds) {
+        const slide = byAttr('data-ppt-slide-id', slideId);
+        const targets = elIds.map(id => byAttr('data-ppt-id', id));
+
+        // Check for backdrop-filter
+        const hasBackdropFilter = targets.some(targetEl => {
+            const style = window.getComputedStyle(targetEl);
+            return style.backdropFilter !== 'none' && style.backdropFilter !== undefined ||
+                   style.webkitBackdropFilter !== 'none' && style.webkitBackdropFilter !== undefined;
+        });
+
+        snapshotState = {
+            slide: slide,
+            slideBg: slide.style.background,
+            bodyBg: document.body.style.background,
+            siblingsVisibility: [],
+            childIds: childIds
+        };
+
+        // Only hide background if no backdrop-filter is present
+        if (!hasBackdropFilter) {
+            slide.style.background = 'transparent';
+            document.body.style.background = 'transparent';
+        }
+
+        const allEls = slide.querySelectorAll('[data-ppt-render]');
+        allEls.forEach(e => {
+            const related = targets.some(targetEl => e === targetEl || targetEl.contains(e) || e.contains(targetEl));
+            if (!related) {
+                snapshotState.siblingsVisibility.push({el: e, val: e.style.visibility});
+                e.style.visibility = 'hidden';
+            }
+        });
+
+        // Hide text children, they are rendered natively on top
+        setChildOpacity(childIds, '0');
+
+        let box = null;
+        targets.forEach(targetEl => {
+            const rect = targetEl.getBoundingClientRect();
+            if (rect.width === 0 && rect.height === 0) return;
+            if (!box) {
+                box = {left: rect.left, top: rect.top, right: rect.right, bottom: rect.bottom};
+            } else {
+                box.left = Math.min(box.left, rect.left);
+                box.top = Math.min(box.top, rect.top);
+                box.right = Math.max(box.right, rect.right);
+                box.bottom = Math.max(box.bottom, rect.bottom);
+            }
+        });
+        if (!box) return null;
+        return {x: box.left, y: box.top, width: box.right - box.left, height: box.bottom - box.top};
+    }
+
+    function restoreIsolation() {
+        const state = snapshotState;
+        if (!state) return;
+        setChildOpacity(state.childIds, '1');
+        state.slide.style.background = state.slideBg;
+        document.body.style.background = state.bodyBg;
+        state.siblingsVisibility.forEach(item => {
+            item.el.style.visibility = item.val;
+        });
+        snapshotState = null;
+    }
+
+    // Flattened (degraded) slides: text is made transparent in the screenshot
+    // and overlaid natively instead
+    let textSnapshot = null;
+
+    // A stylesheet rule rather than inline styles, so descendants with their
+    // own color (spans, links, the styled runs) are made transparent too
+    function hideText(ids, childIds) {
+        restoreText();
+        const style = document.createElement('style');
+        const selectors = ids.map(id => `[data-ppt-id="${CSS.escape(id)}"]`);
+        if (selectors.length) {
+            style.textContent = selectors.map(sel => `${sel}, ${sel} *`).join(', ') +
+                ' {color: transparent !important; -webkit-text-fill-color: transparent !important; text-shadow: none !important}';
+        }
+        (document.head || document.documentElement).appendChild(style);
+        textSnapshot = {style: style, childIds: childIds};
+        setChildOpacity(childIds, '0');
+    }
+
+    function restoreText() {
+        if (!textSnapshot) return;
+        textSnapshot.style.remove();
+        setChildOpacity(textSnapshot.childIds, '1');
+        textSnapshot = null;
+    }
+
+    // Windowed mode: every slide is swapped for a placeholder comment and only
+    // the current window is attached, so the rest is never laid out or painted
+    let detachedSlides = null;
+
+    function detachSlides() {
+        const slides = Array.from(document.querySelectorAll('section.slide'));
+        detachedSlides = slides.map(node => {
+            const placeholder = document.createComment('webppt-slide');
+            node.replaceWith(placeholder);
+            return {node, placeholder};
+        });
+        return slides.length;
+    }
+
+    // Attaches slides [start, start + count) and detaches the others. With
+    // release, slides before the window are dropped for good.
+    function attachSlides(start, count, release) {
+        detachedSlides.forEach((entry, i) => {
+            if (!entry.node) return;
+            const live = i >= start && i < start + count;
+            if (live && !entry.node.isConnected) {
+                entry.placeholder.replaceWith(entry.node);
+            } else if (!live && entry.node.isConnected) {
+                entry.node.replaceWith(entry.placeholder);
+            }
+            if (release && i < start) entry.node = null;
+        });
+        return document.body.scrollHeight;
+    }
+
+    window.__webppt = {
+        findSlide: id => byAttr('data-ppt-slide-id', id),
+        findElement: id => byAttr('data-ppt-id', id),
+        extractElements,
+        selectSlides: opts => selectSlides(opts).map(([, slideIndex]) => slideIndex),
+        rasterizeSvg,
+        setVisibility,
+        isolateElements,
+        restoreIsolation,
+        detachSlides,
+        attachSlides,
+        hideText,
+        restoreText
+    };
+})()"""
+
+class ContentExtractor:
+    def __init__(self, page, asset_cache=None):
+        self.page = page
+        # Offline mode (see assets.AssetCache): remote images only come from the cache
+        self.asset_cache = asset_cache
+        self._runtime_installed = False
+
+    async def install_runtime(self):
+        """
+        Installs the page-side runtime. Registered as an init script so it
+        survives navigations, and evaluated once for the current document.
+        """
+        if self._runtime_installed:
+            return
+        await self.page.add_init_script(RUNTIME_JS)
+        await self.page.evaluate(RUNTIME_JS)
+        self._runtime_installed = True
+
+    async def extract_elements(self, slide_range=None, slide_timeout=None):
+        """
+        Finds all elements with 'data-ppt-render' attribute
+        and returns their computed styles and coordinates.
+        slide_range: optional (first, last) 1-based inclusive slide numbers.
+        Slides outside the range are removed from layout and not extracted.
+        slide_timeout: optional deadline in seconds per extracted slide. A
+        slide that misses it is returned without elements and marked
+        'extractionTimedOut', to be flattened (see pipeline.degrade_slide).
+        """
+        await self.install_runtime()
+        first, last = slide_range if slide_range else (None, None)
+        opts = {'first': first, 'last': last}
+        if not slide_timeout:
+            return await self.page.evaluate("opts => window.__webppt.extractElements(opts)", opts)
+        indices = await self.page.evaluate("opts => window.__webppt.selectSlides(opts)", opts)
+        return await self._extract_slides(opts, indices, slide_timeout)
+
+    async def _extract_slides(self, opts, indices, slide_timeout):
+        """Extracts the given deck slides one by one, each under slide_timeout"""
+        slides_data = []
+        for index in indices:
+            try:
+                slides_data += await asyncio.wait_for(self.page.evaluate(
+                    "opts => window.__webppt.extractElements(opts)", dict(opts, only=index)), slide_timeout)
+            except asyncio.TimeoutError:
+                print(f"WARNING: Extracting slide_{index} did not finish within {slide_timeout:.0f}s, it will be flattened.")
+                slides_data.append({'id': f'slide_{index}', 'elements': [], 'extractionTimedOut': True,
+                                    'backgroundColor': 'rgba(0, 0, 0, 0)', 'backgroundImage': 'none'})
+        return slides_data
+
+    async def extract_elements_windowed(self, window, slide_range=None, slide_timeout=None):
+        """
+        Like extract_elements, but keeps at most `window` slides in the
+        document at a time, so memory stays bounded on very large decks.
+        Returns (slides_data, windowed); windowed is False if the page has
+        no section.slide elements and was extracted as a whole.
+        """
+        await self.install_runtime()
+        total = await self.page.evaluate("() => window.__webppt.detachSlides()")
+        if total == 0:
+            return await self.extract_elements(slide_range, slide_timeout), False
+
+        first, last = slide_range if slide_range else (1, total)
+        last = min(last if last is not None else total, total)
+        slides_data = []
+        for start in range(first - 1, last, window):
+            count = min(window, last - start)
+            await self.show_slides(start, count)
+            opts = {'first': None, 'last': None, 'indexOffset': start}
+            if slide_timeout:
+                slides_data += await self._extract_slides(opts, range(start, start + count), slide_timeout)
+            else:
+                slides_data += await self.page.evaluate("opts => window.__webppt.extractElements(opts)", opts)
+        return slides_data, True
+
+    async def show_slides(self, start, count, release=False):
+        """
+        Attaches deck slides [start, start + count) in windowed mode and sizes
+        the viewport to them. With release, earlier slides are freed.
+        """
+        doc_height = await self.page.evaluate(
+            "args => window.__webppt.attachSlides(args.start, args.count, args.release)",
+            {'start': start, 'count': count, 'release': release}
+        )
+        await self.page.set_viewport_size({'width': PPT_WIDTH_PX, 'height': max(PPT_HEIGHT_PX, int(doc_height))})
+
+    async def _find(self, finder, value):
+        handle = await self.page.evaluate_handle(f"v => window.__webppt.{finder}(v)", value)
+        return handle.as_element()
 
     async def capture_slide_background(self, slide_id, slide_elements):
+        await self.install_runtime()
+        el_ids = [el['id'] for el in slide_elements]
+
         # 1. Hide all elements on this slide
-        for el in slide_elements:
-            await self.page.evaluate(f"document.querySelector('[data-ppt-id=\"{el['id']}\"]').style.visibility = 'hidden'")
-        
-        # 2. Screenshot the slide container
-        slide_handle = await self.page.query_selector(f'[data-ppt-slide-id="{slide_id}"]')
-        bg_screenshot_path = f"output/temp_bg_{slide_id}.png"
-        await slide_handle.screenshot(path=bg_screenshot_path)
-        
-        # 3. Restore elements
-        for el in slide_elements:
-            await self.page.evaluate(f"document.querySelector('[data-ppt-id=\"{el['id']}\"]').style.visibility = 'visible'")
-            
-        return bg_screenshot_path
+        await self.page.evaluate("ids => window.__webppt.setVisibility(ids, 'hidden')", el_ids)
+        try:
+            # 2. Screenshot the slide container
+            slide_handle = await self._find('findSlide', slide_id)
+            return await slide_handle.screenshot()
+        finally:
+            # 3. Restore elements, also when the capture timed out
+            await self.page.evaluate("ids => window.__webppt.setVisibility(ids, 'visible')", el_ids)
+
+    async def capture_flattened_slide(self, slide_id, text_ids, child_ids, hidden_ids):
+        """
+        Screenshots a whole slide as it renders, with the text of the given
+        elements and text children made transparent (it is overlaid
+        natively) and hidden_ids (drawn elsewhere, e.g. by a layout) hidden.
+        """
+        await self.install_runtime()
+
+        await self.page.evaluate("args => window.__webppt.hideText(args.ids, args.childIds)",
+                                 {'ids': text_ids, 'childIds': child_ids})
+        await self.page.evaluate("ids => window.__webppt.setVisibility(ids, 'hidden')", hidden_ids)
+        try:
+            slide_handle = await self._find('findSlide', slide_id)
+            return await slide_handle.screenshot()
+        finally:
+            await self.page.evaluate("ids => window.__webppt.setVisibility(ids, 'visible')", hidden_ids)
+            await self.page.evaluate("() => window.__webppt.restoreText()")
+
+    async def capture_slide_thumbnail(self, slide_id):
+        """Screenshot of a slide as rendered, at CSS pixel scale"""
+        await self.install_runtime()
+        slide_handle = await self._find('findSlide', slide_id)
+        return await slide_handle.screenshot(scale='css')
+
+    async def restore_isolation(self):
+        """Undoes an element isolation left behind by an interrupted capture"""
+        await self.page.evaluate("() => window.__webppt.restoreIsolation()")
 
     async def capture_element_image(self, slide_id, el):
-        # 1. Isolate element: Hide siblings and set transparent bg
-        js = """() => {{
-            const slide = document.querySelector('[data-ppt-slide-id="{slide_id}"]');
-            const targetEl = document.querySelector('[data-ppt-id="{el_id}"]');
-            
-            // Check for backdrop-filter
-            const style = window.getComputedStyle(targetEl);
-            const hasBackdropFilter = style.backdropFilter !== 'none' && style.backdropFilter !== undefined || 
-                                      style.webkitBackdropFilter !== 'none' && style.webkitBackdropFilter !== undefined;
-
-            window._ppt_snapshot_state = {{
-                slideBg: slide.style.background,
-                bodyBg: document.body.style.background,
-                siblingsVisibility: []
-            }};
-            
-            // Only hide background if no backdrop-filter is present
-            if (!hasBackdropFilter) {{
-                slide.style.background = 'transparent';
-                document.body.style.background = 'transparent';
-            }}
-            
-            const allEls = slide.querySelectorAll('[data-ppt-render]');
-            allEls.forEach(e => {{
-                if (e !== targetEl && !targetEl.contains(e) && !e.contains(targetEl)) {{
-                    window._ppt_snapshot_state.siblingsVisibility.push({{el: e, val: e.style.visibility}});
-                    e.style.visibility = 'hidden';
-                }}
-            }});
-        }}""".format(slide_id=slide_id, el_id=el['id'])
-
-        await self.page.evaluate(js)
-
-        # 2. Hide text children
-        if el['children']:
-            for child in el['children']:
-                await self.page.evaluate(f"document.querySelector('[data-ppt-child-id=\"{child['id']}\"]').style.opacity = '0'")
-
-        # 3. Take screenshot with omit_background=True
-        element_handle = await self.page.query_selector(f'[data-ppt-id="{el["id"]}"]')
-        screenshot_path = f"output/temp_{el['id']}.png"
-        
+        await self.install_runtime()
+
+        # 1. Isolate element: Hide siblings, set transparent bg and hide text children
+        # Merged raster layers (see layers.py) are captured together as one image
+        el_ids = el.get('memberIds', [el['id']])
+        child_ids = [child['id'] for child in el['children']]
+        box = await self.page.evaluate(
+            "args => window.__webppt.isolateElements(args.slideId, args.elIds, args.childIds)",
+            {'slideId': slide_id, 'elIds': el_ids, 'childIds': child_ids}
+        )
+
+        # 2. Take screenshot with omit_background=True
         # Use page.screenshot with clip to capture shadows (add padding)
-        box = await element_handle.bounding_box()
-        padding = 30 # px
+        padding = SHADOW_PADDING_PX
         
         crop_info = None
+        screenshot = None
 
         if box:
             raw_x = box['x'] - padding
@@ -380,7 +1021,7 @@ class ContentExtractor:
                     'width': final_w,
                     'height': final_h
                 }
-                await self.page.screenshot(path=screenshot_path, clip=clip_rect, omit_background=True)
+                screenshot = await self.page.screenshot(clip=clip_rect, omit_background=True)
                 
                 crop_left = final_x - raw_x
                 crop_top = final_y - raw_y
@@ -392,30 +1033,59 @@ class ContentExtractor:
                     'height': final_h,
                     'padding': padding
                 }
-            else:
-                # Fallback
-                await element_handle.screenshot(path=screenshot_path, omit_background=True)
-        else:
+
+        if screenshot is None:
             # Fallback
-            await element_handle.screenshot(path=screenshot_path, omit_background=True)
-            
-        # 4. Restore text children
-        if el['children']:
-            for child in el['children']:
-                await self.page.evaluate(f"document.querySelector('[data-ppt-child-id=\"{child['id']}\"]').style.opacity = '1'")
-
-        # 5. Restore isolation state
-        await self.page.evaluate(f"""() => {{
-            const slide = document.querySelector('[data-ppt-slide-id="{slide_id}"]');
-            const state = window._ppt_snapshot_state;
-            if (state) {{
-                slide.style.background = state.slideBg;
-                document.body.style.background = state.bodyBg;
-                state.siblingsVisibility.forEach(item => {{
-                    item.el.style.visibility = item.val;
-                }});
-                delete window._ppt_snapshot_state;
-            }}
-        }}""")
+            element_handle = await self._find('findElement', el['id'])
+            screenshot = await element_handle.screenshot(omit_background=True)
+
+        # 3. Restore isolation state
+        await self.page.evaluate("() => window.__webppt.restoreIsolation()")
         
-        return screenshot_path, crop_info
+        return screenshot, crop_info
+
+    async def fetch_image_bytes(self, url):
+        """
+        Returns the original bytes of an image URL (data:, file: or http(s):),
+        or None if they cannot be retrieved.
+        """
+        if url.startswith('data:'):
+            header, _, payload = url.partition(',')
+            if header.endswith(';base64'):
+                return base64.b64decode(payload)
+            return unquote_to_bytes(payload)
+
+        if url.startswith('file:'):
+            path = url2pathname(urlparse(url).path)
+            if not os.path.isfile(path):
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+
+        if url.startswith(('http:', 'https:')):
+            if self.asset_cache:
+                cached = self.asset_cache.get(url)
+                return cached[0] if cached else None
+            try:
+                response = await self.page.context.request.get(url)
+            except Exception as e:
+                print(f"WARNING: Failed to fetch {url}: {e}")
+                return None
+            if not response.ok:
+                return None
+            return await response.body()
+
+        return None
+
+    async def rasterize_svg(self, svg_text, width, height, scale=2):
+        """Renders SVG source to PNG bytes in the page (no screenshot needed)"""
+        await self.install_runtime()
+        try:
+            data_url = await self.page.evaluate(
+                "args => window.__webppt.rasterizeSvg(args.svg, args.width, args.height, args.scale)",
+                {'svg': svg_text, 'width': width, 'height': height, 'scale': scale}
+            )
+        except Exception as e:
+            print(f"WARNING: Failed to rasterize SVG: {e}")
+            return None
+        return base64.b64decode(data_url.partition(',')[2])
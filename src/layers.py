@@ -0,0 +1,154 @@
+from config import SHADOW_PADDING_PX
+from utils import parse_color
+
+# Cell size of the spatial grid used for rectangle queries
+GRID_CELL_PX = 64
+
+# Raster fallbacks closer than this are merged into one capture
+MERGE_GAP_PX = 4
+
+class GridIndex:
+    """Uniform grid over slide coordinates for rectangle overlap queries"""
+
+    def __init__(self, cell=GRID_CELL_PX):
+        self.cell = cell
+        self.buckets = {}
+
+    def _cells(self, rect):
+        x0, y0, x1, y1 = rect
+        for cx in range(int(x0 // self.cell), int(x1 // self.cell) + 1):
+            for cy in range(int(y0 // self.cell), int(y1 // self.cell) + 1):
+                yield cx, cy
+
+    def insert(self, key, rect):
+        for cell in self._cells(rect):
+            self.buckets.setdefault(cell, []).append(key)
+
+    def query(self, rect):
+        """Keys of all rectangles sharing a grid cell with rect"""
+        found = set()
+        for cell in self._cells(rect):
+            found.update(self.buckets.get(cell, ()))
+        return found
+
+def _rect(el):
+    return (el['x'], el['y'], el['x'] + el['width'], el['y'] + el['height'])
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+def _overlaps(a, b, gap=0):
+    return a[0] < b[2] + gap and b[0] < a[2] + gap and a[1] < b[3] + gap and b[1] < a[3] + gap
+
+def _contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+def paint_extent(el):
+    """Area an element can paint into: its box, shadows and text children"""
+    x0, y0, x1, y1 = _rect(el)
+    if el['styles'].get('boxShadow', 'none') != 'none':
+        x0, y0 = x0 - SHADOW_PADDING_PX, y0 - SHADOW_PADDING_PX
+        x1, y1 = x1 + SHADOW_PADDING_PX, y1 + SHADOW_PADDING_PX
+    extent = (x0, y0, x1, y1)
+    for child in el.get('children') or []:
+        extent = _union(extent, _rect(child))
+    return extent
+
+def is_opaque_occluder(el):
+    """A native shape that paints every pixel of its box with an opaque color"""
+    if el['type'] != 'shape':
+        return False
+    styles = el['styles']
+    if float(el.get('effectiveOpacity', styles.get('opacity', '1'))) < 1:
+        return False
+    if styles.get('mixBlendMode', 'normal') != 'normal':
+        return False
+    if styles.get('borderRadius', '0px') not in ('0px', ''):
+        return False
+    bg_color = styles.get('backgroundColor', '')
+    if not bg_color or bg_color == 'transparent':
+        return False
+    _, alpha = parse_color(bg_color)
+    return alpha >= 1.0
+
+def cull_occluded(elements):
+    """
+    Drops elements fully hidden beneath an opaque shape painted after them.
+    Paint order is the element order, which is also the PPT z-order.
+    Returns (kept_elements, dropped_elements).
+    """
+    index = GridIndex()
+    occluders = {}
+    for i, el in enumerate(elements):
+        if is_opaque_occluder(el):
+            occluders[i] = _rect(el)
+            index.insert(i, occluders[i])
+
+    kept, dropped = [], []
+    for i, el in enumerate(elements):
+        extent = paint_extent(el)
+        covered = any(j > i and _contains(occluders[j], extent) for j in index.query(extent))
+        (dropped if covered else kept).append(el)
+    return kept, dropped
+
+def _is_raster(el):
+    # Elements that may still be embedded from their original asset stay separate
+    return el['type'] == 'image' and not el.get('source')
+
+def _has_backdrop(el):
+    styles = el['styles']
+    return styles.get('backdropFilter', 'none') not in ('none', '') or \
+           styles.get('webkitBackdropFilter', 'none') not in ('none', '')
+
+def _merge(group, el):
+    merged = dict(group)
+    x0, y0, x1, y1 = _union(_rect(group), _rect(el))
+    merged.update({
+        'x': x0, 'y': y0, 'width': x1 - x0, 'height': y1 - y0,
+        'memberIds': group.get('memberIds', [group['id']]) + el.get('memberIds', [el['id']]),
+        'children': list(group.get('children') or []) + list(el.get('children') or []),
+    })
+    return merged
+
+def merge_raster_layers(elements):
+    """
+    Merges overlapping or adjacent raster fallbacks into one composite
+    capture, as long as nothing else in between them (in paint order)
+    overlaps the combined region. Returns the new element list.
+    """
+    result = []
+    for el in elements:
+        if not _is_raster(el):
+            result.append(el)
+            continue
+
+        merged = False
+        for j in range(len(result) - 1, -1, -1):
+            group = result[j]
+            if not (_is_raster(group) and _overlaps(paint_extent(group), paint_extent(el), MERGE_GAP_PX)):
+                if _overlaps(paint_extent(group), paint_extent(el)):
+                    break # something non-mergeable sits in between
+                continue
+
+            # Members share their backdrop-ness, so the first member's styles decide
+            if _has_backdrop(group) != _has_backdrop(el):
+                break
+            union = _union(paint_extent(group), paint_extent(el))
+            if any(_overlaps(paint_extent(other), union) for other in result[j + 1:]):
+                break
+            # Captures with a backdrop filter include the page behind them, so the
+            # composite must not cover anything that was painted below it
+            if _has_backdrop(el) and any(_overlaps(paint_extent(other), union) for other in result[:j]):
+                break
+            # Text children are drawn above the whole composite, so they must not
+            # end up above a later member that used to cover them
+            if any(_overlaps(_rect(child), _rect(el)) for child in group.get('children') or []):
+                break
+
+            result[j] = _merge(group, el)
+            merged = True
+            break
+
+        if not merged:
+            result.append(el)
+    return result
@@ -1,209 +1,270 @@
-import asyncio
+import argparse
 import os
 import sys
-from playwright.async_api import async_playwright
-from wp_compiler import WPCompiler
-from config import PPT_WIDTH_PX, PPT_HEIGHT_PX
-from extractor import ContentExtractor
-from ppt_renderer import PPTRenderer
-from utils import parse_color
-
-async def main():
-    # Default paths
-    input_file = "input/slide.html"
-    output_path = "output/presentation.pptx"
-    render_mode = 2 # 1: Minimal, 2: Smart (Default), 3: Maximal
-
-    # Parse arguments
-    args = sys.argv[1:]
-    i = 0
-    while i < len(args):
-        arg = args[i]
-        if arg == '-o':
-            if i + 1 < len(args):
-                output_path = args[i+1]
-                i += 1
-        elif arg == '-m':
-            if i + 1 < len(args):
-                render_mode = int(args[i+1])
-                i += 1
-        elif not arg.startswith('-'):
-            input_file = arg
-        i += 1
-
-    input_path = os.path.abspath(input_file)
-    print(f"Processing {input_path} with Render Mode {render_mode}...")
-
-    # Handle .wp files
-    if input_file.endswith('.wp'):
-        print("Detected .wp file. Compiling...")
-        with open(input_path, 'r', encoding='utf-8') as f:
-            wp_content = f.read()
-        
-        compiler = WPCompiler()
-        html_content = compiler.compile(wp_content)
-        
-        # Save to temp html
-        temp_html_path = input_path.replace('.wp', '.temp.html')
-        with open(temp_html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        input_path = temp_html_path
-        print(f"Compiled to temporary file: {input_path}")
+import time
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, DEFAULT_LOAD_TIMEOUT, DEFAULT_SLIDE_TIMEOUT, DEFAULT_STAGE_TIMEOUT
+from config import DEFAULT_OPTIMIZE_DPI, DEFAULT_ZIP_LEVEL
+from utils import parse_slide_range
+from budget import DEFAULT_BUDGET_MB
+from artifacts import parse_size
+
+# Playwright, python-pptx and the pipeline modules are imported by the
+# subcommands that need them: short jobs (compile, --help) start fast
+
+COMMANDS = ('convert', 'extract', 'render', 'merge', 'optimize', 'batch', 'compile')
+REFERENCE_RENDER_PATH = 'output/reference_render.png'
+
+async def run_extract(args):
+    """Loads the input in Chromium and returns the extracted Scene"""
+    from playwright.async_api import async_playwright
+    from assets import AssetCache, AssetRouter, load_page
+    from pipeline import prepare_input, extract_scene
+
+    input_path = prepare_input(args.input_file)
+    pdf_path = getattr(args, 'pdf_path', None)
 
     async with async_playwright() as p:
         browser = await p.chromium.launch()
         # Use device_scale_factor=3 for high DPI screenshots (Retina quality)
         page = await browser.new_page(viewport={'width': PPT_WIDTH_PX, 'height': PPT_HEIGHT_PX}, device_scale_factor=3)
-        await page.goto(f"file://{input_path}")
-        
-        extractor = ContentExtractor(page)
-        slides_data = await extractor.extract_elements()
-        print(f"Found {len(slides_data)} slides to render.")
-        
-        # Resize viewport to fit all content to ensure screenshots work for elements outside initial viewport
-        doc_height = await page.evaluate("document.body.scrollHeight")
-        # Add some buffer just in case
-        await page.set_viewport_size({'width': PPT_WIDTH_PX, 'height': int(doc_height) + 100})
-        
-        # Take a full page screenshot for reference
-        await page.screenshot(path="output/reference_render.png", full_page=True)
-        print("Saved reference screenshot to output/reference_render.png")
-
-        # Create PPT
-        renderer = PPTRenderer(output_path)
-
-        for i, slide_data in enumerate(slides_data):
-            slide_elements = slide_data['elements']
-            slide_bg_image = slide_data.get('backgroundImage')
-            slide_id = slide_data.get('id')
-            
-            # Check for gradient/image background
-            is_complex_bg = slide_bg_image and slide_bg_image != 'none'
-            bg_image_path = None
-            
-            if is_complex_bg:
-                bg_image_path = await extractor.capture_slide_background(slide_id, slide_elements)
-            
-            slide = renderer.add_slide(slide_data, bg_image_path)
-            
-            if bg_image_path:
-                os.remove(bg_image_path)
-
-            for el in slide_elements:
-                # Overflow Check
-                if el['x'] + el['width'] > PPT_WIDTH_PX + 1 or el['y'] + el['height'] > PPT_HEIGHT_PX + 1:
-                    print(f"WARNING: Element '{el['text'][:20]}...' on slide {i+1} is out of bounds!")
-
-            for el in slide_elements:
-                # Check if shape has gradient or complex styles that require image rendering
-                styles = el['styles']
-                bg_image = styles.get('backgroundImage', '')
-                is_gradient = 'gradient' in bg_image
-                
-                # Check for glassmorphism (backdrop-filter)
-                bd_filter = styles.get('backdropFilter', 'none')
-                wk_bd_filter = styles.get('webkitBackdropFilter', 'none')
-                is_glass = (bd_filter and bd_filter != 'none') or (wk_bd_filter and wk_bd_filter != 'none')
-                
-                # Check for mix-blend-mode
-                mix_blend = styles.get('mixBlendMode', 'normal')
-                is_blend = mix_blend != 'normal'
-
-                # Check for transparency
-                opacity = float(styles.get('opacity', '1'))
-                is_transparent = opacity < 1
-                
-                bg_color = styles.get('backgroundColor', '')
-                is_semi_transparent_bg = False
-                if bg_color and 'rgba' in bg_color:
-                     try:
-                         _, alpha = parse_color(bg_color)
-                         if 0 < alpha < 1:
-                             is_semi_transparent_bg = True
-                     except:
-                         pass
-
-                # Check for semi-transparent text color
-                text_color = styles.get('color', '')
-                is_semi_transparent_text = False
-                if text_color and 'rgba' in text_color:
-                     try:
-                         _, alpha = parse_color(text_color)
-                         if 0 < alpha < 1:
-                             is_semi_transparent_text = True
-                     except:
-                         pass
-
-                # Force image rendering for complex effects
-                # Applies to shapes and text (if text has complex transparency/effects)
-                should_fallback = False
-                
-                if render_mode == 1:
-                    # Mode 1: Minimal - Only if explicitly 'image' (handled by el['type'] check later)
-                    should_fallback = False
-                    
-                elif render_mode == 2:
-                    # Mode 2: Smart (Default)
-                    if el['type'] == 'shape':
-                        if is_gradient or is_glass or is_blend or is_transparent or is_semi_transparent_bg:
-                            should_fallback = True
-                    elif el['type'] == 'text':
-                        # For text, we fallback if there's opacity, blend mode, or semi-transparent color
-                        if is_transparent or is_blend or is_semi_transparent_text:
-                            should_fallback = True
-
-                elif render_mode == 3:
-                    # Mode 3: Maximal
-                    if el['type'] == 'shape':
-                        should_fallback = True # Always render shapes as images
-                    elif el['type'] == 'text':
-                        # Still check for complex effects for text to preserve editability for simple text
-                        if is_transparent or is_blend or is_semi_transparent_text:
-                            should_fallback = True
-
-                if should_fallback:
-                    reason = []
-                    if render_mode == 3 and el['type'] == 'shape':
-                        reason.append('maximal mode')
-                    else:
-                        if is_gradient: reason.append('gradient')
-                        if is_glass: reason.append('glass effect')
-                        if is_blend: reason.append('blend mode')
-                        if is_transparent: reason.append('opacity')
-                        if is_semi_transparent_bg: reason.append('rgba background')
-                        if is_semi_transparent_text: reason.append('rgba text')
-                    
-                    print(f"Element '{el['id']}' ({el['type']}) has {', '.join(reason)}, switching to image rendering.")
-                    el['type'] = 'image'
-
-                if el['type'] == 'text':
-                    renderer.create_text_box(slide, el)
-                    
-                elif el['type'] == 'shape':
-                    renderer.create_shape(slide, el)
-                    # If shape has text, add it on top
-                    if el['text'].strip():
-                        renderer.create_text_box(slide, el)
-                
-                elif el['type'] == 'table':
-                    renderer.create_table(slide, el)
-
-                elif el['type'] == 'image':
-                    image_path, crop_info = await extractor.capture_element_image(slide_id, el)
-                    
-                    renderer.add_image_element(slide, el, image_path, crop_info)
-                    
-                    os.remove(image_path)
-
-                    # Insert Text Boxes on top
-                    if el['children']:
-                        for child in el['children']:
-                            renderer.create_text_box(slide, child)
-
-        renderer.save()
-        print(f"Saved presentation to {output_path}")
+        router = None
+        if args.asset_cache:
+            router = AssetRouter(AssetCache(args.asset_cache), fetch_missing=args.fetch_assets)
+            await router.attach(page)
+        await load_page(page, input_path, args.load_timeout)
+        if router:
+            router.report()
+
+        scene = await extract_scene(page, args.render_mode, args.slide_range, reference_path=REFERENCE_RENDER_PATH,
+                                    window=args.window, asset_cache=router.cache if router else None,
+                                    budget=budget_from_args(args), slide_timeout=args.slide_timeout,
+                                    stage_timeout=args.stage_timeout, thumbnail_size=getattr(args, 'thumbnails', None),
+                                    quantize=args.quantize)
+
+        # Same page and layout as the extraction: no second load for the PDF
+        if pdf_path:
+            from artifacts import save_pdf
+            await save_pdf(page, pdf_path, PPT_WIDTH_PX, PPT_HEIGHT_PX)
+            print(f"Saved PDF to {pdf_path}")
+        await browser.close()
+
+    return scene
+
+def add_budget_arguments(parser):
+    parser.add_argument('--budget-mb', type=float, help=f'Mode 4: estimated image size budget per deck (default {DEFAULT_BUDGET_MB} MB)')
+    parser.add_argument('--budget-seconds', type=float, help='Mode 4: estimated capture time budget per deck')
+
+def budget_from_args(args):
+    return {
+        'bytes': args.budget_mb * 1024 * 1024 if args.budget_mb else None,
+        'seconds': args.budget_seconds,
+    }
+
+def add_deadline_arguments(parser):
+    parser.add_argument('--slide-timeout', type=float, default=DEFAULT_SLIDE_TIMEOUT, help='Seconds of browser work per slide before it is flattened into one image')
+    parser.add_argument('--stage-timeout', type=float, default=DEFAULT_STAGE_TIMEOUT, help='Seconds allowed for a single capture before its slide is flattened')
+
+def add_capture_arguments(parser):
+    parser.add_argument('--quantize', type=int, metavar='COLORS', help='Also reduce captured images to this many colors (2-256) where that makes them smaller')
+
+def add_load_arguments(parser):
+    parser.add_argument('--asset-cache', metavar='DIR', help='Serve remote assets from this cache directory and block all other network requests')
+    parser.add_argument('--fetch-assets', action='store_true', help='Download assets missing from --asset-cache into it instead of blocking them')
+    parser.add_argument('--load-timeout', type=float, default=DEFAULT_LOAD_TIMEOUT, help='Seconds to wait for page load, webfonts and images')
+
+def add_optimize_options(parser):
+    parser.add_argument('--dpi', type=int, default=DEFAULT_OPTIMIZE_DPI, help=f'Downsample pictures to this many pixels per inch of their placed size (default {DEFAULT_OPTIMIZE_DPI})')
+    parser.add_argument('--zip-level', type=int, choices=range(10), default=DEFAULT_ZIP_LEVEL, metavar='0-9', help=f'Deflate level of the written .pptx (default {DEFAULT_ZIP_LEVEL})')
+
+def add_optimize_arguments(parser):
+    parser.add_argument('--optimize', action='store_true', help='Shrink the written .pptx (see the optimize command)')
+    add_optimize_options(parser)
+
+def optimize_from_args(args):
+    if not args.optimize:
+        return None
+    return {'dpi': args.dpi, 'zip_level': args.zip_level}
+
+def run_optimize(input_path, output_path, options):
+    from ppt_optimizer import optimize_presentation, print_report
+
+    print_report(optimize_presentation(input_path, output_path, **options))
+
+def parse_args(argv):
+    # Keep `main.py input.wp -o out.pptx` working: no subcommand means convert
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv = ['convert'] + list(argv)
+
+    parser = argparse.ArgumentParser(prog='main.py', description='Convert HTML / .wp files into PowerPoint.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert = subparsers.add_parser('convert', help='Extract and render in one run (default)')
+    convert.add_argument('input_file', nargs='?', default='input/slide.html')
+    convert.add_argument('-o', dest='output_path', default='output/presentation.pptx')
+    convert.add_argument('-m', dest='render_mode', type=int, default=2, help='1: Minimal, 2: Smart (Default), 3: Maximal, 4: Budgeted')
+    convert.add_argument('--slides', dest='slide_range', type=parse_slide_range, help='Only convert slides in this 1-based range, e.g. 41-80')
+    convert.add_argument('--window', type=int, help='Keep only this many slides in the page at a time (bounded memory for huge decks)')
+    add_load_arguments(convert)
+    add_budget_arguments(convert)
+    add_deadline_arguments(convert)
+    add_capture_arguments(convert)
+    # Output targets, all produced from one page load and extraction pass
+    # A plain flag, so `convert --pptx deck.html` cannot take the input as its value
+    convert.add_argument('--pptx', action='store_true', help='Also write the .pptx to -o (implied without --pdf / --thumbnails)')
+    convert.add_argument('--pdf', dest='pdf_path', help='Also print the deck to this PDF, one slide per page')
+    convert.add_argument('--thumbnails', type=parse_size, help='Also save a WxH PNG thumbnail per slide, e.g. 320x180')
+    convert.add_argument('--thumbnails-dir', default='output/thumbnails', help='Directory for --thumbnails (default output/thumbnails)')
+    add_optimize_arguments(convert)
+
+    extract = subparsers.add_parser('extract', help='Run the browser stage and save a scene file')
+    extract.add_argument('input_file', nargs='?', default='input/slide.html')
+    extract.add_argument('-o', dest='output_path', default='output/presentation.wpscene')
+    extract.add_argument('-m', dest='render_mode', type=int, default=2, help='1: Minimal, 2: Smart (Default), 3: Maximal, 4: Budgeted')
+    extract.add_argument('--slides', dest='slide_range', type=parse_slide_range, help='Only extract slides in this 1-based range, e.g. 41-80')
+    extract.add_argument('--window', type=int, help='Keep only this many slides in the page at a time (bounded memory for huge decks)')
+    add_load_arguments(extract)
+    add_budget_arguments(extract)
+    add_deadline_arguments(extract)
+    add_capture_arguments(extract)
+
+    render = subparsers.add_parser('render', help='Build a .pptx from a saved scene file (no browser)')
+    render.add_argument('scene_file')
+    render.add_argument('-o', dest='output_path', default='output/presentation.pptx')
+    add_optimize_arguments(render)
+
+    merge = subparsers.add_parser('merge', help='Concatenate shard .pptx files into one deck')
+    merge.add_argument('shard_files', nargs='+')
+    merge.add_argument('-o', dest='output_path', default='output/presentation.pptx')
+    add_optimize_arguments(merge)
+
+    optimize = subparsers.add_parser('optimize', help='Shrink a .pptx: unused layouts and parts, duplicate and oversized media, zip level')
+    optimize.add_argument('input_file')
+    optimize.add_argument('-o', dest='output_path', help='Defaults to overwriting the input')
+    add_optimize_options(optimize)
+
+    compile_ = subparsers.add_parser('compile', help='Compile a .wp file to HTML (no browser, no PowerPoint)')
+    compile_.add_argument('input_file')
+    compile_.add_argument('-o', dest='output_path', help='Defaults to the input path with an .html extension')
+
+    batch = subparsers.add_parser('batch', help='Convert many files with one shared browser')
+    batch.add_argument('inputs', help='Directory, glob pattern or manifest file (one path per line)')
+    batch.add_argument('-m', dest='render_mode', type=int, default=2, help='1: Minimal, 2: Smart (Default), 3: Maximal, 4: Budgeted')
+    batch.add_argument('-j', dest='concurrency', type=int, default=4, help='Number of files converted concurrently')
+    batch.add_argument('--timeout', type=float, default=120, help='Per-file timeout in seconds')
+    batch.add_argument('--window', type=int, help='Keep only this many slides in the page at a time (bounded memory for huge decks)')
+    add_load_arguments(batch)
+    add_budget_arguments(batch)
+    add_deadline_arguments(batch)
+    add_capture_arguments(batch)
+    add_optimize_arguments(batch)
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'quantize', None) is not None and not 2 <= args.quantize <= 256:
+        parser.error("--quantize must be between 2 and 256 colors")
+    if args.command == 'convert':
+        # Without any target flag, convert writes the .pptx as before
+        write_pptx = args.pptx or not (args.pdf_path or args.thumbnails)
+        args.pptx_path = args.output_path if write_pptx else None
+        if args.pdf_path and args.window:
+            parser.error("--pdf needs the whole deck in the page and cannot be combined with --window")
+    return args
+
+def run_compile(args):
+    from wp_compiler import WPCompiler
+
+    output_path = args.output_path or os.path.splitext(args.input_file)[0] + '.html'
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        html_content = WPCompiler().compile(f.read())
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"Compiled {args.input_file} to {output_path}")
+
+async def run_batch(args):
+    from playwright.async_api import async_playwright
+    from batch import BatchConverter, collect_inputs, summarize, print_summary
+
+    try:
+        input_files = collect_inputs(args.inputs)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    if not input_files:
+        print(f"No input files found for {args.inputs}")
+        return 1
+    print(f"Converting {len(input_files)} files with Render Mode {args.render_mode} (concurrency {args.concurrency})...")
+
+    start = time.perf_counter()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        converter = BatchConverter(browser, args.render_mode, args.concurrency, args.timeout, args.window,
+                                   args.asset_cache, args.fetch_assets, args.load_timeout, budget_from_args(args),
+                                   args.slide_timeout, args.stage_timeout, optimize_from_args(args), args.quantize)
+        results = await converter.run(input_files)
         await browser.close()
 
+    summary = summarize(results, time.perf_counter() - start)
+    print_summary(summary, results)
+    return 1 if summary['failed'] else 0
+
+async def main(args):
+    if args.command == 'render':
+        from pipeline import render_scene
+        from scene import Scene
+
+        print(f"Rendering scene {os.path.abspath(args.scene_file)}...")
+        scene = Scene.load(args.scene_file)
+        try:
+            render_scene(scene, args.output_path)
+        finally:
+            scene.close()
+        print(f"Saved presentation to {args.output_path}")
+        if args.optimize:
+            run_optimize(args.output_path, args.output_path, optimize_from_args(args))
+        return
+
+    if args.command == 'optimize':
+        output_path = args.output_path or args.input_file
+        run_optimize(args.input_file, output_path, {'dpi': args.dpi, 'zip_level': args.zip_level})
+        print(f"Saved presentation to {output_path}")
+        return
+
+    if args.command == 'batch':
+        sys.exit(await run_batch(args))
+
+    if args.command == 'merge':
+        from ppt_merger import merge_presentations
+
+        slide_count = merge_presentations(args.shard_files, args.output_path)
+        print(f"Merged {len(args.shard_files)} shards ({slide_count} slides) into {args.output_path}")
+        if args.optimize:
+            run_optimize(args.output_path, args.output_path, optimize_from_args(args))
+        return
+
+    print(f"Processing {os.path.abspath(args.input_file)} with Render Mode {args.render_mode}...")
+    scene = await run_extract(args)
+
+    if args.command == 'extract':
+        scene.save(args.output_path)
+        print(f"Saved scene to {args.output_path}")
+        return
+
+    if args.thumbnails:
+        from artifacts import write_thumbnails
+        count = write_thumbnails(scene, args.thumbnails_dir)
+        print(f"Saved {count} thumbnails to {args.thumbnails_dir}")
+
+    if args.pptx_path:
+        from pipeline import render_scene
+        render_scene(scene, args.pptx_path)
+        print(f"Saved presentation to {args.pptx_path}")
+        if args.optimize:
+            run_optimize(args.pptx_path, args.pptx_path, optimize_from_args(args))
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli_args = parse_args(sys.argv[1:])
+    if cli_args.command == 'compile':
+        # Synchronous fast path: no event loop, no browser, no python-pptx
+        run_compile(cli_args)
+    else:
+        import asyncio
+        asyncio.run(main(cli_args))
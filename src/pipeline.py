@@ -0,0 +1,446 @@
+import asyncio
+import os
+from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, DEFAULT_SLIDE_TIMEOUT, DEFAULT_STAGE_TIMEOUT
+from extractor import ContentExtractor
+from ppt_renderer import PPTRenderer
+from chrome import hoist_slide_chrome
+from layers import cull_occluded, merge_raster_layers
+from budget import BUDGET_MODE, plan_raster_budget
+from scene import Scene
+from artifacts import make_thumbnail
+from postprocess import CapturePostProcessor
+from utils import parse_color, sniff_image_format
+from wp_compiler import WPCompiler
+
+def prepare_input(input_file):
+    """Returns the absolute path of an HTML file to load, compiling .wp files first"""
+    input_path = os.path.abspath(input_file)
+
+    # Handle .wp files
+    if input_file.endswith('.wp'):
+        print("Detected .wp file. Compiling...")
+        with open(input_path, 'r', encoding='utf-8') as f:
+            wp_content = f.read()
+
+        compiler = WPCompiler()
+        html_content = compiler.compile(wp_content)
+
+        # Save to temp html
+        temp_html_path = os.path.splitext(input_path)[0] + '.temp.html'
+        with open(temp_html_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+
+        input_path = temp_html_path
+        print(f"Compiled to temporary file: {input_path}")
+
+    return input_path
+
+def get_fallback_reasons(el, render_mode):
+    """
+    Decides whether an element must be rendered as an image.
+    Returns the list of reasons (empty if it can stay native).
+    """
+    # Check if shape has gradient or complex styles that require image rendering
+    styles = el['styles']
+    bg_image = styles.get('backgroundImage', '')
+    is_gradient = 'gradient' in bg_image
+
+    # Check for glassmorphism (backdrop-filter)
+    bd_filter = styles.get('backdropFilter', 'none')
+    wk_bd_filter = styles.get('webkitBackdropFilter', 'none')
+    is_glass = (bd_filter and bd_filter != 'none') or (wk_bd_filter and wk_bd_filter != 'none')
+
+    # Check for mix-blend-mode
+    mix_blend = styles.get('mixBlendMode', 'normal')
+    is_blend = mix_blend != 'normal'
+
+    # Check for transparency
+    opacity = float(styles.get('opacity', '1'))
+    is_transparent = opacity < 1
+
+    bg_color = styles.get('backgroundColor', '')
+    is_semi_transparent_bg = False
+    if bg_color and 'rgba' in bg_color:
+         try:
+             _, alpha = parse_color(bg_color)
+             if 0 < alpha < 1:
+                 is_semi_transparent_bg = True
+         except:
+             pass
+
+    # Force image rendering for complex effects
+    # Applies to shapes and text (if text has complex transparency/effects)
+    should_fallback = False
+
+    if render_mode == 1:
+        # Mode 1: Minimal - Only if explicitly 'image' (handled by el['type'] check later)
+        should_fallback = False
+
+    elif render_mode == 2:
+        # Mode 2: Smart (Default)
+        if el['type'] == 'shape':
+            if is_gradient or is_glass or is_blend or is_transparent or is_semi_transparent_bg:
+                should_fallback = True
+        elif el['type'] == 'text':
+            # Opacity and rgba text color are rendered natively as text alpha,
+            # only blend modes still need a screenshot
+            if is_blend:
+                should_fallback = True
+
+    elif render_mode == 3:
+        # Mode 3: Maximal
+        if el['type'] == 'shape':
+            should_fallback = True # Always render shapes as images
+        elif el['type'] == 'text':
+            # Still check for complex effects for text to preserve editability for simple text
+            if is_blend:
+                should_fallback = True
+
+    reason = []
+    if should_fallback:
+        if render_mode == 3 and el['type'] == 'shape':
+            reason.append('maximal mode')
+        else:
+            if is_gradient: reason.append('gradient')
+            if is_glass: reason.append('glass effect')
+            if is_blend: reason.append('blend mode')
+            if is_transparent and el['type'] == 'shape': reason.append('opacity')
+            if is_semi_transparent_bg and el['type'] == 'shape': reason.append('rgba background')
+    return reason
+
+def apply_render_budget(layers, budget=None):
+    """
+    Budgeted mode: rasterizes the elements that gain most fidelity per unit
+    of capture cost until the deck budget is spent, and logs every decision.
+    budget: optional {'bytes', 'seconds'} limits. Returns a summary dict.
+    """
+    budget = budget or {}
+    candidates, mandatory = [], []
+    for layer in layers:
+        for el in layer['elements']:
+            if el['type'] == 'image':
+                # Explicit images are captured anyway, unless embedded from their source
+                if not el.get('source'):
+                    mandatory.append(el)
+                continue
+            reasons = get_fallback_reasons(el, 2)
+            if reasons:
+                candidates.append((el, reasons))
+
+    decisions, spent = plan_raster_budget(candidates, mandatory, budget.get('bytes'), budget.get('seconds'))
+    for (el, _), decision in zip(candidates, decisions):
+        verdict = 'rasterize' if decision['rasterize'] else 'keep native'
+        print(f"Budget: {verdict} '{el['id']}' ({', '.join(decision['reasons'])}): "
+              f"gain {decision['gain']:.3f}, ~{decision['bytes'] / 1024:.0f} KB, ~{decision['seconds']:.2f}s")
+        if decision['rasterize']:
+            el['type'] = 'image'
+
+    rasterized = sum(1 for d in decisions if d['rasterize'])
+    print(f"Budget: rasterized {rasterized}/{len(decisions)} candidates, "
+          f"estimated {spent['bytes'] / 1024 / 1024:.1f} MB, {spent['seconds']:.1f}s of captures.")
+    return {'rasterized': rasterized, 'candidates': len(decisions),
+            'estimatedBytes': int(spent['bytes']), 'estimatedSeconds': round(spent['seconds'], 2)}
+
+async def embed_source_image(extractor, scene, el):
+    """
+    Embeds the original asset of a bare <img>/<svg> image element instead of
+    a screenshot. SVGs get a PNG fallback for viewers without SVG support.
+    Returns False if the element has to be captured after all.
+    """
+    source = el['source']
+    if source['kind'] == 'svg':
+        data = source.pop('svg').encode('utf-8')
+    else:
+        data = await extractor.fetch_image_bytes(source['url'])
+    if not data:
+        return False
+
+    fmt = sniff_image_format(data)
+    if fmt is None:
+        return False
+
+    if fmt == 'svg':
+        png = await extractor.rasterize_svg(data.decode('utf-8'), source['width'], source['height'])
+        if png is None:
+            return False
+        el['svgRef'] = scene.add_image(f"{el['id']}.svg", data)
+        el['imageRef'] = scene.add_image(f"{el['id']}.png", png)
+    else:
+        el['imageRef'] = scene.add_image(f"{el['id']}.{fmt}", data)
+
+    el['passthrough'] = True
+    el['cropInfo'] = None
+    return True
+
+async def capture_image_element(extractor, post, slide_id, el):
+    """Captures an image element; the screenshot is trimmed by `post` in the background"""
+    if el.get('source') and await embed_source_image(extractor, post.scene, el):
+        print(f"Element '{el['id']}' embedded from its original {el['source']['kind']} source.")
+        return
+
+    png, crop_info = await extractor.capture_element_image(slide_id, el)
+    post.submit(el, png, crop_info)
+
+def text_overlay(el):
+    """Native text of an element without its box paint, drawn over a flattened slide"""
+    styles = dict(el['styles'], backgroundColor='rgba(0, 0, 0, 0)', borderBottomWidth='0px', borderLeftWidth='0px')
+    return dict(el, type='text', styles=styles, children=[])
+
+async def capture_slide(extractor, post, slide_data, slide_elements, stage_timeout):
+    """Captures the background and image elements of one slide"""
+    scene = post.scene
+    slide_id = slide_data['id']
+    slide_bg_image = slide_data.get('backgroundImage')
+
+    # Check for gradient/image background
+    is_complex_bg = slide_bg_image and slide_bg_image != 'none'
+
+    if is_complex_bg:
+        bg_png = await asyncio.wait_for(extractor.capture_slide_background(slide_id, slide_elements), stage_timeout)
+        slide_data['backgroundImageRef'] = scene.add_image(f"{slide_id}_bg.png", bg_png)
+
+    for el in slide_data['elements']:
+        if el['type'] == 'image':
+            await asyncio.wait_for(capture_image_element(extractor, post, slide_id, el), stage_timeout)
+    await post.drain()
+
+async def restore_isolation(extractor, stage_timeout):
+    """Undoes a capture's isolation; a hung page is logged, not raised"""
+    try:
+        await asyncio.wait_for(extractor.restore_isolation(), stage_timeout)
+    except asyncio.TimeoutError:
+        print("WARNING: Restoring the page after an interrupted capture timed out.")
+
+async def degrade_slide(extractor, post, slide_data, stage_timeout):
+    """
+    Replaces a slide that ran out of time by one screenshot of the whole
+    slide, with text kept native on top where the scene has it. Elements
+    hoisted into the slide's layout are left out of the screenshot.
+    """
+    scene = post.scene
+    post.discard()
+    slide_id = slide_data['id']
+    for ref in [slide_data.get('backgroundImageRef')] + \
+               [el.get(key) for el in slide_data['elements'] for key in ('imageRef', 'svgRef')]:
+        if ref:
+            scene.remove_image(ref)
+
+    # Only what the layout draws is hidden; merged raster members are still on the slide
+    hoisted_ids = slide_data.get('hoistedIds', [])
+    text_sources = [el for el in slide_data['elements'] if el['type'] in ('text', 'shape') and el['text'].strip()]
+    children = [child for el in slide_data['elements'] if el['type'] == 'image' for child in el.get('children') or []]
+    overlays = [text_overlay(el) for el in text_sources + children]
+
+    await restore_isolation(extractor, stage_timeout)
+    try:
+        png = await asyncio.wait_for(extractor.capture_flattened_slide(
+            slide_id, [el['id'] for el in text_sources], [c['id'] for c in children], hoisted_ids
+        ), stage_timeout)
+    except asyncio.TimeoutError:
+        print(f"WARNING: Could not flatten {slide_id} either, leaving it without content.")
+        slide_data['elements'] = []
+        return
+
+    slide_data['backgroundImageRef'] = scene.add_image(f"{slide_id}_flat.png", png)
+    slide_data['elements'] = overlays
+
+async def extract_scene(page, render_mode, slide_range=None, reference_path=None, window=None, asset_cache=None,
+                        budget=None, slide_timeout=DEFAULT_SLIDE_TIMEOUT, stage_timeout=DEFAULT_STAGE_TIMEOUT,
+                        thumbnail_size=None, quantize=None):
+    """
+    Browser stage: extracts all slides from a loaded page, resolves
+    fallback decisions and captures every image the renderer will need.
+    slide_range: optional (first, last) 1-based slide numbers to extract.
+    reference_path: if set, a full page screenshot is saved there.
+    window: if set, only this many slides are kept in the document at a
+    time (bounded memory for very large decks).
+    asset_cache: AssetCache the page is routed through, if running offline.
+    budget: {'bytes', 'seconds'} capture budget for the budgeted render mode.
+    slide_timeout / stage_timeout: deadlines (seconds) for one slide's
+    extraction or captures and for a single browser call. A slide that
+    misses one is flattened into a screenshot (see degrade_slide) and
+    listed in scene.meta['degradedSlides'].
+    thumbnail_size: (width, height) to also store a thumbnail of every
+    slide (slide_data['thumbnailRef']), taken before any capture.
+    quantize: if set, captures are also reduced to this many colors where
+    that makes them smaller (see postprocess.trim_capture).
+    """
+    extractor = ContentExtractor(page, asset_cache)
+    windowed = False
+    if window:
+        slides_data, windowed = await extractor.extract_elements_windowed(window, slide_range, slide_timeout)
+    else:
+        slides_data = await extractor.extract_elements(slide_range, slide_timeout)
+    print(f"Found {len(slides_data)} slides to render.")
+
+    if windowed:
+        print(f"Windowed mode: keeping {window} slide(s) in the page at a time.")
+        if reference_path:
+            print("Skipping reference screenshot in windowed mode.")
+    else:
+        # Resize viewport to fit all content to ensure screenshots work for elements outside initial viewport
+        doc_height = await page.evaluate("document.body.scrollHeight")
+        # Add some buffer just in case
+        await page.set_viewport_size({'width': PPT_WIDTH_PX, 'height': int(doc_height) + 100})
+
+        if reference_path:
+            # Take a full page screenshot for reference
+            await page.screenshot(path=reference_path, full_page=True)
+            print(f"Saved reference screenshot to {reference_path}")
+
+    scene = Scene(slides_data, meta={'renderMode': render_mode, 'slideRange': slide_range})
+    post = CapturePostProcessor(scene, quantize)
+
+    first_slide = slide_range[0] if slide_range else 1
+    for i, slide_data in enumerate(slides_data):
+        slide_number = first_slide + i
+        for el in slide_data['elements']:
+            # Overflow Check
+            if el['x'] + el['width'] > PPT_WIDTH_PX + 1 or el['y'] + el['height'] > PPT_HEIGHT_PX + 1:
+                print(f"WARNING: Element '{el['text'][:20]}...' on slide {slide_number} is out of bounds!")
+
+            if el.get('invalidChart'):
+                print(f"WARNING: Chart '{el['id']}' on slide {slide_number} has no valid data-chart, capturing it as an image.")
+
+            reason = get_fallback_reasons(el, render_mode)
+            if reason:
+                print(f"Element '{el['id']}' ({el['type']}) has {', '.join(reason)}, switching to image rendering.")
+                el['type'] = 'image'
+
+        # Drop elements hidden beneath opaque shapes
+        slide_data['elements'], dropped = cull_occluded(slide_data['elements'])
+        if dropped:
+            print(f"Slide {slide_number}: dropped {len(dropped)} fully occluded elements.")
+
+    # Elements repeated on many slides go into a shared layout and are captured once.
+    # Remember each slide's full element list: backgrounds must be captured without them.
+    all_elements = {slide_data['id']: slide_data['elements'] for slide_data in slides_data}
+    element_slide = {el['id']: slide_id for slide_id, els in all_elements.items() for el in els}
+    scene.layouts = hoist_slide_chrome(slides_data)
+    for layout in scene.layouts:
+        print(f"Hoisted {len(layout['elements'])} repeated elements into {layout['id']}.")
+
+    # Budgeted mode decides after hoisting, so shared chrome is paid for once
+    if render_mode == BUDGET_MODE:
+        scene.meta['budget'] = apply_render_budget(slides_data + scene.layouts, budget)
+
+    # Overlapping raster fallbacks become one composite capture
+    for layer in slides_data + scene.layouts:
+        count = len(layer['elements'])
+        layer['elements'] = merge_raster_layers(layer['elements'])
+        if len(layer['elements']) < count:
+            print(f"{layer['id']}: merged {count - len(layer['elements'])} raster layers into composite captures.")
+
+    # Layout elements are captured on the slide they were taken from
+    layout_captures = {}
+    for layout in scene.layouts:
+        for el in layout['elements']:
+            if el['type'] == 'image':
+                layout_captures.setdefault(element_slide[el['id']], []).append(el)
+
+    window_start = None
+    window_end = int(slides_data[-1]['id'].split('_')[1]) + 1 if windowed and slides_data else 0
+    degraded = []
+    for slide_data in slides_data:
+        slide_id = slide_data.get('id')
+
+        if windowed:
+            slide_index = int(slide_id.split('_')[1])
+            if window_start is None or not window_start <= slide_index < window_start + window:
+                window_start = slide_index
+                await extractor.show_slides(window_start, min(window, window_end - window_start), release=True)
+
+        if thumbnail_size:
+            try:
+                png = await asyncio.wait_for(extractor.capture_slide_thumbnail(slide_id), stage_timeout)
+                slide_data['thumbnailRef'] = scene.add_image(f"{slide_id}_thumb.png", make_thumbnail(png, thumbnail_size))
+            except asyncio.TimeoutError:
+                print(f"WARNING: Thumbnail of {slide_id} timed out, skipping it.")
+
+        # Shared chrome is captured on its own: a degraded slide must not take it down
+        for el in layout_captures.get(slide_id, []):
+            try:
+                await asyncio.wait_for(capture_image_element(extractor, post, slide_id, el), stage_timeout)
+            except asyncio.TimeoutError:
+                print(f"WARNING: Capturing layout element '{el['id']}' timed out, dropping it.")
+                await restore_isolation(extractor, stage_timeout)
+                for layout in scene.layouts:
+                    if el in layout['elements']:
+                        layout['elements'].remove(el)
+        # Layout captures must not be lost if this slide degrades
+        await post.drain()
+
+        # A slide whose extraction timed out has nothing to capture separately
+        missed = slide_data.get('extractionTimedOut', False)
+        if not missed:
+            try:
+                await asyncio.wait_for(
+                    capture_slide(extractor, post, slide_data, all_elements[slide_id], stage_timeout), slide_timeout)
+            except asyncio.TimeoutError:
+                missed = True
+        if missed:
+            print(f"WARNING: {slide_id} missed its deadline, flattening it into a single image.")
+            await degrade_slide(extractor, post, slide_data, stage_timeout)
+            slide_data['degraded'] = True
+            degraded.append(slide_id)
+
+    post.report()
+    if degraded:
+        scene.meta['degradedSlides'] = degraded
+        print(f"Degraded {len(degraded)} slide(s) to flattened images: {', '.join(degraded)}")
+
+    return scene
+
+def render_elements(renderer, slide, elements, scene):
+    """Draws scene elements onto a slide (or a LayoutCanvas)"""
+    for el in elements:
+        if el['type'] == 'text':
+            renderer.create_text_box(slide, el)
+
+        elif el['type'] == 'shape':
+            renderer.create_shape(slide, el)
+            # If shape has text, add it on top
+            if el['text'].strip():
+                renderer.create_text_box(slide, el)
+
+        elif el['type'] == 'table':
+            renderer.create_table(slide, el)
+
+        elif el['type'] == 'chart':
+            renderer.create_chart(slide, el)
+
+        elif el['type'] == 'image' and el.get('passthrough'):
+            svg_image = scene.image_bytes(el['svgRef']) if el.get('svgRef') else None
+            renderer.add_source_image(slide, el, scene.open_image(el['imageRef']), svg_image)
+
+        elif el['type'] == 'image':
+            renderer.add_image_element(slide, el, scene.open_image(el['imageRef']), el.get('cropInfo'))
+
+            # Insert Text Boxes on top
+            if el['children']:
+                for child in el['children']:
+                    renderer.create_text_box(slide, child)
+
+def render_scene(scene, output_path):
+    """Render stage: builds the .pptx from a scene without a browser"""
+    renderer = PPTRenderer(output_path)
+
+    # Repeated slide chrome is drawn once per layout
+    layouts = {}
+    for layout_data in scene.layouts:
+        layout = renderer.add_layout(f"WebPPT {layout_data['id']}")
+        render_elements(renderer, layout, layout_data['elements'], scene)
+        layouts[layout_data['id']] = layout
+
+    for slide_data in scene.slides:
+        bg_ref = slide_data.get('backgroundImageRef')
+        layout = layouts.get(slide_data.get('layout'))
+        slide = renderer.add_slide(slide_data, scene.open_image(bg_ref) if bg_ref else None, layout)
+        render_elements(renderer, slide, slide_data['elements'], scene)
+
+    degraded = scene.meta.get('degradedSlides')
+    if degraded:
+        print(f"Note: {len(degraded)} slide(s) were flattened into images: {', '.join(degraded)}")
+
+    renderer.save()
+    return renderer
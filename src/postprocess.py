@@ -0,0 +1,92 @@
+import asyncio
+import io
+
+def trim_capture(png, crop_info, quantize=None):
+    """
+    Crops an element capture to the bounding box of its non-transparent
+    pixels (the shadow padding is mostly empty) and optionally reduces it
+    to a palette of `quantize` colors. crop_info is adjusted so the trimmed
+    image lands exactly where the untrimmed one would have.
+    Returns (png, crop_info, (pixels_before, pixels_after)).
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        image.load()
+    pixels = image.width * image.height
+    if image.mode != 'RGBA':
+        return png, crop_info, (pixels, pixels)
+
+    # Any pixel with alpha > 0 is kept, so soft shadow edges survive
+    bbox = image.getchannel('A').getbbox()
+    if bbox is None:
+        return png, crop_info, (pixels, pixels)
+
+    trimmed = bbox != (0, 0, image.width, image.height)
+    if trimmed:
+        # Screenshot pixels per CSS px (device_scale_factor)
+        scale_x = image.width / crop_info['width']
+        scale_y = image.height / crop_info['height']
+        left, top, right, bottom = bbox
+        image = image.crop(bbox)
+        crop_info = dict(crop_info,
+                         crop_left=crop_info['crop_left'] + left / scale_x,
+                         crop_top=crop_info['crop_top'] + top / scale_y,
+                         width=(right - left) / scale_x,
+                         height=(bottom - top) / scale_y)
+
+    candidates = [] if trimmed else [png]
+    if trimmed:
+        output = io.BytesIO()
+        image.save(output, 'PNG')
+        candidates.append(output.getvalue())
+    if quantize:
+        output = io.BytesIO()
+        image.quantize(colors=quantize, method=Image.Quantize.FASTOCTREE).save(output, 'PNG', optimize=True)
+        candidates.append(output.getvalue())
+    if candidates:
+        png = min(candidates, key=len)
+    return png, crop_info, (pixels, image.width * image.height)
+
+
+class CapturePostProcessor:
+    """
+    Runs trim_capture on element captures in a thread pool, so encoding
+    overlaps with the browser taking the next screenshot. Results are
+    stored on the element (imageRef, cropInfo) when drained.
+    """
+
+    def __init__(self, scene, quantize=None):
+        self.scene = scene
+        self.quantize = quantize
+        self.pending = []
+        self.pixels_before = 0
+        self.pixels_after = 0
+
+    def submit(self, el, png, crop_info):
+        if crop_info is None:
+            # Element screenshot without padding, nothing to trim
+            el['imageRef'] = self.scene.add_image(f"{el['id']}.png", png)
+            el['cropInfo'] = None
+            return
+        future = asyncio.get_running_loop().run_in_executor(None, trim_capture, png, crop_info, self.quantize)
+        self.pending.append((el, future))
+
+    async def drain(self):
+        """Waits for all submitted captures and adds them to the scene"""
+        pending, self.pending = self.pending, []
+        for el, future in pending:
+            png, crop_info, (before, after) = await future
+            el['imageRef'] = self.scene.add_image(f"{el['id']}.png", png)
+            el['cropInfo'] = crop_info
+            self.pixels_before += before
+            self.pixels_after += after
+
+    def discard(self):
+        """Forgets captures still being processed (their slide was flattened)"""
+        self.pending = []
+
+    def report(self):
+        if self.pixels_before:
+            saved = 1 - self.pixels_after / self.pixels_before
+            print(f"Trimmed transparent margins off captures: {saved:.0%} fewer pixels.")
@@ -0,0 +1,159 @@
+import copy
+import hashlib
+import io
+import posixpath
+import re
+from lxml import etree
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+from pptx.oxml.ns import qn
+from pptx.parts.image import ImagePart
+from pptx.parts.slide import SlideLayoutPart
+from ppt_renderer import register_layout
+
+# Relationship attributes that may appear inside a slide's shape tree
+_REL_ATTRS = (qn('r:id'), qn('r:embed'), qn('r:link'), qn('r:pict'))
+
+# Trailing index of a partname, e.g. the 3 of /ppt/charts/chart3.xml
+_PARTNAME_INDEX = re.compile(r'\d+(\.\w+)$')
+
+
+def _copy_rels(src_part, dst_part, cloned):
+    """
+    Re-creates src_part's relationships (except to layouts, masters and
+    notes) on dst_part and returns the old -> new rId map. Raster images go
+    through the package image store, which dedupes identical media by SHA1;
+    other parts (e.g. charts, or the SVG of an svgBlip, which the image
+    store cannot open) are cloned into the destination package.
+    """
+    rid_map = {}
+    for rid, rel in src_part.rels.items():
+        if rel.reltype in (RT.SLIDE_LAYOUT, RT.SLIDE_MASTER, RT.NOTES_SLIDE):
+            continue
+        if rel.is_external:
+            rid_map[rid] = dst_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        elif rel.reltype == RT.IMAGE and isinstance(rel.target_part, ImagePart):
+            _, new_rid = dst_part.get_or_add_image_part(io.BytesIO(rel.target_part.blob))
+            rid_map[rid] = new_rid
+        else:
+            rid_map[rid] = dst_part.relate_to(_clone_part(rel.target_part, dst_part.package, cloned), rel.reltype)
+    return rid_map
+
+def _clone_part(src_part, package, cloned):
+    """Copies a part and the parts it relates to into package, under free partnames"""
+    if src_part in cloned:
+        return cloned[src_part]
+    template = _PARTNAME_INDEX.sub(r'%d\1', src_part.partname)
+    if '%d' not in template:
+        root, ext = posixpath.splitext(src_part.partname)
+        template = root + '%d' + ext
+    part = type(src_part).load(package.next_partname(template), src_part.content_type, package, src_part.blob)
+    cloned[src_part] = part
+    rid_map = _copy_rels(src_part, part, cloned)
+    if isinstance(part, XmlPart):
+        _remap_rids(part._element, rid_map)
+    return part
+
+def _remap_rids(tree, rid_map):
+    for node in tree.iter():
+        for attr in _REL_ATTRS:
+            old_rid = node.get(attr)
+            if old_rid in rid_map:
+                node.set(attr, rid_map[old_rid])
+
+
+def _copy_layout(dst_prs, src_layout, cloned):
+    """Adds a copy of src_layout (with its shapes, e.g. slide chrome) to dst_prs"""
+    master_part = dst_prs.slide_masters[0].part
+    package = master_part.package
+    partname = package.next_partname('/ppt/slideLayouts/slideLayout%d.xml')
+    layout_part = SlideLayoutPart(partname, CT.PML_SLIDE_LAYOUT, package, copy.deepcopy(src_layout._element))
+    register_layout(master_part, layout_part)
+    _remap_rids(layout_part._element, _copy_rels(src_layout.part, layout_part, cloned))
+    return layout_part.slide_layout
+
+def _layout_signature(layout):
+    """
+    A layout's XML with every relationship reference replaced by the SHA1 of
+    its target, so identical layouts from different packages compare equal
+    whatever rIds and partnames they got there.
+    """
+    rels = layout.part.rels
+    element = copy.deepcopy(layout._element)
+    for node in element.iter():
+        for attr in _REL_ATTRS:
+            rid = node.get(attr)
+            if rid not in rels:
+                continue
+            rel = rels[rid]
+            node.set(attr, rel.target_ref if rel.is_external else hashlib.sha1(rel.target_part.blob).hexdigest())
+    return etree.tostring(element)
+
+def _layout_for(dst_prs, src_layout, layouts, copied, cloned):
+    """
+    Layout of dst_prs to base a copy of a slide on. A layout identical to
+    the source one (the template's Blank, or PPTRenderer.add_layout chrome
+    an earlier shard already brought in) is reused, otherwise it is copied.
+    layouts maps signatures to dst_prs layouts and is shared across shards;
+    copied caches the answer per source layout part.
+    """
+    if src_layout.part in copied:
+        return copied[src_layout.part]
+    signature = _layout_signature(src_layout)
+    layout = layouts.get(signature)
+    if layout is None:
+        layout = layouts[signature] = _copy_layout(dst_prs, src_layout, cloned)
+    copied[src_layout.part] = layout
+    return layout
+
+
+def _copy_slide(dst_prs, src_slide, layout, cloned):
+    """Appends a copy of src_slide (from another presentation) to dst_prs"""
+    dst_slide = dst_prs.slides.add_slide(layout)
+    dst_part = dst_slide.part
+    rid_map = _copy_rels(src_slide.part, dst_part, cloned)
+
+    src_cSld = src_slide._element.cSld
+    dst_cSld = dst_slide._element.cSld
+
+    # Background (solid fill set by PPTRenderer.add_slide, or a picture fill)
+    if src_cSld.bg is not None:
+        if dst_cSld.bg is not None:
+            dst_cSld.remove(dst_cSld.bg)
+        bg = copy.deepcopy(src_cSld.bg)
+        _remap_rids(bg, rid_map)
+        dst_cSld.insert(0, bg)
+
+    new_tree = copy.deepcopy(src_cSld.spTree)
+    _remap_rids(new_tree, rid_map)
+    dst_cSld.replace(dst_cSld.spTree, new_tree)
+
+    return dst_slide
+
+
+def merge_presentations(shard_paths, output_path):
+    """
+    Concatenates shard .pptx files produced by PPTRenderer into one deck,
+    in the given order. The first shard is used as the base document.
+    """
+    if not shard_paths:
+        raise ValueError("No shard files to merge")
+
+    dst_prs = Presentation(shard_paths[0])
+    layouts = {}
+    for layout in reversed(dst_prs.slide_layouts):
+        # The first of several identical layouts wins
+        layouts[_layout_signature(layout)] = layout
+
+    for path in shard_paths[1:]:
+        src_prs = Presentation(path)
+        if (src_prs.slide_width, src_prs.slide_height) != (dst_prs.slide_width, dst_prs.slide_height):
+            raise ValueError(f"Slide size of {path} does not match {shard_paths[0]}")
+        copied, cloned = {}, {}
+        for src_slide in src_prs.slides:
+            layout = _layout_for(dst_prs, src_slide.slide_layout, layouts, copied, cloned)
+            _copy_slide(dst_prs, src_slide, layout, cloned)
+
+    dst_prs.save(output_path)
+    return len(dst_prs.slides)
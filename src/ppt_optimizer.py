@@ -0,0 +1,296 @@
+import hashlib
+import io
+import math
+import posixpath
+import re
+import zipfile
+import zlib
+from lxml import etree
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from config import DEFAULT_OPTIMIZE_DPI, DEFAULT_ZIP_LEVEL
+
+EMU_PER_INCH = 914400
+
+# Template parts python-pptx's default Presentation() carries that nothing renders
+UNUSED_PART_RELS = (RT.PRINTER_SETTINGS,)
+
+# Parts whose shape trees place pictures
+_PICTURE_PARTS = re.compile(r'^ppt/(slides|slideLayouts|slideMasters)/[^/]+\.xml$')
+_CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+CATEGORIES = ('unused parts', 'duplicate media', 'downsampled media', 'recompression')
+
+
+def _drop_unused_parts(data):
+    """
+    Removes slide layouts no slide is based on, plus unused template parts.
+    python-pptx only writes parts that are still related, so dropping the
+    relationship drops the part (and whatever only it referred to).
+    """
+    prs = Presentation(io.BytesIO(data))
+    for master in prs.slide_masters:
+        layouts = master.slide_layouts
+        unused = [layout for layout in layouts if not layout.used_by_slides]
+        if len(unused) == len(layouts):
+            unused = unused[1:] # a master needs at least one layout
+        for layout in unused:
+            layouts.remove(layout)
+
+    for rId, rel in list(prs.part.rels.items()):
+        if rel.reltype in UNUSED_PART_RELS:
+            prs.part.drop_rel(rId)
+    # The thumbnail hangs off the package itself
+    package = prs.part.package
+    for rel in list(package.iter_rels()):
+        if rel.reltype == RT.THUMBNAIL:
+            package.drop_rel(rel.rId)
+
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def _rels_path(partname):
+    directory, name = posixpath.split(partname)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+def _source_dir(rels_path):
+    """Directory relationship targets in a .rels entry are relative to"""
+    return posixpath.dirname(posixpath.dirname(rels_path))
+
+def _read_rels(entries, rels_path):
+    """Returns {rId: absolute entry name} of a part's internal relationships"""
+    if rels_path not in entries:
+        return {}
+    base = _source_dir(rels_path)
+    targets = {}
+    for rel in etree.fromstring(entries[rels_path]):
+        if rel.get('TargetMode') == 'External':
+            continue
+        targets[rel.get('Id')] = posixpath.normpath(posixpath.join(base, rel.get('Target')))
+    return targets
+
+def _group_scale(element):
+    """Scale applied to a shape by the group shapes it is nested in"""
+    scale_x = scale_y = 1.0
+    for group in element.iterancestors(qn('p:grpSp')):
+        xfrm = group.find(f"{qn('p:grpSpPr')}/{qn('a:xfrm')}")
+        if xfrm is None:
+            continue
+        ext, child_ext = xfrm.find(qn('a:ext')), xfrm.find(qn('a:chExt'))
+        if ext is None or child_ext is None:
+            continue
+        if int(child_ext.get('cx')) and int(child_ext.get('cy')):
+            scale_x *= int(ext.get('cx')) / int(child_ext.get('cx'))
+            scale_y *= int(ext.get('cy')) / int(child_ext.get('cy'))
+    return scale_x, scale_y
+
+def _placed_pixels(blip, slide_size, dpi):
+    """
+    Pixels needed to show a picture fill at `dpi` where it is placed, or None
+    when the placement is not known (e.g. inherited from a placeholder or
+    tiled) and the image has to stay as it is.
+    """
+    blip_fill = blip.getparent()
+    if blip_fill.find(qn('a:tile')) is not None:
+        return None
+
+    owner = next((a for a in blip.iterancestors() if a.tag in (qn('p:pic'), qn('p:sp'), qn('p:bg'))), None)
+    if owner is None:
+        return None
+    if owner.tag == qn('p:bg'):
+        cx, cy = slide_size
+    else:
+        ext = owner.find(f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}")
+        if ext is None:
+            return None
+        scale_x, scale_y = _group_scale(owner)
+        cx, cy = int(ext.get('cx')) * scale_x, int(ext.get('cy')) * scale_y
+
+    # A cropped picture shows only part of the image across its frame
+    visible_x = visible_y = 1.0
+    src_rect = blip_fill.find(qn('a:srcRect'))
+    if src_rect is not None:
+        visible_x -= (int(src_rect.get('l', 0)) + int(src_rect.get('r', 0))) / 100000
+        visible_y -= (int(src_rect.get('t', 0)) + int(src_rect.get('b', 0))) / 100000
+    if visible_x <= 0 or visible_y <= 0:
+        return None
+
+    return (cx / EMU_PER_INCH * dpi / visible_x, cy / EMU_PER_INCH * dpi / visible_y)
+
+def _required_pixels(entries, dpi):
+    """
+    Largest placed size, in pixels at `dpi`, of every media entry; None for
+    media with any use whose placement is unknown.
+    """
+    sld_sz = etree.fromstring(entries['ppt/presentation.xml']).find(qn('p:sldSz'))
+    slide_size = (int(sld_sz.get('cx')), int(sld_sz.get('cy')))
+
+    required = {}
+    for name in entries:
+        if not _PICTURE_PARTS.match(name):
+            continue
+        targets = _read_rels(entries, _rels_path(name))
+        for blip in etree.fromstring(entries[name]).iter(qn('a:blip')):
+            target = targets.get(blip.get(qn('r:embed')))
+            if target is None:
+                continue
+            placed = _placed_pixels(blip, slide_size, dpi)
+            if placed is None or (target in required and required[target] is None):
+                required[target] = None
+            else:
+                previous = required.get(target, (0, 0))
+                required[target] = (max(previous[0], placed[0]), max(previous[1], placed[1]))
+    return required
+
+def downsample_image(blob, required):
+    """
+    Returns the image scaled down so it still covers `required` (width,
+    height) pixels, or None when that would not make it smaller. Only PNG
+    and JPEG are re-encoded, in their own format.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(blob)) as image:
+        if image.format not in ('PNG', 'JPEG'):
+            return None
+        scale = max(required[0] / image.width, required[1] / image.height)
+        if scale >= 0.9: # not worth a lossy re-encode
+            return None
+        size = (max(1, math.ceil(image.width * scale)), max(1, math.ceil(image.height * scale)))
+        image_format = image.format
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA' if image_format == 'PNG' else 'RGB')
+        resized = image.resize(size, Image.LANCZOS)
+
+    output = io.BytesIO()
+    if image_format == 'PNG':
+        resized.save(output, 'PNG', optimize=True)
+    else:
+        resized.save(output, 'JPEG', quality=90, optimize=True)
+    if output.tell() >= len(blob):
+        return None
+    return output.getvalue()
+
+
+def _stored_size(blob, zip_level):
+    return len(zlib.compress(blob, zip_level))
+
+def _drop_entries(entries, names):
+    """Deletes entries along with their content type overrides and relationships"""
+    for name in names:
+        entries.pop(name, None)
+        entries.pop(_rels_path(name), None)
+
+    types = etree.fromstring(entries['[Content_Types].xml'])
+    for override in types.findall(f'{{{_CT_NS}}}Override'):
+        if override.get('PartName').lstrip('/') in names:
+            types.remove(override)
+    entries['[Content_Types].xml'] = etree.tostring(types, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+def _retarget_rels(entries, renames):
+    """Points relationships at `renames` keys to the mapped entry instead"""
+    for rels_path in [n for n in entries if n.endswith('.rels')]:
+        base = _source_dir(rels_path)
+        root = etree.fromstring(entries[rels_path])
+        changed = False
+        for rel in root:
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = posixpath.normpath(posixpath.join(base, rel.get('Target')))
+            if target in renames:
+                rel.set('Target', posixpath.relpath(renames[target], base or '.'))
+                changed = True
+        if changed:
+            entries[rels_path] = etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def optimize_presentation(source, target, dpi=DEFAULT_OPTIMIZE_DPI, zip_level=DEFAULT_ZIP_LEVEL):
+    """
+    Shrinks a saved .pptx: drops unused slide layouts and template parts,
+    downsamples pictures stored at more than `dpi` of their placed size,
+    stores identical media once, and rewrites the zip at `zip_level` (0-9).
+
+    source / target: paths or binary file objects (may be the same path).
+    Returns a report: {'before', 'after'} file sizes and, per category,
+    the number of entries affected and the compressed bytes saved.
+    """
+    if hasattr(source, 'read'):
+        data = source.read()
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+
+    with zipfile.ZipFile(io.BytesIO(data)) as original:
+        original_sizes = {info.filename: info.compress_size for info in original.infolist()}
+
+    with zipfile.ZipFile(io.BytesIO(_drop_unused_parts(data))) as package:
+        order = package.namelist()
+        entries = {name: package.read(name) for name in order}
+    removed = set(original_sizes) - set(entries)
+
+    downsampled = set()
+    for name, required in _required_pixels(entries, dpi).items():
+        if required is None or name not in entries:
+            continue
+        smaller = downsample_image(entries[name], required)
+        # Compare as stored: deflate recovers a lot from poorly compressed PNGs
+        if smaller is not None and _stored_size(smaller, zip_level) < _stored_size(entries[name], zip_level):
+            entries[name] = smaller
+            downsampled.add(name)
+
+    # Identical media (after downsampling) is stored once
+    canonical = {}
+    duplicates = {}
+    for name in sorted(n for n in entries if n.startswith('ppt/media/')):
+        digest = hashlib.sha1(entries[name]).hexdigest()
+        if digest in canonical:
+            duplicates[name] = canonical[digest]
+        else:
+            canonical[digest] = name
+    if duplicates:
+        _retarget_rels(entries, duplicates)
+        _drop_entries(entries, set(duplicates))
+        downsampled -= set(duplicates)
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED, compresslevel=zip_level) as package:
+        for name in order:
+            if name in entries:
+                package.writestr(name, entries[name])
+    with zipfile.ZipFile(io.BytesIO(output.getvalue())) as package:
+        new_sizes = {info.filename: info.compress_size for info in package.infolist()}
+
+    saved = {category: {'count': 0, 'bytes': 0} for category in CATEGORIES}
+    for name, size in original_sizes.items():
+        if name in removed:
+            category = 'unused parts'
+        elif name in duplicates:
+            category = 'duplicate media'
+        elif name in downsampled:
+            category = 'downsampled media'
+        elif name in new_sizes:
+            category = 'recompression'
+        else:
+            continue
+        saved[category]['count'] += 1
+        saved[category]['bytes'] += size - new_sizes.get(name, 0)
+
+    if hasattr(target, 'write'):
+        target.write(output.getvalue())
+    else:
+        with open(target, 'wb') as f:
+            f.write(output.getvalue())
+
+    return {'before': len(data), 'after': output.tell(), 'saved': saved}
+
+
+def print_report(report):
+    before, after = report['before'], report['after']
+    print(f"Optimized: {before / 1024:.1f} KB -> {after / 1024:.1f} KB ({(before - after) / max(before, 1):.0%} smaller)")
+    for category in CATEGORIES:
+        entry = report['saved'][category]
+        if entry['count']:
+            print(f"  {category}: {entry['count']} entries, {entry['bytes'] / 1024:.1f} KB saved")
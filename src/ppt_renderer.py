@@ -1,12 +1,133 @@
-import os
+import copy
+import hashlib
+import re
+from xml.sax.saxutils import escape
 from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.parts.slide import SlideLayoutPart
+from pptx.shapes.shapetree import SlideShapes
 from pptx.util import Pt
 from pptx.enum.shapes import MSO_SHAPE, MSO_CONNECTOR
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+from pptx.chart.data import CategoryChartData
 from pptx.dml.color import RGBColor
 from utils import px_to_emu, parse_color, parse_rgb_string
 from config import PPT_WIDTH_PX, PPT_HEIGHT_PX, TEXT_WIDTH_FACTOR
 
+# Style id python-pptx assigns to new tables (Medium Style 2 - Accent 1)
+DEFAULT_TABLE_STYLE_ID = '{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}'
+TABLE_ALIGN = {'left': 'l', 'start': 'l', 'center': 'ctr', 'right': 'r', 'end': 'r', 'justify': 'just'}
+
+# data-chart-type values and the native chart each becomes
+CHART_TYPES = {
+    'bar': XL_CHART_TYPE.COLUMN_CLUSTERED,
+    'column': XL_CHART_TYPE.COLUMN_CLUSTERED,
+    'stacked-bar': XL_CHART_TYPE.COLUMN_STACKED,
+    'horizontal-bar': XL_CHART_TYPE.BAR_CLUSTERED,
+    'line': XL_CHART_TYPE.LINE_MARKERS,
+    'area': XL_CHART_TYPE.AREA,
+    'pie': XL_CHART_TYPE.PIE,
+    'doughnut': XL_CHART_TYPE.DOUGHNUT,
+}
+PER_POINT_CHARTS = ('pie', 'doughnut')
+
+# Office 2016 extension that attaches an SVG to a picture's PNG blip
+SVG_CONTENT_TYPE = 'image/svg+xml'
+SVG_BLIP_EXT_URI = '{96DAC541-7B7A-43D3-8B79-37D633B846F1}'
+SVG_BLIP_NS = 'http://schemas.microsoft.com/office/drawing/2016/SVG/main'
+
+# Characters that are not allowed in XML 1.0
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def choose_font(font_family_str):
+    """Picks the first font of a CSS font-family list that PowerPoint can rely on"""
+    safe_fonts = ["Arial", "Calibri", "Times New Roman", "Microsoft YaHei", "SimHei", "Verdana", "Tahoma"]
+    # Remove quotes and split
+    font_families = [f.strip().replace('"', '').replace("'", "") for f in font_family_str.split(',')]
+
+    for f in font_families:
+        if f in safe_fonts:
+            return f
+    return "Arial" # Default
+
+def _xml_text(text):
+    return escape(_INVALID_XML_CHARS.sub('', text), {'"': '&quot;'})
+
+def _solid_fill_xml(color_string):
+    rgb, alpha = parse_color(color_string)
+    alpha_xml = f'<a:alpha val="{int(round(alpha * 100000))}"/>' if alpha < 1.0 else ''
+    return f'<a:solidFill><a:srgbClr val="{rgb}">{alpha_xml}</a:srgbClr></a:solidFill>'
+
+def is_bold(font_weight):
+    return (font_weight.isdigit() and int(font_weight) >= 600) or font_weight == 'bold'
+
+def apply_font(run, run_data, opacity=1.0):
+    """Applies one extracted text run's font, color and link to a python-pptx run"""
+    run.text = run_data['text']
+    font = run.font
+    font.size = Pt(float(run_data['fontSize'].replace('px', '')) * 0.75)
+    font.name = choose_font(run_data['fontFamily'])
+    if is_bold(run_data['fontWeight']):
+        font.bold = True
+    if run_data['fontStyle'] in ('italic', 'oblique'):
+        font.italic = True
+    if run_data['underline']:
+        font.underline = True
+    rgb, alpha = parse_color(run_data['color'])
+    font.color.rgb = rgb
+    set_fill_alpha(font._element, alpha * opacity)
+    if run_data.get('href'):
+        run.hyperlink.address = run_data['href']
+
+def element_opacity(el_data):
+    """Effective opacity of an element (own opacity times its ancestors')"""
+    if 'effectiveOpacity' in el_data:
+        return float(el_data['effectiveOpacity'])
+    return float(el_data['styles'].get('opacity', '1'))
+
+def set_fill_alpha(element, alpha):
+    """
+    Applies alpha to the solid fill directly under element
+    (spPr, rPr/defRPr or ln) by adding <a:alpha> to its color.
+    """
+    if alpha >= 1.0:
+        return
+    clr = element.find(f"{qn('a:solidFill')}/{qn('a:srgbClr')}")
+    if clr is None:
+        return
+    for old in clr.findall(qn('a:alpha')):
+        clr.remove(old)
+    clr.append(clr.makeelement(qn('a:alpha'), {'val': str(int(round(max(0.0, alpha) * 100000)))}))
+
+def set_line_alpha(shape, alpha):
+    ln = shape._element.spPr.find(qn('a:ln'))
+    if ln is not None:
+        set_fill_alpha(ln, alpha)
+
+# Slide layout ids in sldLayoutIdLst start above this value (ECMA-376 ST_SlideLayoutId)
+_MIN_LAYOUT_ID = 2147483648
+
+def register_layout(master_part, layout_part):
+    """Relates a new slide layout part to its master and lists it in the master's sldLayoutIdLst"""
+    layout_part.relate_to(master_part, RT.SLIDE_MASTER)
+    rId = master_part.relate_to(layout_part, RT.SLIDE_LAYOUT)
+    id_lst = master_part._element.get_or_add_sldLayoutIdLst()
+    next_id = max([int(e.get('id')) for e in id_lst.sldLayoutId_lst] + [_MIN_LAYOUT_ID]) + 1
+    entry = id_lst._add_sldLayoutId()
+    entry.set('id', str(next_id))
+    entry.set(qn('r:id'), rId)
+
+class LayoutCanvas:
+    """Lets the create_* helpers draw onto a slide layout as if it were a slide"""
+    def __init__(self, slide_layout):
+        self.slide_layout = slide_layout
+        self.part = slide_layout.part
+        self.shapes = SlideShapes(slide_layout._element.cSld.spTree, self)
+
 class PPTRenderer:
     def __init__(self, output_path):
         self.output_path = output_path
@@ -14,6 +135,8 @@ class PPTRenderer:
         self.prs.slide_width = px_to_emu(PPT_WIDTH_PX)
         self.prs.slide_height = px_to_emu(PPT_HEIGHT_PX)
         self.blank_slide_layout = self.prs.slide_layouts[6]
+        # SVG parts by content hash, so repeated icons are stored once
+        self._svg_parts = {}
 
     def create_text_box(self, slide, el_data):
         """Helper to create a text box from element data"""
@@ -46,59 +169,69 @@ class PPTRenderer:
         tf.word_wrap = True
         
         p = tf.paragraphs[0]
-        p.text = el_data['text']
-        
-        # Apply Styles
         font_size_px = float(el_data['styles']['fontSize'].replace('px', ''))
-        p.font.size = Pt(font_size_px * 0.75) # Convert px to pt
+        # Text color alpha and element opacity are applied natively as <a:alpha>
+        opacity = element_opacity(el_data)
+
+        if el_data.get('runs'):
+            # Mixed inline styles: one run per styled span, paragraphs split at blocks
+            for run_data in el_data['runs']:
+                if run_data.get('break') == 'paragraph':
+                    p = tf.add_paragraph()
+                elif run_data.get('break'):
+                    p.add_line_break()
+                else:
+                    apply_font(p.add_run(), run_data, opacity)
+        else:
+            p.text = el_data['text']
         
-        p.font.color.rgb = parse_rgb_string(el_data['styles']['color'])
+            # Apply Styles
+            p.font.size = Pt(font_size_px * 0.75) # Convert px to pt
         
-        # Basic Bold check
-        fw = el_data['styles']['fontWeight']
-        if (fw.isdigit() and int(fw) >= 600) or fw == 'bold':
-            p.font.bold = True
-            
-        # Font Fallback
-        safe_fonts = ["Arial", "Calibri", "Times New Roman", "Microsoft YaHei", "SimHei", "Verdana", "Tahoma"]
-        font_family_str = el_data['styles']['fontFamily']
-        # Remove quotes and split
-        font_families = [f.strip().replace('"', '').replace("'", "") for f in font_family_str.split(',')]
+            rgb, text_alpha = parse_color(el_data['styles']['color'])
+            p.font.color.rgb = rgb
+            set_fill_alpha(p.font._element, text_alpha * opacity)
         
-        chosen_font = "Arial" # Default
-        for f in font_families:
-            if f in safe_fonts:
-                chosen_font = f
-                break
-        p.font.name = chosen_font
+            # Basic Bold check
+            if is_bold(el_data['styles']['fontWeight']):
+                p.font.bold = True
+            
+            # Font Fallback
+            p.font.name = choose_font(el_data['styles']['fontFamily'])
+
+            # Hyperlink
+            if el_data.get('href'):
+                # Ensure we have a run
+                if not p.runs:
+                    p.add_run()
+                r = p.runs[0]
+                r.hyperlink.address = el_data['href']
 
         # Line Height
+        line_spacing = None
         line_height = el_data['styles']['lineHeight']
         if line_height != 'normal':
             if line_height.endswith('px'):
                 lh_px = float(line_height.replace('px', ''))
-                p.line_spacing = lh_px / font_size_px
+                line_spacing = lh_px / font_size_px
             elif line_height.replace('.', '', 1).isdigit():
-                 p.line_spacing = float(line_height)
-
-        # Hyperlink
-        if el_data.get('href'):
-            # Ensure we have a run
-            if not p.runs:
-                p.add_run()
-            r = p.runs[0]
-            r.hyperlink.address = el_data['href']
+                 line_spacing = float(line_height)
 
         # Alignment
         align = el_data['styles']['textAlign']
         if align == 'center':
-            p.alignment = PP_ALIGN.CENTER
+            alignment = PP_ALIGN.CENTER
         elif align == 'right':
-            p.alignment = PP_ALIGN.RIGHT
+            alignment = PP_ALIGN.RIGHT
         elif align == 'justify':
-            p.alignment = PP_ALIGN.JUSTIFY
+            alignment = PP_ALIGN.JUSTIFY
         else:
-            p.alignment = PP_ALIGN.LEFT
+            alignment = PP_ALIGN.LEFT
+
+        for p in tf.paragraphs:
+            if line_spacing is not None:
+                p.line_spacing = line_spacing
+            p.alignment = alignment
 
         # Vertical Alignment (Text Frame)
         display = el_data['styles']['display']
@@ -130,8 +263,7 @@ class PPTRenderer:
             rgb, alpha = parse_color(bg_color)
             textbox.fill.solid()
             textbox.fill.fore_color.rgb = rgb
-            if alpha < 1.0:
-                textbox.fill.transparency = 1.0 - alpha
+            set_fill_alpha(textbox._element.spPr, alpha * opacity)
 
         # Border Bottom Handling
         border_bottom_width = el_data['styles'].get('borderBottomWidth')
@@ -146,6 +278,7 @@ class PPTRenderer:
                     line.line.width = Pt(width_val * 0.75)
                     rgb, alpha = parse_color(el_data['styles']['borderBottomColor'])
                     line.line.color.rgb = rgb
+                    set_line_alpha(line, alpha * opacity)
             except Exception as e:
                 print(f"WARNING: Failed to add bottom border: {e}")
 
@@ -162,6 +295,7 @@ class PPTRenderer:
                     line.line.width = Pt(width_val * 0.75)
                     rgb, alpha = parse_color(el_data['styles']['borderLeftColor'])
                     line.line.color.rgb = rgb
+                    set_line_alpha(line, alpha * opacity)
             except Exception as e:
                 print(f"WARNING: Failed to add left border: {e}")
 
@@ -198,7 +332,7 @@ class PPTRenderer:
         
         # Fill Color
         bg_color = el_data['styles']['backgroundColor']
-        opacity = float(el_data['styles'].get('opacity', '1'))
+        opacity = element_opacity(el_data)
 
         if bg_color and bg_color != 'rgba(0, 0, 0, 0)' and bg_color != 'transparent':
             rgb, alpha = parse_color(bg_color)
@@ -206,10 +340,7 @@ class PPTRenderer:
             shape.fill.fore_color.rgb = rgb
             
             # Combine alpha and opacity
-            final_alpha = alpha * opacity
-            if final_alpha < 1.0:
-                shape.fill.transparency = 1.0 - final_alpha
-                # print(f"DEBUG: Shape {el_data.get('id')} transparency set to {1.0 - final_alpha} (alpha={alpha}, opacity={opacity})")
+            set_fill_alpha(shape._element.spPr, alpha * opacity)
         else:
             shape.fill.background() # No fill
             
@@ -221,6 +352,7 @@ class PPTRenderer:
                 shape.line.width = Pt(width_val * 0.75)
                 rgb, alpha = parse_color(el_data['styles']['borderTopColor'])
                 shape.line.color.rgb = rgb
+                set_line_alpha(shape, alpha * opacity)
         else:
             shape.line.fill.background() # No line
 
@@ -237,64 +369,181 @@ class PPTRenderer:
                     line.line.width = Pt(width_val * 0.75)
                     rgb, alpha = parse_color(el_data['styles']['borderLeftColor'])
                     line.line.color.rgb = rgb
+                    set_line_alpha(line, alpha * opacity)
             except Exception as e:
                 print(f"WARNING: Failed to add left border to shape: {e}")
 
     def create_table(self, slide, el_data):
-        """Helper to create a table from element data"""
+        """
+        Helper to create a table from element data.
+        The <a:tbl> XML is generated in one pass from the extracted grid
+        (including merged cells) instead of going through per-cell
+        python-pptx setters, which keeps large tables fast.
+        """
+        grid = el_data.get('table')
+        if not grid or not grid['cells'] or not grid['colWidths']:
+            return
+
         x = px_to_emu(el_data['x'])
         y = px_to_emu(el_data['y'])
-        w = px_to_emu(el_data['width'])
-        h = px_to_emu(el_data['height'])
-        
-        rows = el_data['rows']
-        if not rows:
+        col_widths = [px_to_emu(w) for w in grid['colWidths']]
+        row_heights = [px_to_emu(h) for h in grid['rowHeights']]
+
+        # Anchor cells by position; everything else is covered by a span
+        anchors = {(c['row'], c['col']): c for c in grid['cells']}
+        covered = {}
+        for c in grid['cells']:
+            for dr in range(c['rowSpan']):
+                for dc in range(c['colSpan']):
+                    if dr or dc:
+                        covered[(c['row'] + dr, c['col'] + dc)] = (dr > 0, dc > 0)
+
+        parts = [
+            f'<a:tbl {nsdecls("a")}>',
+            f'<a:tblPr firstRow="1" bandRow="1"><a:tableStyleId>{DEFAULT_TABLE_STYLE_ID}</a:tableStyleId></a:tblPr>',
+            '<a:tblGrid>',
+        ]
+        parts.extend(f'<a:gridCol w="{w}"/>' for w in col_widths)
+        parts.append('</a:tblGrid>')
+
+        for row_idx, row_h in enumerate(row_heights):
+            parts.append(f'<a:tr h="{row_h}">')
+            for col_idx in range(len(col_widths)):
+                cell_data = anchors.get((row_idx, col_idx))
+                if cell_data:
+                    parts.append(self._table_cell_xml(cell_data))
+                else:
+                    v_merge, h_merge = covered.get((row_idx, col_idx), (False, False))
+                    attrs = (' hMerge="1"' if h_merge else '') + (' vMerge="1"' if v_merge else '')
+                    parts.append(f'<a:tc{attrs}><a:txBody><a:bodyPr/><a:lstStyle/><a:p/></a:txBody><a:tcPr/></a:tc>')
+            parts.append('</a:tr>')
+        parts.append('</a:tbl>')
+
+        table_shape = slide.shapes.add_table(1, 1, x, y, sum(col_widths), sum(row_heights))
+        graphic_data = table_shape._element.graphicData
+        graphic_data.replace(graphic_data.tbl, parse_xml(''.join(parts)))
+        return table_shape
+
+    def _table_cell_xml(self, cell_data):
+        styles = cell_data['styles']
+        attrs = ''
+        if cell_data['colSpan'] > 1:
+            attrs += f' gridSpan="{cell_data["colSpan"]}"'
+        if cell_data['rowSpan'] > 1:
+            attrs += f' rowSpan="{cell_data["rowSpan"]}"'
+
+        # Run properties: size (hundredths of a pt), bold, color, font
+        font_size_px = float(styles['fontSize'].replace('px', ''))
+        r_attrs = f' lang="en-US" sz="{int(round(font_size_px * 0.75 * 100))}"'
+        if is_bold(styles['fontWeight']):
+            r_attrs += ' b="1"'
+        color_xml = _solid_fill_xml(styles['color'])
+        font_xml = f'<a:latin typeface="{_xml_text(choose_font(styles.get("fontFamily", "")))}"/>'
+        r_pr = f'<a:rPr{r_attrs}>{color_xml}{font_xml}</a:rPr>'
+
+        algn = TABLE_ALIGN.get(styles.get('textAlign'), 'l')
+        paragraphs = []
+        for line in cell_data['text'].split('\n'):
+            run = f'<a:r>{r_pr}<a:t>{_xml_text(line)}</a:t></a:r>' if line else ''
+            paragraphs.append(f'<a:p><a:pPr algn="{algn}"/>{run}<a:endParaRPr{r_attrs}/></a:p>')
+
+        # Cell Background
+        bg_color = styles['backgroundColor']
+        tc_pr = '<a:tcPr/>'
+        if bg_color and bg_color != 'rgba(0, 0, 0, 0)' and bg_color != 'transparent':
+            tc_pr = f'<a:tcPr>{_solid_fill_xml(bg_color)}</a:tcPr>'
+
+        return f'<a:tc{attrs}><a:txBody><a:bodyPr/><a:lstStyle/>{"".join(paragraphs)}</a:txBody>{tc_pr}</a:tc>'
+
+    def create_chart(self, slide, el_data):
+        """
+        Creates a native chart from the element's extracted chart data
+        ({type, title, categories, series, colors, legend}).
+        """
+        chart_info = el_data['chart']
+        chart_kind = chart_info['type']
+        if chart_kind not in CHART_TYPES:
+            print(f"WARNING: Unknown chart type '{chart_kind}' for {el_data['id']}, using 'bar'.")
+            chart_kind = 'bar'
+
+        chart_data = CategoryChartData()
+        chart_data.categories = chart_info['categories']
+        for series in chart_info['series']:
+            chart_data.add_series(series['name'], series['values'])
+
+        chart = slide.shapes.add_chart(
+            CHART_TYPES[chart_kind],
+            px_to_emu(el_data['x']), px_to_emu(el_data['y']),
+            px_to_emu(el_data['width']), px_to_emu(el_data['height']),
+            chart_data
+        ).chart
+
+        # Text follows the element's font
+        styles = el_data['styles']
+        chart.font.name = choose_font(styles['fontFamily'])
+        chart.font.size = Pt(float(styles['fontSize'].replace('px', '')) * 0.75)
+        chart.font.color.rgb = parse_rgb_string(styles['color'])
+
+        chart.has_title = bool(chart_info.get('title'))
+        if chart.has_title:
+            chart.chart_title.text_frame.text = chart_info['title']
+
+        legend = chart_info.get('legend')
+        if legend is None:
+            legend = len(chart_info['series']) > 1 or chart_kind in PER_POINT_CHARTS
+        chart.has_legend = legend
+        if legend:
+            chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+            chart.legend.include_in_layout = False
+
+        plot = chart.plots[0]
+        if chart_kind in PER_POINT_CHARTS:
+            for point_index, color in enumerate(chart_info.get('colors') or []):
+                if color and point_index < len(chart_info['categories']):
+                    fill = plot.series[0].points[point_index].format.fill
+                    fill.solid()
+                    fill.fore_color.rgb = parse_rgb_string(color)
             return
 
-        num_rows = len(rows)
-        num_cols = len(rows[0])
-        
-        table_shape = slide.shapes.add_table(num_rows, num_cols, x, y, w, h)
-        table = table_shape.table
-        
-        # Set column widths (based on first row)
-        for col_idx, cell_data in enumerate(rows[0]):
-            table.columns[col_idx].width = px_to_emu(cell_data['width'])
-
-        for row_idx, row_data in enumerate(rows):
-            # Set row height (max height of cells in row)
-            max_h = max([c['height'] for c in row_data])
-            table.rows[row_idx].height = px_to_emu(max_h)
-            
-            for col_idx, cell_data in enumerate(row_data):
-                cell = table.cell(row_idx, col_idx)
-                cell.text = cell_data['text']
-                
-                # Apply Styles to Cell Text
-                p = cell.text_frame.paragraphs[0]
-                font_size_px = float(cell_data['styles']['fontSize'].replace('px', ''))
-                p.font.size = Pt(font_size_px * 0.75)
-                p.font.color.rgb = parse_rgb_string(cell_data['styles']['color'])
-                
-                # Bold check
-                fw = cell_data['styles']['fontWeight']
-                if (fw.isdigit() and int(fw) >= 600) or fw == 'bold':
-                    p.font.bold = True
-                    
-                # Cell Background
-                bg_color = cell_data['styles']['backgroundColor']
-                if bg_color and bg_color != 'rgba(0, 0, 0, 0)' and bg_color != 'transparent':
-                    rgb, alpha = parse_color(bg_color)
-                    cell.fill.solid()
-                    cell.fill.fore_color.rgb = rgb
-                    if alpha < 1.0:
-                        cell.fill.transparency = 1.0 - alpha
-
-    def add_slide(self, slide_data, bg_image_path=None):
-        slide = self.prs.slides.add_slide(self.blank_slide_layout)
+        for series, series_info in zip(plot.series, chart_info['series']):
+            if not series_info.get('color'):
+                continue
+            rgb = parse_rgb_string(series_info['color'])
+            if chart_kind == 'line':
+                series.format.line.color.rgb = rgb
+                series.marker.format.fill.solid()
+                series.marker.format.fill.fore_color.rgb = rgb
+            else:
+                series.format.fill.solid()
+                series.format.fill.fore_color.rgb = rgb
+
+    def add_layout(self, name):
+        """
+        Creates a new slide layout (a copy of the blank layout) and returns a
+        LayoutCanvas for it. Shapes drawn on it appear on every slide using it.
+        """
+        master_part = self.blank_slide_layout.part.slide_master.part
+        package = master_part.package
+        partname = package.next_partname('/ppt/slideLayouts/slideLayout%d.xml')
+        element = copy.deepcopy(self.blank_slide_layout._element)
+        element.cSld.set('name', name)
+        layout_part = SlideLayoutPart(partname, CT.PML_SLIDE_LAYOUT, package, element)
+        register_layout(master_part, layout_part)
+
+        return LayoutCanvas(layout_part.slide_layout)
+
+    def add_slide(self, slide_data, bg_image=None, layout=None):
+        """
+        bg_image may be a path or a file-like object holding the PNG.
+        layout: optional LayoutCanvas from add_layout to base the slide on.
+        """
+        slide = self.prs.slides.add_slide(layout.slide_layout if layout else self.blank_slide_layout)
         
-        if bg_image_path:
-            slide.shapes.add_picture(bg_image_path, 0, 0, self.prs.slide_width, self.prs.slide_height)
+        if bg_image and layout:
+            # A picture shape would cover the layout's shapes, use it as the slide background instead
+            self._set_picture_background(slide, bg_image)
+        elif bg_image:
+            slide.shapes.add_picture(bg_image, 0, 0, self.prs.slide_width, self.prs.slide_height)
         else:
             slide_bg_color = slide_data['backgroundColor']
             background = slide.background
@@ -307,7 +556,20 @@ class PPTRenderer:
         
         return slide
 
-    def add_image_element(self, slide, el_data, image_path, crop_info=None):
+    def _set_picture_background(self, slide, image):
+        _, rId = slide.part.get_or_add_image_part(image)
+        bg = parse_xml(
+            f'<p:bg {nsdecls("p", "a", "r")}><p:bgPr>'
+            f'<a:blipFill rotWithShape="1"><a:blip r:embed="{rId}"/><a:stretch><a:fillRect/></a:stretch></a:blipFill>'
+            f'<a:effectLst/></p:bgPr></p:bg>'
+        )
+        cSld = slide._element.cSld
+        if cSld.bg is not None:
+            cSld.remove(cSld.bg)
+        cSld.insert(0, bg)
+
+    def add_image_element(self, slide, el_data, image, crop_info=None):
+        """image may be a path or a file-like object holding the PNG"""
         x = px_to_emu(el_data['x'])
         y = px_to_emu(el_data['y'])
         w = px_to_emu(el_data['width'])
@@ -334,9 +596,42 @@ class PPTRenderer:
             img_w = px_to_emu(final_w)
             img_h = px_to_emu(final_h)
             
-            slide.shapes.add_picture(image_path, img_x, img_y, img_w, img_h)
+            slide.shapes.add_picture(image, img_x, img_y, img_w, img_h)
         else:
-            slide.shapes.add_picture(image_path, x, y, w, h)
+            slide.shapes.add_picture(image, x, y, w, h)
+
+    def add_source_image(self, slide, el_data, image, svg_image=None):
+        """
+        Places an original image asset at the geometry reported by the extractor.
+        image is the bitmap (the PNG fallback for SVGs); svg_image, if given,
+        is embedded as the vector version via the Office 2016 svgBlip extension.
+        """
+        source = el_data['source']
+        picture = slide.shapes.add_picture(
+            image,
+            px_to_emu(source['x']), px_to_emu(source['y']),
+            px_to_emu(source['width']), px_to_emu(source['height'])
+        )
+
+        if svg_image:
+            digest = hashlib.sha1(svg_image).hexdigest()
+            svg_part = self._svg_parts.get(digest)
+            if svg_part is None:
+                package = slide.part.package
+                svg_part = Part(package.next_image_partname('svg'), SVG_CONTENT_TYPE, package, svg_image)
+                self._svg_parts[digest] = svg_part
+            rId = slide.part.relate_to(svg_part, RT.IMAGE)
+
+            blip = picture._element.blipFill.blip
+            ext_lst = parse_xml(
+                f'<a:extLst {nsdecls("a", "r")}>'
+                f'<a:ext uri="{SVG_BLIP_EXT_URI}">'
+                f'<asvg:svgBlip xmlns:asvg="{SVG_BLIP_NS}" r:embed="{rId}"/>'
+                f'</a:ext></a:extLst>'
+            )
+            blip.append(ext_lst)
+
+        return picture
 
     def save(self):
         self.prs.save(self.output_path)
@@ -0,0 +1,118 @@
+import io
+import json
+import mmap
+import struct
+import zipfile
+
+SCENE_FORMAT = 'webppt-scene'
+SCENE_VERSION = 4
+
+# Size of the fixed part of a zip local file header (before name/extra fields)
+_LOCAL_HEADER_SIZE = 30
+
+
+class SceneError(Exception):
+    pass
+
+
+class Scene:
+    """
+    Browser-free intermediate representation of an extracted deck.
+
+    Holds the `slides_data` list produced by the extraction stage (with the
+    final element types and image references already resolved) together with
+    the captured image blobs. Saved as a zip container: `scene.json` is
+    deflated, images are stored uncompressed so they can be served straight
+    from a memory map when the scene is loaded again.
+    """
+
+    def __init__(self, slides=None, meta=None, layouts=None):
+        self.slides = slides if slides is not None else []
+        # Shared slide chrome, see chrome.hoist_slide_chrome
+        self.layouts = layouts if layouts is not None else []
+        self.meta = meta if meta is not None else {}
+        self._images = {}
+        self._file = None
+        self._mmap = None
+        self._offsets = {}
+
+    def add_image(self, name, data):
+        """Registers a captured PNG blob and returns its reference"""
+        ref = f"images/{name}"
+        self._images[ref] = data
+        return ref
+
+    def remove_image(self, ref):
+        """Drops a blob registered with add_image (e.g. from an abandoned slide)"""
+        self._images.pop(ref, None)
+
+    def image_refs(self):
+        return list(self._images.keys()) + [r for r in self._offsets if r not in self._images]
+
+    def image_bytes(self, ref):
+        if ref in self._images:
+            return self._images[ref]
+        if ref in self._offsets:
+            offset, size = self._offsets[ref]
+            return self._mmap[offset:offset + size]
+        raise SceneError(f"Unknown image reference '{ref}'")
+
+    def open_image(self, ref):
+        """Returns a file-like object suitable for python-pptx add_picture"""
+        return io.BytesIO(self.image_bytes(ref))
+
+    def save(self, path):
+        document = {
+            'format': SCENE_FORMAT,
+            'version': SCENE_VERSION,
+            'meta': self.meta,
+            'slides': self.slides,
+            'layouts': self.layouts,
+        }
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr('scene.json', json.dumps(document, ensure_ascii=False), compress_type=zipfile.ZIP_DEFLATED)
+            for ref in self.image_refs():
+                # PNG is already compressed; storing keeps payloads mappable
+                zf.writestr(ref, self.image_bytes(ref), compress_type=zipfile.ZIP_STORED)
+
+    @classmethod
+    def load(cls, path):
+        f = open(path, 'rb')
+        try:
+            with zipfile.ZipFile(f) as zf:
+                document = json.loads(zf.read('scene.json').decode('utf-8'))
+                infos = [info for info in zf.infolist() if info.filename.startswith('images/')]
+        except (zipfile.BadZipFile, KeyError) as e:
+            f.close()
+            raise SceneError(f"{path} is not a WebPPT scene: {e}")
+
+        if document.get('format') != SCENE_FORMAT:
+            f.close()
+            raise SceneError(f"{path} is not a WebPPT scene")
+        if document.get('version') != SCENE_VERSION:
+            f.close()
+            raise SceneError(f"Unsupported scene version {document.get('version')} (expected {SCENE_VERSION})")
+
+        scene = cls(document['slides'], document.get('meta', {}), document.get('layouts', []))
+        scene._file = f
+        if infos:
+            scene._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            for info in infos:
+                if info.compress_type != zipfile.ZIP_STORED:
+                    # Not produced by us; fall back to an in-memory copy
+                    with zipfile.ZipFile(f) as zf:
+                        scene._images[info.filename] = zf.read(info.filename)
+                    continue
+                header = scene._mmap[info.header_offset:info.header_offset + _LOCAL_HEADER_SIZE]
+                name_len, extra_len = struct.unpack('<HH', header[26:30])
+                offset = info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len
+                scene._offsets[info.filename] = (offset, info.file_size)
+        return scene
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
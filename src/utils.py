@@ -1,11 +1,16 @@
 import re
-from pptx.dml.color import RGBColor
 from config import PX_TO_EMU
 
+# RGBColor is imported inside the functions that build colors, so argument
+# parsing and .wp compilation never load python-pptx
+_COLOR_PATTERN = re.compile(r'rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*([\d.]+))?\)')
+_SLIDE_RANGE_PATTERN = re.compile(r'^\s*(\d+)\s*(?:(-)\s*(\d*))?\s*$')
+
 def px_to_emu(px):
     return int(px * PX_TO_EMU)
 
 def hex_to_rgb(hex_color):
+    from pptx.dml.color import RGBColor
     hex_color = hex_color.lstrip('#')
     if len(hex_color) == 3:
         hex_color = ''.join([c*2 for c in hex_color])
@@ -13,8 +18,9 @@ def hex_to_rgb(hex_color):
 
 def parse_color(color_string):
     """Parses 'rgb(r, g, b)' or 'rgba(r, g, b, a)' into (RGBColor, alpha)"""
+    from pptx.dml.color import RGBColor
     # Match rgba(r, g, b, a) or rgb(r, g, b)
-    match = re.match(r'rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*([\d.]+))?\)', color_string)
+    match = _COLOR_PATTERN.match(color_string)
     if match:
         r, g, b = int(match.group(1)), int(match.group(2)), int(match.group(3))
         a_str = match.group(4)
@@ -26,3 +32,35 @@ def parse_rgb_string(rgb_string):
     """Parses 'rgb(0, 120, 212)' into RGBColor object (Backward compatibility)"""
     rgb, _ = parse_color(rgb_string)
     return rgb
+
+def parse_slide_range(range_string):
+    """Parses '41-80', '41-' or '7' into a 1-based inclusive (first, last) tuple"""
+    match = _SLIDE_RANGE_PATTERN.match(range_string)
+    if not match:
+        raise ValueError(f"Invalid slide range '{range_string}' (expected e.g. 41-80)")
+    first = int(match.group(1))
+    if match.group(2):
+        last = int(match.group(3)) if match.group(3) else None
+    else:
+        last = first
+    if first < 1 or (last is not None and last < first):
+        raise ValueError(f"Invalid slide range '{range_string}'")
+    return first, last
+
+def sniff_image_format(data):
+    """
+    Returns the extension of an image blob PowerPoint can embed
+    ('png', 'jpg', 'gif', 'bmp' or 'svg'), or None.
+    """
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if data.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if data.startswith(b'BM'):
+        return 'bmp'
+    head = data[:1024].lstrip()
+    if head.startswith(b'<') and b'<svg' in head:
+        return 'svg'
+    return None
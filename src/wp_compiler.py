@@ -1,5 +1,12 @@
 import re
 
+# Compiled once per process, not on every compile() call
+BLOCK_PATTERNS = {
+    name: re.compile(rf'<{name}>(.*?)</{name}>', re.DOTALL) for name in ('ppt', 'style', 'script')
+}
+ATTR_PATTERN = re.compile(r'([\w:-]+)=(?:"([^"]*)"|\'([^\']*)\')')
+OPEN_TAG_PATTERN = re.compile(r'<(ppt-[\w-]+)([^>]*)>')
+
 class WPCompiler:
     def __init__(self):
         # Configuration for tag transformation
@@ -9,6 +16,7 @@ class WPCompiler:
             'ppt-shape': {'tag': 'div', 'default_attrs': {'data-ppt-render': 'shape'}},
             'ppt-image': {'tag': 'div', 'default_attrs': {'data-ppt-render': 'image'}},
             'ppt-table': {'tag': 'table', 'default_attrs': {'data-ppt-render': 'table'}},
+            'ppt-chart': {'tag': 'div', 'default_attrs': {'data-ppt-render': 'chart'}},
         }
 
     def compile(self, wp_content: str) -> str:
@@ -16,9 +24,9 @@ class WPCompiler:
         Compiles .wp content into a full HTML string.
         """
         # 1. Extract blocks
-        ppt_match = re.search(r'<ppt>(.*?)</ppt>', wp_content, re.DOTALL)
-        style_match = re.search(r'<style>(.*?)</style>', wp_content, re.DOTALL)
-        script_match = re.search(r'<script>(.*?)</script>', wp_content, re.DOTALL)
+        ppt_match = BLOCK_PATTERNS['ppt'].search(wp_content)
+        style_match = BLOCK_PATTERNS['style'].search(wp_content)
+        script_match = BLOCK_PATTERNS['script'].search(wp_content)
 
         ppt_content = ppt_match.group(1) if ppt_match else ""
         style_content = style_match.group(1) if style_match else ""
@@ -81,14 +89,13 @@ class WPCompiler:
             # Parse existing attributes to handle merging (especially 'class')
             # Simple parser: key="value" or key='value'
             user_attrs = {}
-            attr_pattern = re.compile(r'(\w+)=["\']([^"\']*)["\']')
             
             # Remove parsed attributes from attrs_str to keep unparsed ones (like boolean attrs or unquoted)
             # For simplicity, we will reconstruct the attribute string.
             
-            for attr_match in attr_pattern.finditer(attrs_str):
+            for attr_match in ATTR_PATTERN.finditer(attrs_str):
                 key = attr_match.group(1)
-                val = attr_match.group(2)
+                val = attr_match.group(2) if attr_match.group(2) is not None else attr_match.group(3)
                 user_attrs[key] = val
             
             # Merge logic
@@ -115,14 +122,14 @@ class WPCompiler:
             # Actually, let's just use the dictionary approach. It covers 99% of cases.
             # If user uses boolean attributes, they usually don't apply to our container divs.
             
-            attrs_output = " ".join([f'{k}="{v}"' for k, v in final_attrs.items()])
+            # Values may contain double quotes (e.g. JSON in single quotes)
+            attrs_output = " ".join([f'{k}="{v.replace(chr(34), "&quot;")}"' for k, v in final_attrs.items()])
             
             return f"<{target_tag} {attrs_output}>"
 
         # Replace Opening Tags
         # Matches <ppt-tag ... >
-        pattern = re.compile(r'<(ppt-[\w-]+)([^>]*)>')
-        content = pattern.sub(open_tag_replacer, content)
+        content = OPEN_TAG_PATTERN.sub(open_tag_replacer, content)
 
         # Replace Closing Tags
         for custom, config in self.tag_mapping.items():
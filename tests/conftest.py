@@ -0,0 +1,35 @@
+import io
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+
+def styles(**overrides):
+    """Computed styles as the extractor reports them for a plain element"""
+    result = dict(
+        color='rgb(0, 0, 0)', fontSize='16px', fontFamily='Arial', fontWeight='400', fontStyle='normal',
+        textAlign='left', opacity='1', boxShadow='none', backgroundColor='rgba(0, 0, 0, 0)',
+        backgroundImage='none', borderRadius='0px', lineHeight='normal', letterSpacing='normal',
+        borderTopWidth='0px', borderTopColor='rgb(0, 0, 0)', borderTopStyle='none',
+        borderBottomWidth='0px', borderBottomColor='rgb(0, 0, 0)', borderBottomStyle='none',
+        borderLeftWidth='0px', borderLeftColor='rgb(0, 0, 0)', borderLeftStyle='none',
+        borderRightWidth='0px', borderRightColor='rgb(0, 0, 0)', borderRightStyle='none',
+        display='block', alignItems='normal', justifyContent='normal', flexDirection='row',
+        mixBlendMode='normal', backdropFilter='none', webkitBackdropFilter='none',
+    )
+    result.update(overrides)
+    return result
+
+def element(id, type, x=10, y=10, width=100, height=50, text='', **style_overrides):
+    """An extracted element dict"""
+    return dict(id=id, type=type, text=text, isSingleLine=True, href=None, x=x, y=y,
+                width=width, height=height, styles=styles(**style_overrides), children=[], table=None)
+
+def png(width=60, height=40, color=(255, 0, 0, 255)):
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new('RGBA', (width, height), color).save(output, 'PNG')
+    return output.getvalue()
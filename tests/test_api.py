@@ -0,0 +1,24 @@
+from api import _with_base_url
+
+BASE = 'file:///decks/a b/'
+
+
+def test_base_goes_into_head_with_attributes():
+    html = '<!DOCTYPE html><HTML><HEAD lang="en"><title>x</title></HEAD><body><header></header></body></HTML>'
+    assert _with_base_url(html, BASE) == \
+        '<!DOCTYPE html><HTML><HEAD lang="en"><base href="file:///decks/a b/"><title>x</title></HEAD>' \
+        '<body><header></header></body></HTML>'
+
+
+def test_base_without_head_stays_after_doctype():
+    html = '\n<!doctype html>\n<section class="slide"></section>'
+    assert _with_base_url(html, BASE).startswith('\n<!doctype html><base href=')
+
+
+def test_base_without_head_or_doctype_is_prepended():
+    assert _with_base_url('<section></section>', BASE) == f'<base href="{BASE}"><section></section>'
+
+
+def test_base_url_is_escaped():
+    assert '<base href="https://x.test/?a=1&amp;b=&quot;2&quot;">' in \
+        _with_base_url('<head></head>', 'https://x.test/?a=1&b="2"')
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from batch import collect_inputs, output_path_for
+
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('')
+    return str(path)
+
+
+def test_directory_is_searched_recursively(tmp_path):
+    a = touch(tmp_path / 'a.wp')
+    b = touch(tmp_path / 'nested' / 'b.html')
+    touch(tmp_path / 'nested' / 'c.temp.html')
+    touch(tmp_path / 'notes.txt')
+    assert collect_inputs(str(tmp_path)) == [a, b]
+
+
+def test_compiled_html_next_to_wp_is_skipped(tmp_path):
+    deck = touch(tmp_path / 'deck.wp')
+    touch(tmp_path / 'deck.html')
+    other = touch(tmp_path / 'other.html')
+    assert collect_inputs(str(tmp_path)) == [deck, other]
+    assert collect_inputs(str(tmp_path / '*')) == [deck, other]
+
+
+def test_manifest_paths_are_relative_to_the_manifest(tmp_path):
+    deck = touch(tmp_path / 'decks' / 'deck.wp')
+    manifest = tmp_path / 'list.txt'
+    manifest.write_text('# decks\ndecks/deck.wp\n\n')
+    assert collect_inputs(str(manifest)) == [os.path.join(str(tmp_path), 'decks/deck.wp')]
+    assert os.path.samefile(collect_inputs(str(manifest))[0], deck)
+
+
+def test_colliding_outputs_are_rejected(tmp_path):
+    touch(tmp_path / 'deck.html')
+    touch(tmp_path / 'deck.htm')
+    with pytest.raises(ValueError, match='deck.htm'):
+        collect_inputs(str(tmp_path))
+
+
+def test_output_path_replaces_the_extension():
+    assert output_path_for('decks.wp/intro.wp') == 'decks.wp/intro.pptx'
@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import element
+from budget import CAPTURE_SCALE, PNG_BYTES_PER_PIXEL, capture_cost, fidelity_gain, plan_raster_budget
+
+
+def test_capture_cost_includes_shadow_padding_clipped_to_the_slide():
+    inside = element('a', 'shape', x=100, y=100, width=100, height=100)
+    corner = element('b', 'shape', x=0, y=0, width=100, height=100)
+    assert capture_cost(inside)[0] == pytest.approx(160 * 160 * CAPTURE_SCALE ** 2 * PNG_BYTES_PER_PIXEL)
+    assert capture_cost(corner)[0] == pytest.approx(130 * 130 * CAPTURE_SCALE ** 2 * PNG_BYTES_PER_PIXEL)
+
+
+def test_gain_weights_the_effect_and_grows_with_area():
+    small = element('a', 'shape', width=100, height=100)
+    large = element('b', 'shape', width=400, height=400)
+    assert fidelity_gain(small, ['glass effect']) > fidelity_gain(small, ['opacity'])
+    assert fidelity_gain(large, ['gradient']) > fidelity_gain(small, ['gradient'])
+    # Worst effect decides
+    assert fidelity_gain(small, ['opacity', 'blend mode']) == fidelity_gain(small, ['blend mode'])
+
+
+def test_plan_prefers_gain_per_cost_within_the_budget():
+    glass = element('glass', 'shape', width=200, height=200)
+    tint = element('tint', 'shape', width=200, height=200)
+    budget = capture_cost(glass)[0] * 1.5
+    decisions, spent = plan_raster_budget([(tint, ['opacity']), (glass, ['glass effect'])], [], max_bytes=budget)
+    assert [(d['id'], d['rasterize']) for d in decisions] == [('tint', False), ('glass', True)]
+    assert spent['bytes'] <= budget
+
+
+def test_mandatory_captures_are_paid_first():
+    logo = element('logo', 'image', width=200, height=200)
+    glass = element('glass', 'shape', width=200, height=200)
+    budget = capture_cost(logo)[0] * 1.5
+    decisions, spent = plan_raster_budget([(glass, ['glass effect'])], [logo], max_bytes=budget)
+    assert not decisions[0]['rasterize']
+    assert spent['bytes'] == pytest.approx(capture_cost(logo)[0])
+
+
+def test_time_budget_applies_on_its_own():
+    glass = element('glass', 'shape', width=200, height=200)
+    decisions, _ = plan_raster_budget([(glass, ['glass effect'])], [], max_seconds=capture_cost(glass)[1] / 2)
+    assert not decisions[0]['rasterize']
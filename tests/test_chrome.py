@@ -0,0 +1,57 @@
+from conftest import element
+from chrome import hoist_slide_chrome
+
+
+def slides_with_logo(positions):
+    slides = []
+    for i, x in enumerate(positions):
+        logo = element(f'slide_{i}_el_0', 'image', x=x, y=10, width=40, height=40)
+        title = element(f'slide_{i}_el_1', 'text', x=100, y=200, width=400, height=60, text=f'Title {i}')
+        slides.append({'id': f'slide_{i}', 'elements': [logo, title]})
+    return slides
+
+
+def test_hoists_element_repeated_on_enough_slides():
+    slides = slides_with_logo([1200, 1200, 1200])
+    layouts = hoist_slide_chrome(slides)
+    assert len(layouts) == 1
+    assert [el['id'] for el in layouts[0]['elements']] == ['slide_0_el_0']
+    for i, slide in enumerate(slides):
+        assert slide['layout'] == 'layout_0'
+        assert slide['hoistedIds'] == [f'slide_{i}_el_0']
+        assert [el['id'] for el in slide['elements']] == [f'slide_{i}_el_1']
+
+
+def test_ints_and_floats_within_tolerance_match():
+    assert len(hoist_slide_chrome(slides_with_logo([1200, 1200.1, 1199.8]))) == 1
+
+
+def test_values_on_either_side_of_a_rounding_edge_match():
+    # 10.24 and 10.26 used to land in different 0.5px buckets
+    assert len(hoist_slide_chrome(slides_with_logo([10.24, 10.26, 10.25]))) == 1
+
+
+def test_values_beyond_tolerance_do_not_match():
+    slides = slides_with_logo([1200, 1203, 1206])
+    assert hoist_slide_chrome(slides) == []
+    assert all(len(slide['elements']) == 2 and 'layout' not in slide for slide in slides)
+
+
+def test_too_few_repeats_are_not_hoisted():
+    assert hoist_slide_chrome(slides_with_logo([1200, 1200])) == []
+
+
+def test_charts_are_never_hoisted():
+    slides = slides_with_logo([1200, 1200, 1200])
+    for slide in slides:
+        slide['elements'][0]['type'] = 'chart'
+    assert hoist_slide_chrome(slides) == []
+
+
+def test_chrome_painted_above_slide_content_stays_on_the_slide():
+    slides = slides_with_logo([1200, 1200, 1200])
+    for i, slide in enumerate(slides):
+        # Painted first and overlapping the logo: the logo cannot move below it
+        backdrop = element(f'slide_{i}_el_2', 'shape', x=1150 + i, y=0, width=120, height=80)
+        slide['elements'].insert(0, backdrop)
+    assert hoist_slide_chrome(slides) == []
@@ -0,0 +1,72 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from main import parse_args
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO, 'src', 'main.py')
+
+# Wall time (s) `compile` and `--help` may take from a cold interpreter
+COLD_START_BUDGET = 1.0
+
+
+def test_convert_writes_pptx_by_default():
+    args = parse_args(['deck.html', '-o', 'out/deck.pptx'])
+    assert args.command == 'convert'
+    assert args.input_file == 'deck.html'
+    assert args.pptx_path == 'out/deck.pptx'
+
+
+def test_pptx_flag_before_input_does_not_swallow_it():
+    args = parse_args(['convert', '--pptx', 'deck.html'])
+    assert args.input_file == 'deck.html'
+    assert args.pptx_path == 'output/presentation.pptx'
+
+
+def test_pptx_flag_with_other_targets():
+    args = parse_args(['deck.wp', '--pptx', '--pdf', 'out/deck.pdf', '-o', 'out/deck.pptx'])
+    assert args.input_file == 'deck.wp'
+    assert args.pptx_path == 'out/deck.pptx'
+    assert args.pdf_path == 'out/deck.pdf'
+
+
+def test_other_targets_alone_skip_pptx():
+    args = parse_args(['deck.wp', '--pdf', 'out/deck.pdf'])
+    assert args.pptx_path is None
+
+
+def test_compile_does_not_import_browser_or_pptx(tmp_path):
+    source = tmp_path / 'deck.wp'
+    shutil.copy(os.path.join(REPO, 'demo', 'world_peace.wp'), source)
+    # Runs main.py as a script, then reports what it imported
+    script = (
+        "import runpy, sys\n"
+        f"sys.argv = ['main.py', 'compile', {str(source)!r}]\n"
+        f"runpy.run_path({MAIN!r}, run_name='__main__')\n"
+        "print(sorted(m for m in ('pptx', 'playwright') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                            cwd=os.path.join(REPO, 'src'))
+    assert result.stdout.splitlines()[-1] == '[]'
+    assert (tmp_path / 'deck.html').exists()
+
+
+def cold_start_seconds(*argv, runs=3):
+    """Best of a few runs of main.py in a fresh interpreter"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN, *argv], capture_output=True, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_compile_and_help_start_within_budget(tmp_path):
+    source = tmp_path / 'deck.wp'
+    shutil.copy(os.path.join(REPO, 'demo', 'world_peace.wp'), source)
+    assert cold_start_seconds('compile', str(source)) < COLD_START_BUDGET
+    assert cold_start_seconds('--help') < COLD_START_BUDGET
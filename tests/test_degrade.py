@@ -0,0 +1,72 @@
+import asyncio
+
+from conftest import element, png
+from chrome import hoist_slide_chrome
+from layers import merge_raster_layers
+from pipeline import degrade_slide
+from postprocess import CapturePostProcessor
+from scene import Scene
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.flattened = []
+
+    async def restore_isolation(self):
+        pass
+
+    async def capture_flattened_slide(self, slide_id, text_ids, child_ids, hidden_ids):
+        self.flattened.append({'slide_id': slide_id, 'text_ids': text_ids, 'hidden_ids': hidden_ids})
+        return png()
+
+
+def make_slides(count=3):
+    slides = []
+    for i in range(count):
+        logo = element(f'slide_{i}_el_0', 'image', x=1200, y=10, width=40, height=40)
+        first = element(f'slide_{i}_el_1', 'image', x=100, y=100, width=200, height=100, text=f'a{i}')
+        second = element(f'slide_{i}_el_2', 'image', x=250, y=150, width=200, height=100, text=f'b{i}')
+        slides.append({'id': f'slide_{i}', 'elements': [logo, first, second],
+                       'backgroundColor': 'rgb(255, 255, 255)', 'backgroundImage': 'none'})
+    return slides
+
+
+def test_degrade_hides_only_hoisted_elements_not_merged_members():
+    slides = make_slides()
+    layouts = hoist_slide_chrome(slides)
+    assert layouts and slides[0]['hoistedIds'] == ['slide_0_el_0']
+    for slide in slides:
+        slide['elements'] = merge_raster_layers(slide['elements'])
+    composite = slides[0]['elements'][0]
+    assert composite['memberIds'] == ['slide_0_el_1', 'slide_0_el_2']
+
+    extractor = FakeExtractor()
+    scene = Scene(slides)
+    asyncio.run(degrade_slide(extractor, CapturePostProcessor(scene), slides[0], 1))
+
+    hidden = extractor.flattened[0]['hidden_ids']
+    assert hidden == ['slide_0_el_0']
+    assert 'slide_0_el_1' not in hidden and 'slide_0_el_2' not in hidden
+    assert slides[0]['backgroundImageRef']
+
+
+def test_degrade_without_layout_hides_nothing():
+    slides = make_slides(count=1)
+    assert hoist_slide_chrome(slides) == []
+    slides[0]['elements'] = merge_raster_layers(slides[0]['elements'])
+
+    extractor = FakeExtractor()
+    asyncio.run(degrade_slide(extractor, CapturePostProcessor(Scene(slides)), slides[0], 1))
+    assert extractor.flattened[0]['hidden_ids'] == []
+
+
+def test_degrade_flattens_even_if_restoring_isolation_hangs():
+    class HungExtractor(FakeExtractor):
+        async def restore_isolation(self):
+            await asyncio.sleep(60)
+
+    slides = make_slides(count=1)
+    extractor = HungExtractor()
+    asyncio.run(degrade_slide(extractor, CapturePostProcessor(Scene(slides)), slides[0], 0.05))
+    assert len(extractor.flattened) == 1
+    assert slides[0]['backgroundImageRef']
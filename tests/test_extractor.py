@@ -0,0 +1,62 @@
+import asyncio
+
+from extractor import ContentExtractor
+
+
+class StalledHandle:
+    async def screenshot(self, **kwargs):
+        await asyncio.sleep(60)
+
+    def as_element(self):
+        return self
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    async def add_init_script(self, script):
+        pass
+
+    async def evaluate(self, expression, arg=None):
+        if expression.startswith('ids => window.__webppt.setVisibility'):
+            self.calls.append((expression.split("'")[1], arg))
+
+    async def evaluate_handle(self, expression, arg=None):
+        return StalledHandle()
+
+
+def test_background_capture_restores_visibility_on_timeout():
+    page = FakePage()
+    extractor = ContentExtractor(page)
+
+    async def capture():
+        await asyncio.wait_for(extractor.capture_slide_background('slide_0', [{'id': 'a'}, {'id': 'b'}]), 0.05)
+
+    try:
+        asyncio.run(capture())
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError('capture should have timed out')
+    assert page.calls == [('hidden', ['a', 'b']), ('visible', ['a', 'b'])]
+
+
+class SlowSlidePage(FakePage):
+    """Extracts three slides; the second one never finishes"""
+
+    async def evaluate(self, expression, arg=None):
+        if 'selectSlides' in expression:
+            return [0, 1, 2]
+        if 'extractElements' in expression and not expression.startswith('(() =>'):
+            if arg['only'] == 1:
+                await asyncio.sleep(60)
+            return [{'id': f"slide_{arg['only']}", 'elements': [], 'backgroundColor': 'rgb(255, 255, 255)',
+                     'backgroundImage': 'none'}]
+
+
+def test_slow_slide_extraction_is_marked_instead_of_failing():
+    extractor = ContentExtractor(SlowSlidePage())
+    slides = asyncio.run(extractor.extract_elements(slide_timeout=0.05))
+    assert [slide['id'] for slide in slides] == ['slide_0', 'slide_1', 'slide_2']
+    assert [bool(slide.get('extractionTimedOut')) for slide in slides] == [False, True, False]
@@ -0,0 +1,62 @@
+from conftest import element
+from layers import GridIndex, cull_occluded, is_opaque_occluder, merge_raster_layers, paint_extent
+
+
+def cover(id, **kwargs):
+    """Opaque rectangle over the top-left of the slide"""
+    return element(id, 'shape', x=0, y=0, width=400, height=300, backgroundColor='rgb(255, 255, 255)', **kwargs)
+
+
+def test_grid_index_finds_rectangles_sharing_a_cell():
+    index = GridIndex(cell=64)
+    index.insert('a', (0, 0, 10, 10))
+    index.insert('b', (200, 200, 260, 260))
+    assert index.query((50, 50, 70, 70)) == {'a'}
+    assert index.query((0, 0, 300, 300)) == {'a', 'b'}
+
+
+def test_paint_extent_includes_shadow_padding_and_children():
+    el = element('a', 'image', x=100, y=100, width=50, height=50, boxShadow='0 4px 8px black')
+    el['children'] = [element('a_c0', 'text', x=100, y=160, width=200, height=20)]
+    assert paint_extent(el) == (70, 70, 300, 180)
+
+
+def test_only_solid_square_shapes_occlude():
+    assert is_opaque_occluder(cover('a'))
+    assert not is_opaque_occluder(cover('a', opacity='0.5'))
+    assert not is_opaque_occluder(cover('a', borderRadius='8px'))
+    assert not is_opaque_occluder(element('a', 'shape', backgroundColor='rgba(255, 255, 255, 0.5)'))
+    assert not is_opaque_occluder(element('a', 'text', backgroundColor='rgb(255, 255, 255)'))
+
+
+def test_cull_drops_elements_covered_by_a_later_opaque_shape():
+    hidden = element('hidden', 'image', x=10, y=10, width=50, height=50)
+    shadowed = element('shadow', 'image', x=10, y=10, width=50, height=50, boxShadow='0 0 40px black')
+    above = element('above', 'text', x=10, y=10, width=50, height=50)
+    kept, dropped = cull_occluded([hidden, shadowed, cover('cover'), above])
+    assert [el['id'] for el in kept] == ['shadow', 'cover', 'above']
+    assert [el['id'] for el in dropped] == ['hidden']
+
+
+def test_overlapping_rasters_merge_into_one_composite():
+    a = element('a', 'image', x=10, y=10, width=100, height=100)
+    b = element('b', 'image', x=112, y=10, width=100, height=100)
+    merged, = merge_raster_layers([a, b])
+    assert merged['memberIds'] == ['a', 'b']
+    assert (merged['x'], merged['y'], merged['width'], merged['height']) == (10, 10, 202, 100)
+
+
+def test_rasters_do_not_merge_across_something_in_between():
+    a = element('a', 'image', x=10, y=10, width=100, height=100)
+    text = element('t', 'text', x=50, y=50, width=100, height=20)
+    b = element('b', 'image', x=60, y=10, width=100, height=100)
+    assert [el['id'] for el in merge_raster_layers([a, text, b])] == ['a', 't', 'b']
+
+
+def test_embeddable_images_and_backdrop_captures_stay_separate():
+    a = element('a', 'image', x=10, y=10, width=100, height=100)
+    source = element('s', 'image', x=20, y=20, width=50, height=50)
+    source['source'] = {'kind': 'img'}
+    assert len(merge_raster_layers([a, source])) == 2
+    glass = element('g', 'image', x=20, y=20, width=50, height=50, backdropFilter='blur(8px)')
+    assert len(merge_raster_layers([a, glass])) == 2
@@ -0,0 +1,66 @@
+import io
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+from conftest import png
+from ppt_merger import merge_presentations
+from ppt_renderer import PPTRenderer, SVG_BLIP_NS, SVG_CONTENT_TYPE
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"><rect width="10" height="10"/></svg>'
+
+
+def write_svg_shard(path):
+    renderer = PPTRenderer(str(path))
+    slide = renderer.prs.slides.add_slide(renderer.blank_slide_layout)
+    el = {'source': {'x': 10, 'y': 10, 'width': 100, 'height': 100}}
+    renderer.add_source_image(slide, el, io.BytesIO(png(10, 10)), SVG)
+    renderer.save()
+    return str(path)
+
+
+def test_merge_keeps_svg_passthrough_images(tmp_path):
+    shards = [write_svg_shard(tmp_path / f'shard{i}.pptx') for i in range(2)]
+    output = tmp_path / 'merged.pptx'
+    assert merge_presentations(shards, str(output)) == 2
+
+    for slide in Presentation(str(output)).slides:
+        targets = [rel.target_part for rel in slide.part.rels.values() if rel.reltype == RT.IMAGE]
+        svgs = [part for part in targets if part.content_type == SVG_CONTENT_TYPE]
+        assert len(svgs) == 1 and svgs[0].blob == SVG
+        # The svgBlip still points at the SVG part
+        embeds = [blip.get(qn('r:embed')) for blip in slide._element.iter(f'{{{SVG_BLIP_NS}}}svgBlip')]
+        assert [slide.part.related_part(rid) for rid in embeds] == svgs
+
+
+def write_chrome_shard(path, logo_color=(255, 0, 0)):
+    renderer = PPTRenderer(str(path))
+    layout = renderer.add_layout('Chrome 1')
+    layout.shapes.add_picture(io.BytesIO(png(20, 20, logo_color)), 0, 0, 100000, 100000)
+    renderer.add_slide({'backgroundColor': 'rgb(255, 255, 255)'}, layout=layout)
+    renderer.save()
+    return str(path)
+
+
+def chrome_layouts(prs):
+    return [layout for layout in prs.slide_layouts if layout.name == 'Chrome 1']
+
+
+def test_merge_shares_identical_chrome_layouts(tmp_path):
+    shards = [write_chrome_shard(tmp_path / f'shard{i}.pptx') for i in range(3)]
+    output = tmp_path / 'merged.pptx'
+    assert merge_presentations(shards, str(output)) == 3
+
+    prs = Presentation(str(output))
+    layouts = chrome_layouts(prs)
+    assert len(layouts) == 1
+    assert all(slide.slide_layout == layouts[0] for slide in prs.slides)
+
+
+def test_merge_keeps_chrome_layouts_with_different_images(tmp_path):
+    shards = [write_chrome_shard(tmp_path / 'red.pptx'),
+              write_chrome_shard(tmp_path / 'blue.pptx', logo_color=(0, 0, 255))]
+    output = tmp_path / 'merged.pptx'
+    merge_presentations(shards, str(output))
+    assert len(chrome_layouts(Presentation(str(output)))) == 2
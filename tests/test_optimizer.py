@@ -0,0 +1,109 @@
+import io
+import posixpath
+import random
+import zipfile
+
+from lxml import etree
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.parts.image import Image, ImagePart
+
+from conftest import png
+from ppt_optimizer import optimize_presentation
+from ppt_renderer import PPTRenderer
+
+_CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+
+def noise_png(size):
+    """Incompressible PNG, so downsampling it is worth it"""
+    from PIL import Image as PILImage
+
+    data = random.Random(0).randbytes(size * size * 3)
+    output = io.BytesIO()
+    PILImage.frombytes('RGB', (size, size), data).save(output, 'PNG')
+    return output.getvalue()
+
+
+def write_deck(path):
+    """
+    A deck with a logo on a chrome layout, a photo placed small, and the
+    same logo stored twice on the second slide (as shards merged by hand
+    would have it). The template's unused layouts and printer settings stay.
+    """
+    renderer = PPTRenderer(str(path))
+    layout = renderer.add_layout('Chrome 1')
+    logo = png(32, 32, (0, 0, 255, 255))
+    layout.shapes.add_picture(io.BytesIO(logo), 0, 0, 300000, 300000)
+
+    first = renderer.add_slide({'backgroundColor': 'rgb(255, 255, 255)'}, layout=layout)
+    first.shapes.add_picture(io.BytesIO(noise_png(1200)), 914400, 914400, 914400, 914400)
+
+    second = renderer.add_slide({'backgroundColor': 'rgb(255, 255, 255)'}, layout=layout)
+    picture = second.shapes.add_picture(io.BytesIO(logo), 0, 0, 300000, 300000)
+    # A second part with the same bytes, outside python-pptx's dedupe
+    duplicate = ImagePart.new(second.part.package, Image.from_blob(logo))
+    picture._element.blipFill.blip.set(qn('r:embed'), second.part.relate_to(duplicate, RT.IMAGE))
+    renderer.save()
+    return logo
+
+
+def dangling_targets(path):
+    """Internal relationship targets and content types that do not match the zip entries"""
+    problems = []
+    with zipfile.ZipFile(str(path)) as package:
+        names = set(package.namelist())
+        overrides = etree.fromstring(package.read('[Content_Types].xml')).findall(f'{{{_CT_NS}}}Override')
+        problems += [o.get('PartName') for o in overrides if o.get('PartName').lstrip('/') not in names]
+        for rels_path in [n for n in names if n.endswith('.rels')]:
+            base = posixpath.dirname(posixpath.dirname(rels_path))
+            for rel in etree.fromstring(package.read(rels_path)):
+                if rel.get('TargetMode') == 'External':
+                    continue
+                target = posixpath.normpath(posixpath.join(base, rel.get('Target'))).lstrip('/')
+                if target not in names:
+                    problems.append(f'{rels_path} -> {target}')
+    return problems
+
+
+def media_entries(path):
+    with zipfile.ZipFile(str(path)) as package:
+        return [n for n in package.namelist() if n.startswith('ppt/media/')]
+
+
+def test_optimize_keeps_every_image_resolvable(tmp_path):
+    source, target = tmp_path / 'deck.pptx', tmp_path / 'optimized.pptx'
+    logo = write_deck(source)
+    assert len(media_entries(source)) == 3
+
+    report = optimize_presentation(str(source), str(target))
+    assert report['after'] < report['before']
+    for category in ('unused parts', 'duplicate media', 'downsampled media'):
+        assert report['saved'][category]['count'] > 0, category
+    assert dangling_targets(target) == []
+    assert len(media_entries(target)) == 2
+
+    prs = Presentation(str(target))
+    # Every slide uses the chrome layout, so the template's eleven go
+    assert [layout.name for layout in prs.slide_layouts] == ['Chrome 1']
+    assert not any(rel.reltype == RT.PRINTER_SETTINGS for rel in prs.part.rels.values())
+
+    chrome, = prs.slide_layouts
+    assert [shape.image.blob for shape in chrome.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE] == [logo]
+
+    first, second = prs.slides
+    photo, = [shape for shape in first.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+    # Placed at 1 inch, so 150 dpi needs 150 pixels
+    assert photo.image.size == (150, 150)
+    assert [shape.image.blob for shape in second.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE] == [logo]
+
+
+def test_optimize_in_place(tmp_path):
+    path = tmp_path / 'deck.pptx'
+    write_deck(path)
+    before = path.stat().st_size
+    report = optimize_presentation(str(path), str(path))
+    assert report['after'] == path.stat().st_size < before
+    assert len(Presentation(str(path)).slides) == 2
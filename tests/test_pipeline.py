@@ -0,0 +1,19 @@
+import os
+
+from pipeline import prepare_input
+
+
+def test_prepare_input_compiles_wp_next_to_it(tmp_path):
+    folder = tmp_path / 'decks.wp'
+    folder.mkdir()
+    source = folder / 'intro.wp'
+    source.write_text('<slide><h1>Hello</h1></slide>', encoding='utf-8')
+
+    path = prepare_input(str(source))
+    assert path == os.path.join(str(folder), 'intro.temp.html')
+    assert os.path.exists(path)
+
+
+def test_prepare_input_passes_html_through(tmp_path):
+    source = tmp_path / 'deck.wp.html'
+    assert prepare_input(str(source)) == str(source)
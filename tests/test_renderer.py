@@ -0,0 +1,61 @@
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+
+from conftest import element, styles
+from ppt_renderer import PPTRenderer
+from utils import px_to_emu
+
+
+def cell(row, col, text, row_span=1, col_span=1, **style_overrides):
+    return {'row': row, 'col': col, 'rowSpan': row_span, 'colSpan': col_span, 'text': text,
+            'styles': styles(**style_overrides)}
+
+
+def render_table(tmp_path, grid):
+    renderer = PPTRenderer(str(tmp_path / 'table.pptx'))
+    slide = renderer.prs.slides.add_slide(renderer.blank_slide_layout)
+    el = element('slide_0_el_0', 'table', x=100, y=50, width=300, height=90)
+    el['table'] = grid
+    renderer.create_table(slide, el)
+    renderer.save()
+    shape, = Presentation(str(tmp_path / 'table.pptx')).slides[0].shapes
+    return shape
+
+
+def test_table_grid_with_merged_cells(tmp_path):
+    grid = {
+        'colWidths': [100, 100, 100],
+        'rowHeights': [30, 30, 30],
+        'cells': [
+            cell(0, 0, 'Header', col_span=2, fontWeight='700', backgroundColor='rgb(0, 0, 255)'),
+            cell(0, 2, 'Side', row_span=2),
+            cell(1, 0, 'a'), cell(1, 1, 'b\nc'),
+            cell(2, 0, 'd'), cell(2, 1, 'e & <f>'), cell(2, 2, 'g', textAlign='right'),
+        ],
+    }
+    shape = render_table(tmp_path, grid)
+    assert (shape.left, shape.top) == (px_to_emu(100), px_to_emu(50))
+    table = shape.table
+    assert [column.width for column in table.columns] == [px_to_emu(100)] * 3
+    assert [row.height for row in table.rows] == [px_to_emu(30)] * 3
+
+    header = table.cell(0, 0)
+    assert header.is_merge_origin and (header.span_width, header.span_height) == (2, 1)
+    assert table.cell(0, 1).is_spanned
+    side = table.cell(0, 2)
+    assert side.is_merge_origin and (side.span_width, side.span_height) == (1, 2)
+    assert table.cell(1, 2).is_spanned
+
+    assert header.text_frame.paragraphs[0].runs[0].font.bold
+    assert header.fill.fore_color.rgb == RGBColor(0, 0, 255)
+    assert [p.text for p in table.cell(1, 1).text_frame.paragraphs] == ['b', 'c']
+    assert table.cell(2, 1).text == 'e & <f>'
+
+
+def test_empty_table_grid_is_skipped(tmp_path):
+    renderer = PPTRenderer(str(tmp_path / 'empty.pptx'))
+    slide = renderer.prs.slides.add_slide(renderer.blank_slide_layout)
+    el = element('slide_0_el_0', 'table')
+    el['table'] = {'colWidths': [], 'rowHeights': [], 'cells': []}
+    assert renderer.create_table(slide, el) is None
+    assert len(slide.shapes) == 0
@@ -0,0 +1,166 @@
+import json
+import shutil
+import subprocess
+import warnings
+
+import pytest
+
+from extractor import RUNTIME_JS
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+
+# Minimal DOM for runtime helpers that only walk nodes and read computed styles
+DOM_MOCK = """
+const Node = {ELEMENT_NODE: 1, TEXT_NODE: 3};
+const BASE_STYLE = {fontFamily: 'Arial', fontSize: '16px', fontWeight: '400', fontStyle: 'normal',
+                    color: 'rgb(0, 0, 0)', textDecorationLine: 'none', whiteSpace: 'normal',
+                    display: 'inline', textTransform: 'none'};
+function text(value) {
+    return {nodeType: Node.TEXT_NODE, textContent: value};
+}
+function el(tagName, style, childNodes) {
+    const node = {nodeType: Node.ELEMENT_NODE, tagName, style, childNodes, parentElement: null};
+    childNodes.forEach(child => child.parentElement = node);
+    node.closest = () => null;
+    return node;
+}
+// Computed styles inherit textTransform like the browser does
+const window = {getComputedStyle(node) {
+    const inherited = node.parentElement ? {textTransform: window.getComputedStyle(node.parentElement).textTransform} : {};
+    return Object.assign({}, BASE_STYLE, inherited, node.style);
+}};
+"""
+
+
+def runtime_function(name):
+    """Source of a helper function defined inside RUNTIME_JS"""
+    start = RUNTIME_JS.index(f'function {name}(')
+    depth = 0
+    for i in range(RUNTIME_JS.index('{', start), len(RUNTIME_JS)):
+        depth += {'{': 1, '}': -1}.get(RUNTIME_JS[i], 0)
+        if depth == 0:
+            return RUNTIME_JS[start:i + 1]
+    raise ValueError(f'{name} is not closed')
+
+
+def run_js(script):
+    result = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def text_runs(block_js):
+    return run_js(DOM_MOCK + runtime_function('extractTextRuns') +
+                  f'\nconsole.log(JSON.stringify(extractTextRuns({block_js})));')
+
+
+def test_runs_keep_uppercase_transform():
+    runs = text_runs("el('DIV', {display: 'block', textTransform: 'uppercase'}, "
+                     "[text('hello '), el('B', {fontWeight: '700'}, [text('bold')]), text(' world')])")
+    assert [run['text'] for run in runs] == ['HELLO ', 'BOLD', ' WORLD']
+    assert all('transform' not in run for run in runs)
+
+
+def test_runs_capitalize_across_nodes():
+    runs = text_runs("el('DIV', {display: 'block', textTransform: 'capitalize'}, "
+                     "[text('one tw'), el('B', {fontWeight: '700'}, [text('o three')]), text(\" don't\")])")
+    assert [run['text'] for run in runs] == ['One Tw', 'o Three', " Don't"]
+
+
+def test_hide_text_covers_descendants_until_restored():
+    script = """
+const CSS = {escape: value => value.replace(/"/g, '\\\\"')};
+const sheets = [];
+const document = {
+    head: {appendChild(node) { sheets.push(node); }},
+    createElement: () => ({textContent: '', remove() { sheets.splice(sheets.indexOf(this), 1); }})
+};
+const opacity = [];
+function setChildOpacity(ids, value) { opacity.push([ids, value]); }
+let textSnapshot = null;
+""" + runtime_function('hideText') + runtime_function('restoreText') + """
+hideText(['slide_0_el_1'], ['slide_0_el_1_c0']);
+const hidden = sheets.map(sheet => sheet.textContent);
+restoreText();
+console.log(JSON.stringify({hidden, after: sheets.length, opacity}));
+"""
+    result = run_js(script)
+    rule, = result['hidden']
+    selectors, declarations = rule.split(' {')
+    assert selectors.split(', ') == ['[data-ppt-id="slide_0_el_1"]', '[data-ppt-id="slide_0_el_1"] *']
+    assert 'color: transparent !important' in declarations
+    assert '-webkit-text-fill-color: transparent !important' in declarations
+    assert result['after'] == 0
+    assert result['opacity'] == [[['slide_0_el_1_c0'], '0'], [['slide_0_el_1_c0'], '1']]
+
+
+def test_runs_keep_non_breaking_spaces():
+    runs = text_runs("el('DIV', {display: 'block'}, "
+                     "[text('\\u00a0a\\n  b\\u00a0\\u00a0'), el('B', {fontWeight: '700'}, [text('c')])])")
+    assert [run['text'] for run in runs] == ['\u00a0a b\u00a0\u00a0', 'c']
+
+
+def test_runtime_source_has_no_invalid_escapes():
+    import extractor
+
+    with open(extractor.__file__, encoding='utf-8') as f:
+        source = f.read()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        compile(source, extractor.__file__, 'exec')
+
+
+IMAGE_DOM_MOCK = """
+const Node = {ELEMENT_NODE: 1, TEXT_NODE: 3};
+const BASE_STYLE = {filter: 'none', mixBlendMode: 'normal', clipPath: 'none', maskImage: 'none', transform: 'none',
+                    boxShadow: 'none', opacity: '1', borderTopLeftRadius: '0px', borderTopRightRadius: '0px',
+                    borderBottomLeftRadius: '0px', borderBottomRightRadius: '0px', backgroundColor: 'rgba(0, 0, 0, 0)',
+                    backgroundImage: 'none', overflowX: 'visible', overflowY: 'visible', clip: 'auto',
+                    objectFit: 'fill', objectPosition: '50% 50%'};
+['Top', 'Right', 'Bottom', 'Left'].forEach(side => {
+    BASE_STYLE[`border${side}Width`] = '0px';
+    BASE_STYLE[`border${side}Style`] = 'none';
+    BASE_STYLE[`padding${side}`] = '0px';
+});
+function el(tagName, style, children, extra) {
+    const node = Object.assign({nodeType: Node.ELEMENT_NODE, tagName, style, children, childNodes: children,
+                                parentElement: null}, extra || {});
+    children.forEach(child => child.parentElement = node);
+    node.getBoundingClientRect = () => ({x: 110, y: 120, width: 200, height: 100});
+    return node;
+}
+function img(style) {
+    return el('IMG', style || {}, [], {complete: true, naturalWidth: 400, naturalHeight: 200, src: 'photo.png'});
+}
+const window = {getComputedStyle: node => Object.assign({}, BASE_STYLE, node.style)};
+const isTransparent = color => color === 'rgba(0, 0, 0, 0)';
+const effectiveOpacity = () => 1;
+"""
+
+
+def image_source(tree_js):
+    script = IMAGE_DOM_MOCK + ''.join(runtime_function(name) for name in (
+        'hasPaintEffects', 'hasBoxPaint', 'isClippedByAncestor', 'extractImageSource')) + f"""
+const slide = {tree_js};
+let image = slide;
+while (image.children.length) image = image.children[0];
+console.log(JSON.stringify(extractImageSource(image, slide, {{x: 100, y: 100}})));
+"""
+    return run_js(script)
+
+
+def test_image_source_for_plain_img():
+    source = image_source("el('SECTION', {}, [el('DIV', {}, [img()])])")
+    assert source['kind'] == 'img' and (source['x'], source['y']) == (10, 20)
+
+
+def test_image_source_falls_back_under_clipping_card():
+    card = "{borderTopLeftRadius: '16px', overflowX: 'hidden', overflowY: 'hidden'}"
+    assert image_source(f"el('SECTION', {{}}, [el('DIV', {card}, [el('DIV', {{}}, [img()])])])") is None
+    clip = "{clipPath: 'circle(50%)'}"
+    assert image_source(f"el('SECTION', {{}}, [el('DIV', {clip}, [img()])])") is None
+
+
+def test_image_source_falls_back_for_object_fit_and_padding():
+    assert image_source("el('SECTION', {}, [img({objectFit: 'cover'})])") is None
+    assert image_source("el('SECTION', {}, [img({objectPosition: '0% 0%'})])") is None
+    assert image_source("el('SECTION', {}, [img({paddingLeft: '8px'})])") is None
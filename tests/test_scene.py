@@ -0,0 +1,56 @@
+import json
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+from conftest import element, png
+from pipeline import render_scene
+from scene import SCENE_FORMAT, Scene, SceneError
+
+
+def test_saved_chart_scene_renders_a_native_chart(tmp_path):
+    chart = element('slide_0_el_0', 'chart', x=100, y=100, width=640, height=360)
+    chart['chart'] = {'type': 'column', 'title': 'Revenue', 'categories': ['Q1', 'Q2', 'Q3'],
+                      'series': [{'name': '2025', 'values': [1, 2, 3]}, {'name': '2026', 'values': [2, 3, 5]}],
+                      'colors': ['rgb(255, 0, 0)', 'rgb(0, 0, 255)']}
+    path = tmp_path / 'deck.scene'
+    Scene([{'id': 'slide_0', 'elements': [chart], 'backgroundColor': 'rgb(255, 255, 255)',
+            'backgroundImage': 'none'}]).save(str(path))
+
+    loaded = Scene.load(str(path))
+    try:
+        render_scene(loaded, str(tmp_path / 'deck.pptx'))
+    finally:
+        loaded.close()
+
+    shape, = Presentation(str(tmp_path / 'deck.pptx')).slides[0].shapes
+    assert shape.has_chart
+    assert shape.chart.chart_title.text_frame.text == 'Revenue'
+    assert list(shape.chart.plots[0].categories) == ['Q1', 'Q2', 'Q3']
+    assert [(s.name, list(s.values)) for s in shape.chart.series] == [('2025', [1, 2, 3]), ('2026', [2, 3, 5])]
+
+
+def test_scene_round_trip(tmp_path):
+    chart = element('slide_0_el_0', 'chart')
+    chart['chart'] = {'type': 'bar', 'categories': ['a', 'b'], 'series': [{'name': 's', 'values': [1, 2]}]}
+    scene = Scene([{'id': 'slide_0', 'elements': [chart]}])
+    ref = scene.add_image('slide_0_bg.png', png())
+    scene.slides[0]['backgroundImageRef'] = ref
+
+    path = tmp_path / 'deck.scene'
+    scene.save(str(path))
+    loaded = Scene.load(str(path))
+    try:
+        assert loaded.slides[0]['elements'][0]['chart'] == chart['chart']
+        assert loaded.image_bytes(ref) == png()
+    finally:
+        loaded.close()
+
+
+def test_scene_rejects_older_versions(tmp_path):
+    path = tmp_path / 'old.scene'
+    with zipfile.ZipFile(str(path), 'w') as zf:
+        zf.writestr('scene.json', json.dumps({'format': SCENE_FORMAT, 'version': 3, 'slides': []}))
+    with pytest.raises(SceneError, match='Unsupported scene version 3'):
+        Scene.load(str(path))
@@ -0,0 +1,26 @@
+import pytest
+
+from main import parse_args
+from utils import parse_slide_range
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('41-80', (41, 80)),
+    ('41-', (41, None)),
+    ('7', (7, 7)),
+    ('3-3', (3, 3)),
+])
+def test_parse_slide_range(text, expected):
+    assert parse_slide_range(text) == expected
+
+
+@pytest.mark.parametrize('text', ['0', '0-4', '9-3', '-5', 'a-b', '', '1-2-3'])
+def test_parse_slide_range_rejects_invalid_ranges(text):
+    with pytest.raises(ValueError):
+        parse_slide_range(text)
+
+
+def test_slides_option_is_parsed_and_validated():
+    assert parse_args(['deck.wp', '--slides', '41-80']).slide_range == (41, 80)
+    with pytest.raises(SystemExit):
+        parse_args(['deck.wp', '--slides', '80-41'])